@@ -1,52 +1,114 @@
+import time
+import operator
+from typing import Annotated
 from utils.model_loader import ModelLoader
 from prompt_library.prompt import SYSTEM_PROMPT
 from langgraph.graph import StateGraph, MessagesState, END, START
-from langgraph.prebuilt import ToolNode, tools_condition
-from tools.weather_info_tool import WeatherInfoTool
-from tools.place_search_tool import PlaceSearchTool
-from tools.expense_calculator_tool import CalculatorTool
-from tools.currency_conversion_tool import CurrencyConverterTool
+from langgraph.prebuilt import tools_condition
+from langchain_core.runnables import RunnableLambda
+from agent.tool_executor import ParallelToolNode
+from agent.context_manager import ContextManager
+from agent.planner import PrefetchPlanner
+from utils.rate_limiter import get_rate_limiter
+from utils.plugins import TOOLS
+from logger.logging import span
+from logger.metrics import LLM_LATENCY, LLM_TOKENS
+
+class TripState(MessagesState):
+    """Agent state: the conversation plus the prompt tokens the context manager saved in this run"""
+    tokens_saved: Annotated[int, operator.add]
 
 class GraphBuilder():
     def __init__(self,model_provider: str = "groq"):
+        self.model_provider = model_provider
         self.model_loader = ModelLoader(model_provider=model_provider)
+        self.llm_rate_limiter = get_rate_limiter(model_provider)
         self.llm = self.model_loader.load_llm()
         
         self.tools = []
-        
-        self.weather_tools = WeatherInfoTool()
-        self.place_search_tools = PlaceSearchTool()
-        self.calculator_tools = CalculatorTool()
-        self.currency_converter_tools = CurrencyConverterTool()
-        
-        self.tools.extend([* self.weather_tools.weather_tool_list, 
-                           * self.place_search_tools.place_search_tool_list,
-                           * self.calculator_tools.calculator_tool_list,
-                           * self.currency_converter_tools.currency_converter_tool_list])
+
+        # Only the tool modules listed in tools.enabled are imported and set up
+        tool_config = self.model_loader.config.get("tools", {})
+        self.tool_sets = {
+            name: TOOLS.get(name)(config=self.model_loader.config)
+            for name in tool_config.get("enabled", list(TOOLS.specs))
+        }
+        for tool_set in self.tool_sets.values():
+            self.tools.extend(tool_set.tool_list)
         
         self.llm_with_tools = self.llm.bind_tools(tools=self.tools)
-        
+
+        self.tool_node = ParallelToolNode(
+            tools=self.tools,
+            max_concurrency=tool_config.get("max_concurrency", 8),
+            timeout_seconds=tool_config.get("timeout_seconds", 30),
+        )
+        self.context_manager = ContextManager.from_config(self.model_loader.config.get("context", {}))
+
+        agent_config = self.model_loader.config.get("agent", {})
+        self.mode = agent_config.get("mode", "react")
+        self.fast_llm = self.model_loader.load_fast_llm() if self.mode == "planner" else None
+        self.planner = PrefetchPlanner.from_config(self.tool_node, agent_config.get("planner", {}), self.fast_llm)
+
         self.graph = None
         
         self.system_prompt = SYSTEM_PROMPT
     
     
-    def agent_function(self,state: MessagesState):
+    def _observe_llm(self, attrs: dict, response, started: float) -> None:
+        """Record latency, token usage and tool calls of one LLM call on its span and in the metrics"""
+        LLM_LATENCY.observe(time.perf_counter() - started, provider=self.model_provider)
+        usage = getattr(response, "usage_metadata", None) or {}
+        attrs.update(
+            prompt_tokens=usage.get("input_tokens"),
+            completion_tokens=usage.get("output_tokens"),
+            tool_calls=len(getattr(response, "tool_calls", None) or []),
+        )
+        for kind, key in (("prompt", "input_tokens"), ("completion", "output_tokens")):
+            if usage.get(key):
+                LLM_TOKENS.inc(usage[key], provider=self.model_provider, type=kind)
+
+    def agent_function(self,state: TripState):
         """Main agent function"""
         user_question = state["messages"]
-        input_question = [self.system_prompt] + user_question
-        response = self.llm_with_tools.invoke(input_question)
-        return {"messages": [response]}
-    def build_graph(self):
-        graph_builder=StateGraph(MessagesState)
-        graph_builder.add_node("agent", self.agent_function)
-        graph_builder.add_node("tools", ToolNode(tools=self.tools))
-        graph_builder.add_edge(START,"agent")
+        input_question, tokens_saved = self.context_manager.prepare(self.system_prompt, user_question)
+        if self.llm_rate_limiter is not None:
+            self.llm_rate_limiter.acquire()
+        with span("llm", "llm", provider=self.model_provider, prompt_messages=len(input_question)) as attrs:
+            started = time.perf_counter()
+            response = self.llm_with_tools.invoke(input_question)
+            self._observe_llm(attrs, response, started)
+        return {"messages": [response], "tokens_saved": tokens_saved}
+
+    async def aagent_function(self,state: TripState):
+        """Async agent function, used when the graph runs with ainvoke/astream"""
+        input_question, tokens_saved = self.context_manager.prepare(self.system_prompt, state["messages"])
+        if self.llm_rate_limiter is not None:
+            await self.llm_rate_limiter.aacquire()
+        with span("llm", "llm", provider=self.model_provider, prompt_messages=len(input_question)) as attrs:
+            started = time.perf_counter()
+            response = await self.llm_with_tools.ainvoke(input_question)
+            self._observe_llm(attrs, response, started)
+        return {"messages": [response], "tokens_saved": tokens_saved}
+
+    def build_graph(self, checkpointer=None):
+        """Compile the agent graph; with a checkpointer, runs keep their state per thread_id"""
+        graph_builder=StateGraph(TripState)
+        graph_builder.add_node("agent", RunnableLambda(self.agent_function, afunc=self.aagent_function))
+        graph_builder.add_node("tools", self.tool_node.as_runnable())
+        if self.mode == "planner":
+            graph_builder.add_node("prefetch", self.planner.as_runnable())
+            graph_builder.add_edge(START,"prefetch")
+            graph_builder.add_edge("prefetch","agent")
+        else:
+            graph_builder.add_edge(START,"agent")
         graph_builder.add_conditional_edges("agent",tools_condition)
         graph_builder.add_edge("tools","agent")
         graph_builder.add_edge("agent",END)
-        self.graph = graph_builder.compile()
-        return self.graph
+        graph = graph_builder.compile(checkpointer=checkpointer)
+        if checkpointer is None:
+            self.graph = graph
+        return graph
         
     def __call__(self):
         return self.build_graph()
\ No newline at end of file
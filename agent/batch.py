@@ -0,0 +1,144 @@
+"""
+Run many trip requests through the agent graph with bounded concurrency.
+
+Usage:
+    python -m agent.batch requests.jsonl --provider groq --concurrency 4 --output plans.jsonl
+
+Each input line is a JSON object with either a "question" or a "title"/"body" pair
+(the shape of requests.jsonl), plus an optional "request_id". One JSON result is
+written per line as soon as its plan is ready, followed by a summary line. Logs go
+to stderr, so stdout can be redirected to a JSONL file.
+"""
+import sys
+import json
+import time
+import asyncio
+import argparse
+from typing import AsyncIterator, Iterable, List, Optional
+from agent.graph_registry import GraphRegistry
+from utils.admission import AdmissionController, Overloaded
+from utils.cache import SingleFlight
+from utils.config_loader import load_config
+from utils.plan_cache import PlanCache
+from utils.query_parser import normalize_text
+
+
+def item_question(item: dict) -> str:
+    if item.get("question"):
+        return item["question"]
+    return "\n\n".join(part for part in (item.get("title"), item.get("body")) if part)
+
+
+def read_items(lines: Iterable[str]) -> List[dict]:
+    return [json.loads(line) for line in lines if line.strip()]
+
+
+class BatchRunner:
+    """
+    Plans a list of trip requests concurrently (at most max_concurrency graphs at once).
+
+    All plans share the process-wide tool caches, HTTP pool and rate limiters, so
+    identical upstream lookups across the batch are made once. Identical questions
+    in the same batch share a single graph run, and the plan cache is used when enabled.
+    Each graph run takes an admission slot like a single /query does; an item refused
+    by admission fails with its retry_after hint.
+    """
+    def __init__(self, graph_registry: GraphRegistry, plan_cache: Optional[PlanCache] = None, max_concurrency: int = 4,
+                 admission: Optional[AdmissionController] = None):
+        self.graph_registry = graph_registry
+        self.plan_cache = plan_cache
+        self.max_concurrency = max_concurrency
+        self.admission = admission
+        self._runs = SingleFlight()
+
+    async def _plan(self, question: str, model_provider: str) -> dict:
+        if self.plan_cache is not None:
+            cached = self.plan_cache.lookup(question, namespace=model_provider)
+            if cached is not None:
+                return {"answer": cached[0], "cache": cached[1]}
+        admission = await self.admission.admit() if self.admission is not None else None
+        try:
+            started = time.perf_counter()
+            react_app = await asyncio.to_thread(self.graph_registry.get, model_provider)
+            output = await react_app.ainvoke({"messages": [question]})
+        finally:
+            if admission is not None:
+                admission.release()
+        answer = output["messages"][-1].content
+        if self.plan_cache is not None:
+            self.plan_cache.store(question, answer, time.perf_counter() - started, namespace=model_provider)
+        return {"answer": answer}
+
+    async def _run_item(self, index: int, item: dict, model_provider: str, semaphore: asyncio.Semaphore) -> dict:
+        question = item_question(item)
+        result = {"index": index, "request_id": item.get("request_id")}
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                if not question:
+                    raise ValueError("item has no question, title or body")
+                key = (model_provider, normalize_text(question))
+                result.update(await self._runs.ado(key, lambda: self._plan(question, model_provider)))
+                result["status"] = "ok"
+            except Overloaded as e:
+                result.update({"status": "error", "error": str(e), "retry_after": e.retry_after})
+            except Exception as e:
+                result.update({"status": "error", "error": str(e)})
+            result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return result
+
+    async def run(self, items: List[dict], model_provider: Optional[str] = None,
+                  max_concurrency: Optional[int] = None) -> AsyncIterator[dict]:
+        """Yield one result per item in completion order, then a summary"""
+        model_provider = model_provider or self.graph_registry.default_provider
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+        started = time.perf_counter()
+        tasks = [asyncio.ensure_future(self._run_item(index, item, model_provider, semaphore))
+                 for index, item in enumerate(items)]
+        failed = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                failed += result["status"] != "ok"
+                yield result
+        finally:
+            for task in tasks:
+                task.cancel()
+        elapsed = time.perf_counter() - started
+        yield {"summary": {
+            "items": len(items),
+            "failed": failed,
+            "elapsed_ms": round(elapsed * 1000, 2),
+            "plans_per_minute": round(len(items) / elapsed * 60, 2) if elapsed else 0.0,
+        }}
+
+
+async def run_batch(path: str, model_provider: Optional[str], concurrency: int, output) -> None:
+    with open(path, "r", encoding="utf-8") as file:
+        items = read_items(file)
+    config = load_config()
+    graph_registry = GraphRegistry(default_provider=model_provider or "groq")
+    runner = BatchRunner(graph_registry, PlanCache.from_config(config.get("plan_cache", {})), concurrency)
+    async for result in runner.run(items):
+        output.write(json.dumps(result, ensure_ascii=False) + "\n")
+        output.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plan every trip request of a JSONL file")
+    parser.add_argument("requests", help="JSONL file with one request per line")
+    parser.add_argument("--provider", choices=["groq", "openai"], default=None, help="LLM provider")
+    parser.add_argument("--concurrency", type=int, default=load_config().get("batch", {}).get("max_concurrency", 4),
+                        help="Plans generated at the same time")
+    parser.add_argument("--output", default=None, help="Write results here instead of stdout")
+    args = parser.parse_args()
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        asyncio.run(run_batch(args.requests, args.provider, args.concurrency, output))
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
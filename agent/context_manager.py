@@ -0,0 +1,133 @@
+import re
+import json
+import threading
+from typing import List, Tuple
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+
+NOISE_LINE = re.compile(r"^\s*(google place id|phone|website|url|place_id|icon|photo_reference)\b", re.IGNORECASE)
+
+
+def estimate_tokens(message) -> int:
+    """Rough token count (~4 characters per token), cheap enough to run on every turn"""
+    content = message.content if isinstance(message, BaseMessage) else message
+    if not isinstance(content, str):
+        content = json.dumps(content, ensure_ascii=False, default=str)
+    tokens = len(content) // 4 + 1
+    if isinstance(message, AIMessage) and message.tool_calls:
+        tokens += len(json.dumps(message.tool_calls, default=str)) // 4
+    return tokens
+
+
+def _shrink(value, max_items: int = 5, max_chars: int = 200):
+    if isinstance(value, dict):
+        return {key: _shrink(item, max_items, max_chars) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_shrink(item, max_items, max_chars) for item in value[:max_items]]
+    if isinstance(value, str) and len(value) > max_chars:
+        return value[:max_chars] + "…"
+    return value
+
+
+def compact_tool_output(content: str, max_tokens: int) -> str:
+    """
+    Compact a large tool result into at most ~max_tokens tokens.
+
+    JSON payloads keep their structure with long lists and strings shortened; text
+    payloads drop provider noise (place ids, phone numbers, URLs) and blank lines
+    before being cut at a line boundary.
+    """
+    max_chars = max_tokens * 4
+    try:
+        parsed = json.loads(content)
+    except (TypeError, ValueError):
+        parsed = None
+    if isinstance(parsed, (dict, list)):
+        compacted = json.dumps(_shrink(parsed), ensure_ascii=False)
+    else:
+        lines = [line.strip() for line in str(content).splitlines()]
+        compacted = "\n".join(line for line in lines if line and not NOISE_LINE.match(line))
+    if len(compacted) <= max_chars:
+        return compacted
+    cut = compacted.rfind("\n", 0, max_chars)
+    cut = cut if cut > max_chars // 2 else max_chars
+    return compacted[:cut] + f"\n[... {len(compacted) - cut} characters omitted]"
+
+
+class ContextManager:
+    """
+    Bounds the prompt sent to the LLM on each ReAct turn.
+
+    Works on a copy of the conversation, so the graph state keeps the raw tool output:
+      1. results of a tool call repeated later with the same arguments are replaced by a stub,
+      2. tool results larger than max_tool_result_tokens are compacted,
+      3. if the prompt is still above max_prompt_tokens, older tool results (never those of
+         the latest turn) are cut down to a short stub, oldest first.
+    AI messages and their tool call ids are left intact, so tool calls stay paired.
+    """
+    def __init__(self, max_prompt_tokens: int = 6000, max_tool_result_tokens: int = 600, stub_tokens: int = 60):
+        self.max_prompt_tokens = max_prompt_tokens
+        self.max_tool_result_tokens = max_tool_result_tokens
+        self.stub_tokens = stub_tokens
+        self.turns = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, context_config: dict) -> "ContextManager":
+        return cls(
+            max_prompt_tokens=context_config.get("max_prompt_tokens", 6000),
+            max_tool_result_tokens=context_config.get("max_tool_result_tokens", 600),
+            stub_tokens=context_config.get("stub_tokens", 60),
+        )
+
+    @staticmethod
+    def _replace(message: ToolMessage, content: str) -> ToolMessage:
+        return message.model_copy(update={"content": content})
+
+    def prepare(self, system_prompt: BaseMessage, messages: List[BaseMessage]) -> Tuple[List[BaseMessage], int]:
+        """Return the messages to send to the LLM and the number of tokens saved"""
+        call_keys, latest_call = {}, {}
+        last_tool_turn = -1
+        for index, message in enumerate(messages):
+            if isinstance(message, AIMessage) and message.tool_calls:
+                last_tool_turn = index
+                for call in message.tool_calls:
+                    call_keys[call["id"]] = (call["name"], json.dumps(call["args"], sort_keys=True, default=str))
+            elif isinstance(message, ToolMessage) and message.tool_call_id in call_keys:
+                latest_call[call_keys[message.tool_call_id]] = message.tool_call_id
+
+        prepared = []
+        for message in messages:
+            if isinstance(message, ToolMessage):
+                key = call_keys.get(message.tool_call_id)
+                if key is not None and latest_call.get(key) != message.tool_call_id:
+                    message = self._replace(message, f"[superseded by a later {message.name} call with the same arguments]")
+                elif estimate_tokens(message) > self.max_tool_result_tokens:
+                    message = self._replace(message, compact_tool_output(message.content, self.max_tool_result_tokens))
+            prepared.append(message)
+
+        total = estimate_tokens(system_prompt) + sum(estimate_tokens(message) for message in prepared)
+        for index, message in enumerate(prepared):
+            if total <= self.max_prompt_tokens or index > last_tool_turn:
+                break
+            if isinstance(message, ToolMessage) and estimate_tokens(message) > self.stub_tokens:
+                stub = self._replace(message, compact_tool_output(message.content, self.stub_tokens))
+                total -= estimate_tokens(message) - estimate_tokens(stub)
+                prepared[index] = stub
+
+        before = sum(estimate_tokens(message) for message in messages)
+        after = sum(estimate_tokens(message) for message in prepared)
+        with self._lock:
+            self.turns += 1
+            self.tokens_before += before
+            self.tokens_after += after
+        return [system_prompt] + prepared, before - after
+
+    def stats(self) -> dict:
+        return {
+            "turns": self.turns,
+            "tokens_before": self.tokens_before,
+            "tokens_after": self.tokens_after,
+            "tokens_saved": self.tokens_before - self.tokens_after,
+        }
@@ -0,0 +1,168 @@
+import time
+import asyncio
+import hashlib
+import threading
+from typing import Dict, List, Optional, Tuple
+from agent.agentic_workflow import GraphBuilder
+from utils.config_loader import load_config
+from utils.http_client import HttpClient, set_http_client
+from logger.logging import get_logger
+
+logger = get_logger("graph_registry")
+
+
+class GraphRegistry:
+    """
+    Keeps one compiled agent graph per model provider for the lifetime of the app.
+
+    Building a graph loads the config, creates the LLM client, sets up every tool
+    wrapper and compiles the StateGraph, so it is done once per provider and the
+    compiled graph is shared by all requests. When a checkpointer is set, a second
+    compilation of the same builder serves multi-turn sessions.
+    """
+    def __init__(self, default_provider: str = "groq"):
+        self.default_provider = default_provider
+        self._graphs: Dict[str, object] = {}
+        self._builders: Dict[str, GraphBuilder] = {}
+        self._build_seconds: Dict[str, float] = {}
+        self._png_cache: Dict[str, Tuple[bytes, str]] = {}
+        self._session_graphs: Dict[str, object] = {}
+        self.checkpointer = None
+        self.drain_poll_seconds = 0.5
+        self._retired_http_clients: List[HttpClient] = []
+        self._drain_task: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+
+    def preload_providers(self) -> List[str]:
+        """Providers to build at startup, as listed in config/config.yaml"""
+        providers = load_config().get("app", {}).get("preload_providers")
+        return list(providers) if providers else [self.default_provider]
+
+    def build(self, model_provider: str):
+        """Build and compile the graph for a provider and swap it into the registry"""
+        started = time.perf_counter()
+        graph = GraphBuilder(model_provider=model_provider)
+        react_app = graph()
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._graphs[model_provider] = react_app
+            self._builders[model_provider] = graph
+            self._build_seconds[model_provider] = elapsed
+            self._png_cache.pop(model_provider, None)
+            self._session_graphs.pop(model_provider, None)
+        logger.info("graph built", extra={"fields": {"model_provider": model_provider, "build_seconds": round(elapsed, 3)}})
+        return react_app
+
+    def warm_up(self) -> None:
+        """Build the graphs of all preloaded providers not built yet (a request may have built one first)"""
+        for model_provider in self.preload_providers():
+            with self._build_lock:
+                if model_provider not in self._graphs:
+                    self.build(model_provider)
+
+    def ready(self) -> bool:
+        return all(provider in self._graphs for provider in self.preload_providers())
+
+    def get(self, model_provider: Optional[str] = None):
+        """Return the compiled graph for a provider, building it on first use"""
+        model_provider = model_provider or self.default_provider
+        react_app = self._graphs.get(model_provider)
+        if react_app is None:
+            with self._build_lock:
+                react_app = self._graphs.get(model_provider) or self.build(model_provider)
+        return react_app
+
+    def session_graph(self, model_provider: Optional[str] = None):
+        """Return the provider's graph compiled with the session checkpointer"""
+        if self.checkpointer is None:
+            raise RuntimeError("sessions are disabled (sessions.enabled in config.yaml)")
+        model_provider = model_provider or self.default_provider
+        react_app = self._session_graphs.get(model_provider)
+        if react_app is None:
+            self.get(model_provider)
+            with self._lock:
+                react_app = self._session_graphs.get(model_provider)
+                if react_app is None:
+                    react_app = self._builders[model_provider].build_graph(checkpointer=self.checkpointer)
+                    self._session_graphs[model_provider] = react_app
+        return react_app
+
+    def reload(self, model_provider: Optional[str] = None) -> List[str]:
+        """
+        Rebuild graphs from the current config without restarting the app.
+
+        Requests already running keep the graph and HTTP client they started with;
+        new requests pick up the rebuilt ones once they have been swapped in. The
+        replaced HTTP client is closed by drain_retired_http_clients().
+        """
+        config = load_config(reload=True)
+        previous = set_http_client(HttpClient.from_config(config.get("http", {})))
+        if previous is not None:
+            with self._lock:
+                self._retired_http_clients.append(previous)
+        if model_provider:
+            providers = [model_provider]
+        else:
+            providers = list(dict.fromkeys(self.preload_providers() + list(self._graphs)))
+        for provider in providers:
+            self.build(provider)
+        return providers
+
+    def drain_retired_http_clients(self) -> None:
+        """Close the HTTP clients replaced by reload() in the background, each once its running calls finish"""
+        if self._drain_task is None or self._drain_task.done():
+            self._drain_task = asyncio.create_task(self._close_retired_http_clients())
+
+    async def _close_retired_http_clients(self) -> None:
+        while True:
+            with self._lock:
+                idle = [client for client in self._retired_http_clients if not client.in_flight]
+                self._retired_http_clients = [client for client in self._retired_http_clients if client.in_flight]
+                draining = bool(self._retired_http_clients)
+            for client in idle:
+                await client.aclose()
+            if not draining:
+                return
+            await asyncio.sleep(self.drain_poll_seconds)
+
+    async def aclose(self) -> None:
+        """Close every retired HTTP client at shutdown, whether or not its calls have finished"""
+        if self._drain_task is not None:
+            self._drain_task.cancel()
+            await asyncio.gather(self._drain_task, return_exceptions=True)
+            self._drain_task = None
+        with self._lock:
+            retired, self._retired_http_clients = self._retired_http_clients, []
+        for client in retired:
+            await client.aclose()
+
+    def graph_png(self, model_provider: Optional[str] = None) -> Tuple[bytes, str]:
+        """
+        Return the Mermaid PNG of a provider's graph and its ETag.
+
+        The diagram is rendered once per compiled graph and kept in memory until
+        the graph is rebuilt, so it never runs on the query path.
+        """
+        model_provider = model_provider or self.default_provider
+        cached = self._png_cache.get(model_provider)
+        if cached is None:
+            png_graph = self.get(model_provider).get_graph().draw_mermaid_png()
+            cached = (png_graph, hashlib.sha256(png_graph).hexdigest()[:32])
+            with self._lock:
+                self._png_cache[model_provider] = cached
+        return cached
+
+    def stats(self) -> dict:
+        return {
+            "default_provider": self.default_provider,
+            "providers": sorted(self._graphs),
+            "build_seconds": dict(self._build_seconds),
+            "sessions": self.checkpointer is not None,
+            "tool_turns": {provider: builder.tool_node.stats() for provider, builder in self._builders.items()},
+            "context": {provider: builder.context_manager.stats() for provider, builder in self._builders.items()},
+            "llm_pool": {provider: builder.llm.stats() for provider, builder in self._builders.items()
+                         if hasattr(builder.llm, "stats")},
+            "planner": {provider: builder.planner.stats() for provider, builder in self._builders.items()
+                        if builder.mode == "planner"},
+        }
@@ -0,0 +1,233 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+import sqlite3
+import threading
+from typing import List, Optional
+from agent.graph_registry import GraphRegistry
+from agent.streaming import PlanStream
+from utils.admission import AdmissionController, Overloaded
+from utils.plan_cache import PlanCache
+from logger.logging import get_logger
+
+logger = get_logger("jobs")
+
+JOB_COLUMNS = ("id", "status", "question", "model_provider", "progress", "answer", "error",
+               "created_at", "started_at", "finished_at")
+
+
+class JobStore:
+    """
+    SQLite table of plan-generation jobs, so finished plans survive restarts.
+
+    A job moves queued -> running -> succeeded | failed; progress is a small JSON
+    object updated while the graph runs (LLM turns, tool calls started and finished).
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, status TEXT, question TEXT, model_provider TEXT, "
+                "progress TEXT, answer TEXT, error TEXT, created_at REAL, started_at REAL, finished_at REAL)"
+            )
+
+    def create(self, question: str, model_provider: str) -> str:
+        job_id = uuid.uuid4().hex
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, question, model_provider, progress, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, "queued", question, model_provider, json.dumps({}), time.time()),
+            )
+        return job_id
+
+    def update(self, job_id: str, **fields) -> None:
+        if "progress" in fields:
+            fields["progress"] = json.dumps(fields["progress"])
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        with self._lock, self._conn:
+            self._conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(JOB_COLUMNS, row))
+        job["progress"] = json.loads(job["progress"] or "{}")
+        return job
+
+    def unfinished(self) -> List[str]:
+        """Ids of jobs that were queued or running when the process stopped, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM jobs WHERE status IN ('queued', 'running') ORDER BY created_at"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def prune(self, finished_before: float) -> int:
+        """Delete succeeded and failed jobs that finished before the given time"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM jobs WHERE status IN ('succeeded', 'failed') AND finished_at < ?", (finished_before,)
+            )
+        return cursor.rowcount
+
+    def counts(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return dict(rows)
+
+
+class JobQueue:
+    """
+    In-process worker pool that runs queued plans in the background.
+
+    POST /jobs only writes a row and puts its id on an asyncio queue, so the web tier
+    answers immediately; `workers` tasks take ids off the queue and run the graph.
+    Jobs left unfinished by a restart are queued again on start(). Each graph run takes
+    an admission slot, so jobs share the global plan cap with /query; under overload a
+    job waits for a slot instead of failing. Store calls run in a worker thread so the
+    SQLite writes never block the event loop, and finished jobs are deleted once they
+    are older than retention_seconds.
+    """
+    def __init__(self, store: JobStore, graph_registry: GraphRegistry, plan_cache: Optional[PlanCache] = None,
+                 workers: int = 2, max_queue: int = 100, admission: Optional[AdmissionController] = None,
+                 retention_seconds: float = 604800, prune_interval_seconds: float = 3600):
+        self.store = store
+        self.graph_registry = graph_registry
+        self.plan_cache = plan_cache
+        self.admission = admission
+        self.retention_seconds = retention_seconds
+        self.prune_interval_seconds = prune_interval_seconds
+        self.pruned = 0
+        self.workers = workers
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        # Queue slots promised to submits whose row is still being written
+        self._reserved = 0
+        self._tasks: List[asyncio.Task] = []
+
+    @classmethod
+    def from_config(cls, jobs_config: dict, graph_registry: GraphRegistry, plan_cache: Optional[PlanCache] = None,
+                    admission: Optional[AdmissionController] = None) -> "JobQueue":
+        return cls(
+            JobStore(jobs_config.get("path", ".cache/jobs.sqlite")),
+            graph_registry,
+            plan_cache,
+            workers=jobs_config.get("workers", 2),
+            max_queue=jobs_config.get("max_queue", 100),
+            admission=admission,
+            retention_seconds=jobs_config.get("retention_seconds", 604800),
+            prune_interval_seconds=jobs_config.get("prune_interval_seconds", 3600),
+        )
+
+    def start(self) -> None:
+        for job_id in self.store.unfinished():
+            try:
+                self.queue.put_nowait(job_id)
+                self.store.update(job_id, status="queued")
+            except asyncio.QueueFull:
+                self.store.update(job_id, status="failed", error="not resumed after restart: queue full",
+                                  finished_at=time.time())
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._prune_periodically()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, question: str, model_provider: str) -> str:
+        """Enqueue a plan and return its job id; raises asyncio.QueueFull when the queue is full"""
+        # Reserve the slot before awaiting the write, so concurrent submits cannot overfill the queue
+        if self.queue.qsize() + self._reserved >= self.queue.maxsize:
+            raise asyncio.QueueFull()
+        self._reserved += 1
+        try:
+            job_id = await asyncio.to_thread(self.store.create, question, model_provider)
+        finally:
+            self._reserved -= 1
+        self.queue.put_nowait(job_id)
+        return job_id
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    async def _update(self, job_id: str, **fields) -> None:
+        await asyncio.to_thread(self.store.update, job_id, **fields)
+
+    async def _prune_periodically(self) -> None:
+        while True:
+            try:
+                self.pruned += await asyncio.to_thread(self.store.prune, time.time() - self.retention_seconds)
+            except sqlite3.Error as e:
+                logger.warning("job pruning failed", extra={"fields": {"error": str(e)}})
+            await asyncio.sleep(self.prune_interval_seconds)
+
+    async def _admit(self):
+        while True:
+            try:
+                return await self.admission.admit()
+            except Overloaded as e:
+                await asyncio.sleep(e.retry_after)
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self.queue.get()
+            try:
+                await self._run(job_id)
+            finally:
+                self.queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        job = await self.get(job_id)
+        if job is None:
+            return
+        question, model_provider = job["question"], job["model_provider"]
+        started = time.perf_counter()
+        await self._update(job_id, status="running", started_at=time.time())
+        try:
+            cached = self.plan_cache.lookup(question, namespace=model_provider) if self.plan_cache is not None else None
+            if cached is not None:
+                await self._update(job_id, status="succeeded", answer=cached[0], finished_at=time.time(),
+                                  progress={"cache": cached[1]})
+                return
+
+            admission = await self._admit() if self.admission is not None else None
+            try:
+                react_app = await asyncio.to_thread(self.graph_registry.get, model_provider)
+                progress = {"llm_turns": 0, "tool_calls_started": 0, "tool_calls_finished": 0, "last_tool": None}
+                plan_stream = PlanStream(react_app, {"messages": [question]})
+                async for event, data in plan_stream.events():
+                    if event == "tool_start":
+                        progress["tool_calls_started"] += 1
+                        progress["last_tool"] = data["name"]
+                    elif event == "tool_end":
+                        progress["tool_calls_finished"] += 1
+                    else:
+                        continue
+                    progress["llm_turns"] = plan_stream.turns
+                    await self._update(job_id, progress=progress)
+            finally:
+                if admission is not None:
+                    admission.release()
+
+            progress["llm_turns"] = plan_stream.turns
+            await self._update(job_id, status="succeeded", answer=plan_stream.answer, progress=progress,
+                              finished_at=time.time())
+            if self.plan_cache is not None and plan_stream.answer:
+                self.plan_cache.store(question, plan_stream.answer, time.perf_counter() - started, namespace=model_provider)
+        except Exception as e:
+            logger.error("job failed", extra={"fields": {"job_id": job_id, "error": str(e)}})
+            await self._update(job_id, status="failed", error=str(e), finished_at=time.time())
+
+    def stats(self) -> dict:
+        return {"workers": self.workers, "queued": self.queue.qsize(), "jobs": self.store.counts(), "pruned": self.pruned}
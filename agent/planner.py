@@ -0,0 +1,117 @@
+import uuid
+from typing import List, Optional
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from utils.query_parser import TripRequest, parse_trip_request
+from logger.logging import get_logger
+
+logger = get_logger("planner")
+
+DESTINATION_TOOLS = [
+    "get_current_weather", "get_weather_forecast",
+    "search_attractions", "search_restaurants", "search_activities", "search_transportation",
+]
+
+
+class PrefetchPlanner:
+    """
+    Planner mode of the agent graph.
+
+    Parses the question (destinations, dates, currency) and, before the LLM runs, issues
+    every data-gathering tool call the system prompt needs as one synthetic AI turn. The
+    calls run concurrently on the tool node, so the LLM usually writes the itinerary in a
+    single call. When the parser finds no destination and a fast extractor model is
+    configured, that model is asked for the trip details instead; questions neither can
+    place fall through to the plain ReAct loop.
+    """
+    def __init__(self, tool_node, max_destinations: int = 3, base_currency: str = "USD", extractor_llm=None):
+        self.tool_node = tool_node
+        self.extractor = extractor_llm.with_structured_output(TripRequest) if extractor_llm is not None else None
+        self.max_destinations = max_destinations
+        self.base_currency = base_currency
+        self.planned = 0
+        self.fallbacks = 0
+
+    @classmethod
+    def from_config(cls, tool_node, planner_config: dict, extractor_llm=None) -> "PrefetchPlanner":
+        return cls(
+            tool_node,
+            max_destinations=planner_config.get("max_destinations", 3),
+            base_currency=planner_config.get("base_currency", "USD"),
+            extractor_llm=extractor_llm,
+        )
+
+    def tool_calls(self, trip: TripRequest) -> List[dict]:
+        """Tool calls covering weather, places and currency for the parsed trip"""
+        calls = []
+        for destination in trip.destinations[:self.max_destinations]:
+            for name in DESTINATION_TOOLS:
+                arg = "city" if "weather" in name else "place"
+                calls.append({"name": name, "args": {arg: destination.title()}})
+        if calls and trip.currency and trip.currency != self.base_currency:
+            calls.append({"name": "convert_currency",
+                          "args": {"amount": 1, "from_currency": self.base_currency, "to_currency": trip.currency}})
+        return [
+            {**call, "id": f"prefetch_{uuid.uuid4().hex[:12]}", "type": "tool_call"}
+            for call in calls if call["name"] in self.tool_node.tools_by_name
+        ]
+
+    @staticmethod
+    def _question(state) -> Optional[str]:
+        messages = state["messages"]
+        if len(messages) != 1 or not isinstance(messages[0], HumanMessage):
+            return None
+        return messages[0].content
+
+    def _plan(self, trip: Optional[TripRequest]) -> Optional[AIMessage]:
+        calls = self.tool_calls(trip) if trip is not None else []
+        if not calls:
+            self.fallbacks += 1
+            return None
+        self.planned += 1
+        details = trip.model_dump(exclude_none=True, exclude_defaults=True)
+        return AIMessage(content=f"Gathering destination data for {details}", tool_calls=calls,
+                         response_metadata={"source": "prefetch"})
+
+    def _extract(self, question: str) -> TripRequest:
+        trip = parse_trip_request(question)
+        if trip.destinations or self.extractor is None:
+            return trip
+        try:
+            return self.extractor.invoke(question)
+        except Exception as e:
+            logger.warning("trip extraction with the fast model failed", extra={"fields": {"error": str(e)}})
+            return trip
+
+    async def _aextract(self, question: str) -> TripRequest:
+        trip = parse_trip_request(question)
+        if trip.destinations or self.extractor is None:
+            return trip
+        try:
+            return await self.extractor.ainvoke(question)
+        except Exception as e:
+            logger.warning("trip extraction with the fast model failed", extra={"fields": {"error": str(e)}})
+            return trip
+
+    def prefetch(self, state, config: RunnableConfig):
+        """Issue the planned tool calls and run them, or leave the state untouched"""
+        question = self._question(state)
+        plan = self._plan(self._extract(question)) if question is not None else None
+        if plan is None:
+            return {"messages": []}
+        results = self.tool_node.invoke_node({"messages": [plan]}, config)
+        return {"messages": [plan, *results["messages"]]}
+
+    async def aprefetch(self, state, config: RunnableConfig):
+        question = self._question(state)
+        plan = self._plan(await self._aextract(question)) if question is not None else None
+        if plan is None:
+            return {"messages": []}
+        results = await self.tool_node.ainvoke_node({"messages": [plan]}, config)
+        return {"messages": [plan, *results["messages"]]}
+
+    def as_runnable(self) -> RunnableLambda:
+        return RunnableLambda(self.prefetch, afunc=self.aprefetch, name="prefetch")
+
+    def stats(self) -> dict:
+        return {"planned": self.planned, "fallbacks": self.fallbacks}
@@ -0,0 +1,136 @@
+import os
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from logger.logging import get_logger
+
+logger = get_logger("sessions")
+
+
+@asynccontextmanager
+async def open_checkpointer(sessions_config: dict) -> AsyncIterator[Optional[AsyncSqliteSaver]]:
+    """
+    SQLite checkpointer holding the graph state of every session (thread_id), or None
+    when sessions are disabled. A follow-up on the same thread_id resumes from the
+    stored conversation, tool results included, instead of planning from scratch.
+    """
+    if not sessions_config.get("enabled", True):
+        yield None
+        return
+    path = sessions_config.get("path", ".cache/sessions.sqlite")
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    async with AsyncSqliteSaver.from_conn_string(path) as checkpointer:
+        await checkpointer.setup()
+        yield checkpointer
+
+
+def session_config(thread_id: Optional[str]) -> Optional[dict]:
+    """Run config selecting a session's checkpoints, or None for a one-off plan"""
+    return {"configurable": {"thread_id": thread_id}} if thread_id else None
+
+
+class SessionStore:
+    """
+    Session threads in the checkpointer, scoped to the client that opened them.
+
+    Thread ids are issued by the server with a client's first plan, and the checkpoint
+    thread is "<client>/<thread_id>", so another client cannot read or extend it.
+    Requests on one thread run one at a time, and threads idle for longer than
+    ttl_seconds are deleted by a background task.
+    """
+    def __init__(self, checkpointer: AsyncSqliteSaver, ttl_seconds: float = 86400, prune_interval_seconds: float = 3600):
+        self.checkpointer = checkpointer
+        self.ttl_seconds = ttl_seconds
+        self.prune_interval_seconds = prune_interval_seconds
+        self.pruned = 0
+        self._locks: Dict[str, list] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_config(cls, sessions_config: dict, checkpointer: Optional[AsyncSqliteSaver]) -> Optional["SessionStore"]:
+        if checkpointer is None:
+            return None
+        return cls(checkpointer, sessions_config.get("ttl_seconds", 86400),
+                   sessions_config.get("prune_interval_seconds", 3600))
+
+    @staticmethod
+    def thread_key(client: str, thread_id: str) -> str:
+        return f"{client}/{thread_id}"
+
+    async def _execute(self, sql: str, parameters: tuple = ()) -> List[tuple]:
+        async with self.checkpointer.lock:
+            cursor = await self.checkpointer.conn.execute(sql, parameters)
+            rows = await cursor.fetchall()
+            await self.checkpointer.conn.commit()
+        return rows
+
+    async def setup(self) -> None:
+        await self._execute("CREATE TABLE IF NOT EXISTS session_threads (thread_id TEXT PRIMARY KEY, updated_at REAL)")
+        # Threads checkpointed before last-use times were kept expire one ttl from now
+        await self._execute("INSERT OR IGNORE INTO session_threads SELECT DISTINCT thread_id, ? FROM checkpoints",
+                            (time.time(),))
+
+    async def exists(self, thread: str) -> bool:
+        return await self.checkpointer.aget_tuple(session_config(thread)) is not None
+
+    async def touch(self, thread: str) -> None:
+        await self._execute("INSERT OR REPLACE INTO session_threads (thread_id, updated_at) VALUES (?, ?)",
+                            (thread, time.time()))
+
+    async def open_thread(self, react_app, thread: str, messages: list) -> None:
+        """Checkpoint a finished one-off plan as the start of a new thread, so it can be refined"""
+        await react_app.aupdate_state(session_config(thread), {"messages": messages}, as_node="agent")
+        await self.touch(thread)
+
+    @asynccontextmanager
+    async def hold(self, thread: str) -> AsyncIterator[None]:
+        """Run one request at a time per thread; the lock is dropped once nobody holds or waits on it"""
+        entry = self._locks.setdefault(thread, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._locks[thread]
+
+    async def prune(self) -> int:
+        """Delete the checkpoints of threads idle for longer than ttl_seconds"""
+        rows = await self._execute("SELECT thread_id FROM session_threads WHERE updated_at < ?",
+                                   (time.time() - self.ttl_seconds,))
+        pruned = 0
+        for (thread,) in rows:
+            if thread in self._locks:
+                continue
+            await self.checkpointer.adelete_thread(thread)
+            await self._execute("DELETE FROM session_threads WHERE thread_id = ?", (thread,))
+            pruned += 1
+        self.pruned += pruned
+        return pruned
+
+    async def _prune_periodically(self) -> None:
+        while True:
+            try:
+                pruned = await self.prune()
+                if pruned:
+                    logger.info("sessions pruned", extra={"fields": {"threads": pruned}})
+            except Exception as e:
+                logger.warning("session pruning failed", extra={"fields": {"error": str(e)}})
+            await asyncio.sleep(self.prune_interval_seconds)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._prune_periodically())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> dict:
+        return {"ttl_seconds": self.ttl_seconds, "active_threads": len(self._locks), "pruned": self.pruned}
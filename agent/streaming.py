@@ -0,0 +1,59 @@
+from typing import AsyncIterator, Optional, Tuple
+from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage
+
+
+class PlanStream:
+    """
+    Runs the compiled graph and yields (event, data) pairs as the plan is produced.
+
+    Events:
+        token       text chunk from the LLM, with the graph step it belongs to
+        tool_start  the LLM asked for a tool call (name, args, id)
+        tool_end    a tool call finished (name, id, status, bytes)
+        final       the answer, only when it was not already streamed as tokens
+        done        the run finished; carries the number of LLM turns
+
+    Tokens of a turn that ends in tool calls are intermediate output, so clients
+    should drop the text of the current step when a tool_start arrives. After the
+    stream is exhausted the final answer is available as .answer, and .tokens_saved
+    holds the prompt tokens the context manager trimmed in this run.
+    """
+    def __init__(self, react_app, inputs: dict, config: Optional[dict] = None):
+        self.react_app = react_app
+        self.inputs = inputs
+        self.config = config
+        self.answer: Optional[str] = None
+        self.turns = 0
+        self.tokens_saved = 0
+
+    async def events(self) -> AsyncIterator[Tuple[str, dict]]:
+        streamed_tokens = False
+        async for mode, payload in self.react_app.astream(self.inputs, config=self.config, stream_mode=["messages", "updates"]):
+            if mode == "messages":
+                chunk, metadata = payload
+                if isinstance(chunk, AIMessageChunk) and metadata.get("langgraph_node") == "agent" and chunk.content:
+                    streamed_tokens = True
+                    yield "token", {"text": chunk.content, "step": metadata.get("langgraph_step")}
+                continue
+
+            for update in payload.values():
+                self.tokens_saved += (update or {}).get("tokens_saved", 0)
+                for message in (update or {}).get("messages", []):
+                    if isinstance(message, AIMessage):
+                        self.turns += 1
+                        if message.tool_calls:
+                            for call in message.tool_calls:
+                                yield "tool_start", {"name": call["name"], "args": call["args"], "id": call["id"]}
+                        else:
+                            self.answer = message.content
+                            if not streamed_tokens:
+                                yield "final", {"answer": self.answer}
+                        streamed_tokens = False
+                    elif isinstance(message, ToolMessage):
+                        yield "tool_end", {
+                            "name": message.name,
+                            "id": message.tool_call_id,
+                            "status": message.status,
+                            "bytes": len(str(message.content).encode("utf-8")),
+                        }
+        yield "done", {"turns": self.turns}
@@ -0,0 +1,177 @@
+import json
+import time
+import asyncio
+import contextvars
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, List, Optional, Tuple
+from langchain_core.messages import ToolMessage
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from langgraph.graph import MessagesState
+from logger.logging import get_logger, span
+from logger.metrics import TOOL_BYTES, TOOL_CACHE, TOOL_LATENCY
+
+logger = get_logger("tool_executor")
+
+
+class ParallelToolNode:
+    """
+    Tool stage of the agent graph.
+
+    Runs every tool call of the last AI message concurrently (bounded by max_concurrency),
+    gives each call its own timeout and returns the ToolMessages in the order the LLM
+    asked for them. Each turn's timings are kept so the gain over running the calls
+    one after another can be measured.
+    """
+    def __init__(self, tools: List, max_concurrency: int = 8, timeout_seconds: float = 30.0, history_size: int = 200):
+        self.tools_by_name = {tool.name: tool for tool in tools}
+        self.max_concurrency = max_concurrency
+        self.timeout_seconds = timeout_seconds
+        self.turn_timings = deque(maxlen=history_size)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="tool")
+
+    @staticmethod
+    def _tool_calls(state: MessagesState) -> List[dict]:
+        return getattr(state["messages"][-1], "tool_calls", None) or []
+
+    @staticmethod
+    def _to_content(output) -> str:
+        if isinstance(output, str):
+            return output
+        try:
+            return json.dumps(output, ensure_ascii=False)
+        except Exception:
+            return str(output)
+
+    def _message(self, call: dict, output=None, error: Optional[str] = None) -> ToolMessage:
+        if error is not None:
+            return ToolMessage(content=f"Error: {error}\n Please fix your mistakes.", name=call["name"],
+                               tool_call_id=call["id"], status="error")
+        return ToolMessage(content=self._to_content(output), name=call["name"], tool_call_id=call["id"])
+
+    @staticmethod
+    def _observe(attrs: dict, message: ToolMessage, status: str, elapsed_ms: float) -> None:
+        """Attach status and payload size to the tool span and update the tool metrics"""
+        payload_bytes = len(str(message.content).encode("utf-8"))
+        attrs.update(status=status, bytes=payload_bytes)
+        TOOL_LATENCY.observe(elapsed_ms / 1000, tool=message.name, status=status)
+        TOOL_BYTES.inc(payload_bytes, tool=message.name)
+        TOOL_CACHE.inc(tool=message.name, result=attrs.get("cache", "none"))
+
+    def _record_turn(self, started: float, timings: List[dict]) -> None:
+        wall_ms = (time.perf_counter() - started) * 1000
+        sum_ms = sum(t["elapsed_ms"] for t in timings)
+        turn = {
+            "tool_calls": len(timings),
+            "wall_ms": round(wall_ms, 2),
+            "sum_ms": round(sum_ms, 2),
+            "speedup": round(sum_ms / wall_ms, 2) if wall_ms else 1.0,
+            "tools": timings,
+        }
+        self.turn_timings.append(turn)
+        logger.debug("tool turn", extra={"fields": {key: turn[key] for key in ("tool_calls", "wall_ms", "sum_ms", "speedup")}})
+
+    async def _arun_call(self, call: dict, semaphore: asyncio.Semaphore, config: RunnableConfig) -> Tuple[ToolMessage, dict]:
+        tool = self.tools_by_name.get(call["name"])
+        async with semaphore:
+            with span(call["name"], "tool") as attrs:
+                started = time.perf_counter()
+                if tool is None:
+                    message, status = self._message(call, error=f"{call['name']} is not a valid tool."), "error"
+                else:
+                    try:
+                        output = await asyncio.wait_for(tool.ainvoke(call["args"], config), timeout=self.timeout_seconds)
+                        message, status = self._message(call, output), "success"
+                    except asyncio.TimeoutError:
+                        message, status = self._message(call, error=f"{call['name']} timed out after {self.timeout_seconds}s"), "timeout"
+                    except Exception as e:
+                        message, status = self._message(call, error=repr(e)), "error"
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                self._observe(attrs, message, status, elapsed_ms)
+        return message, {"name": call["name"], "elapsed_ms": round(elapsed_ms, 2), "status": status}
+
+    async def ainvoke_node(self, state: MessagesState, config: RunnableConfig) -> Dict[str, List[ToolMessage]]:
+        """Run the tool calls of the last AI message concurrently on the event loop"""
+        calls = self._tool_calls(state)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        started = time.perf_counter()
+        results = await asyncio.gather(*(self._arun_call(call, semaphore, config) for call in calls))
+        self._record_turn(started, [timing for _, timing in results])
+        return {"messages": [message for message, _ in results]}
+
+    def _run_call(self, call: dict, config: RunnableConfig, begun: Dict[int, float], index: int) -> Tuple[object, float]:
+        with span(call["name"], "tool") as attrs:
+            started = begun[index] = time.perf_counter()
+            try:
+                output = self.tools_by_name[call["name"]].invoke(call["args"], config)
+            except Exception as e:
+                self._observe(attrs, self._message(call, error=repr(e)), "error", (time.perf_counter() - started) * 1000)
+                raise
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self._observe(attrs, self._message(call, output), "success", elapsed_ms)
+        return output, elapsed_ms
+
+    def _wait_for_call(self, future: Future, begun: Dict[int, float], index: int, turn_started: float) -> Tuple[object, float]:
+        """
+        Result of a pooled call, timed from when it started on a worker rather than from the
+        start of the turn, so a call queued behind others still gets its full timeout. A call
+        that has not started within timeout_seconds of the turn is given up too.
+        """
+        while True:
+            started = begun.get(index)
+            deadline = (turn_started if started is None else started) + self.timeout_seconds
+            try:
+                return future.result(timeout=max(deadline - time.perf_counter(), 0))
+            except FutureTimeoutError:
+                if started is not None or index not in begun:
+                    raise
+
+    def invoke_node(self, state: MessagesState, config: RunnableConfig) -> Dict[str, List[ToolMessage]]:
+        """Run the tool calls of the last AI message concurrently on the bounded thread pool"""
+        calls = self._tool_calls(state)
+        started = time.perf_counter()
+        begun: Dict[int, float] = {}
+        futures = [
+            # copy_context() carries the request trace into the worker thread
+            self._executor.submit(contextvars.copy_context().run, self._run_call, call, config, begun, index)
+            if call["name"] in self.tools_by_name else None
+            for index, call in enumerate(calls)
+        ]
+        messages, timings = [], []
+        for index, (call, future) in enumerate(zip(calls, futures)):
+            status = "success"
+            if future is None:
+                message, status = self._message(call, error=f"{call['name']} is not a valid tool."), "error"
+                elapsed_ms = 0.0
+            else:
+                try:
+                    output, elapsed_ms = self._wait_for_call(future, begun, index, started)
+                    message = self._message(call, output)
+                except FutureTimeoutError:
+                    # A call still waiting for a worker is dropped; one already running cannot be stopped
+                    future.cancel()
+                    message, status = self._message(call, error=f"{call['name']} timed out after {self.timeout_seconds}s"), "timeout"
+                    elapsed_ms = (time.perf_counter() - begun.get(index, started)) * 1000
+                except Exception as e:
+                    message, status = self._message(call, error=repr(e)), "error"
+                    elapsed_ms = (time.perf_counter() - begun.get(index, started)) * 1000
+            messages.append(message)
+            timings.append({"name": call["name"], "elapsed_ms": round(elapsed_ms, 2), "status": status})
+        self._record_turn(started, timings)
+        return {"messages": messages}
+
+    def as_runnable(self) -> RunnableLambda:
+        return RunnableLambda(self.invoke_node, afunc=self.ainvoke_node, name="tools")
+
+    def stats(self) -> dict:
+        """Summary of the recorded tool turns"""
+        turns = list(self.turn_timings)
+        if not turns:
+            return {"turns": 0}
+        return {
+            "turns": len(turns),
+            "avg_tool_calls": round(sum(t["tool_calls"] for t in turns) / len(turns), 2),
+            "avg_wall_ms": round(sum(t["wall_ms"] for t in turns) / len(turns), 2),
+            "avg_sequential_ms": round(sum(t["sum_ms"] for t in turns) / len(turns), 2),
+            "last_turn": turns[-1],
+        }
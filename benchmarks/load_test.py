@@ -0,0 +1,148 @@
+"""
+Load driver for a running TripWise server.
+
+Usage:
+    python -m benchmarks.load_test requests.jsonl --url http://127.0.0.1:8000 \
+        --concurrency 8 --requests 200 --endpoint query --report report.json
+
+Prompts are taken from a requests.jsonl-style file (question, or title and body) and
+cycled until --requests have been sent, with at most --concurrency in flight. Every
+request asks for the server's timing breakdown (X-Debug-Timing), so the report has
+the per-stage (llm, tool, ...) time next to the end-to-end latency percentiles.
+"""
+import sys
+import json
+import time
+import asyncio
+import argparse
+import itertools
+from typing import Dict, List, Optional
+import httpx
+from agent.batch import item_question, read_items
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return round(ordered[index], 2)
+
+
+async def _post_query(client: httpx.AsyncClient, url: str, question: str) -> Dict:
+    response = await client.post(f"{url}/query", json={"question": question})
+    body = response.json()
+    if response.status_code != 200:
+        raise RuntimeError(body.get("error") or response.status_code)
+    return {"timing": body.get("timing"), "cache": body.get("cache")}
+
+
+async def _post_stream(client: httpx.AsyncClient, url: str, question: str, started: float) -> Dict:
+    result: Dict = {"first_token_ms": None, "timing": None}
+    async with client.stream("POST", f"{url}/query/stream", json={"question": question}) as response:
+        event = None
+        async for line in response.aiter_lines():
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+                if event == "token" and result["first_token_ms"] is None:
+                    result["first_token_ms"] = (time.perf_counter() - started) * 1000
+            elif line.startswith("data: ") and event in ("done", "error"):
+                data = json.loads(line[len("data: "):])
+                if event == "error":
+                    raise RuntimeError(data.get("error"))
+                result["timing"] = data.get("timing")
+                result["cache"] = data.get("cache")
+    return result
+
+
+async def run(items: List[dict], url: str, concurrency: int, total: int, endpoint: str, timeout: float) -> Dict:
+    questions = itertools.cycle([item_question(item) for item in items])
+    samples: List[Dict] = []
+    errors: Dict[str, int] = {}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(client: httpx.AsyncClient, question: str):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                if endpoint == "stream":
+                    result = await _post_stream(client, url, question, started)
+                else:
+                    result = await _post_query(client, url, question)
+            except Exception as e:
+                key = type(e).__name__ if not str(e) else str(e)[:80]
+                errors[key] = errors.get(key, 0) + 1
+                return
+            result["latency_ms"] = (time.perf_counter() - started) * 1000
+            samples.append(result)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    headers = {"X-Debug-Timing": "1"}
+    started = time.perf_counter()
+    async with httpx.AsyncClient(timeout=timeout, limits=limits, headers=headers) as client:
+        await asyncio.gather(*(one(client, next(questions)) for _ in range(total)))
+    return report(samples, errors, time.perf_counter() - started, concurrency, endpoint)
+
+
+def report(samples: List[Dict], errors: Dict[str, int], elapsed: float, concurrency: int, endpoint: str) -> Dict:
+    latencies = [sample["latency_ms"] for sample in samples]
+    stages: Dict[str, dict] = {}
+    for sample in samples:
+        for kind, totals in ((sample.get("timing") or {}).get("by_kind") or {}).items():
+            stage = stages.setdefault(kind, {"total_ms": 0.0, "count": 0, "requests": 0})
+            stage["total_ms"] += totals["total_ms"]
+            stage["count"] += totals["count"]
+            stage["requests"] += 1
+    result = {
+        "endpoint": endpoint,
+        "concurrency": concurrency,
+        "requests": len(samples) + sum(errors.values()),
+        "ok": len(samples),
+        "errors": errors,
+        "cache_hits": sum(1 for sample in samples if sample.get("cache")),
+        "elapsed_s": round(elapsed, 2),
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else None,
+        "latency_ms": {
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": round(max(latencies), 2) if latencies else None,
+        },
+        "stages": {
+            kind: {
+                "mean_ms_per_request": round(stage["total_ms"] / stage["requests"], 2),
+                "mean_calls_per_request": round(stage["count"] / stage["requests"], 2),
+            }
+            for kind, stage in sorted(stages.items())
+        },
+    }
+    first_tokens = [sample["first_token_ms"] for sample in samples if sample.get("first_token_ms") is not None]
+    if first_tokens:
+        result["first_token_ms"] = {"p50": percentile(first_tokens, 50), "p95": percentile(first_tokens, 95)}
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive a TripWise server with concurrent /query requests")
+    parser.add_argument("requests", help="JSONL file with one request per line")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--requests", dest="total", type=int, default=None, help="Requests to send (default: one per prompt)")
+    parser.add_argument("--endpoint", choices=["query", "stream"], default="query")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Per-request timeout in seconds")
+    parser.add_argument("--report", default=None, help="Also write the report JSON to this file")
+    args = parser.parse_args()
+    with open(args.requests, "r", encoding="utf-8") as file:
+        items = read_items(file)
+    if not items:
+        sys.exit("No prompts in " + args.requests)
+    result = asyncio.run(run(items, args.url.rstrip("/"), args.concurrency, args.total or len(items), args.endpoint, args.timeout))
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
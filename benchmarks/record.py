@@ -0,0 +1,85 @@
+"""
+Record real /query runs as replay fixtures.
+
+Usage:
+    python -m benchmarks.record requests.jsonl --out benchmarks/fixtures --provider groq --limit 10
+
+Runs each prompt through the real graph (this uses LLM and API quota) and writes one
+JSON fixture per prompt with every LLM turn (message and latency) and every tool call
+(arguments, output and latency). benchmarks.replay.ReplayChatModel plays them back.
+"""
+import os
+import json
+import time
+import asyncio
+import argparse
+from typing import Any, Dict, List
+from uuid import UUID
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import message_to_dict
+from langchain_core.outputs import LLMResult
+from agent.agentic_workflow import GraphBuilder
+from agent.batch import item_question, read_items
+from benchmarks.replay import fixture_key
+
+
+class FixtureRecorder(BaseCallbackHandler):
+    """Callback handler collecting the LLM turns and tool calls of one graph run"""
+    def __init__(self, question: str):
+        self.question = question
+        self.turns: List[dict] = []
+        self.tools: List[dict] = []
+        self._started: Dict[UUID, float] = {}
+        self._tool_inputs: Dict[UUID, dict] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs: Any) -> None:
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        latency_ms = (time.perf_counter() - self._started.pop(run_id, time.perf_counter())) * 1000
+        message = response.generations[0][0].message
+        self.turns.append({"latency_ms": round(latency_ms, 2), "message": message_to_dict(message)})
+
+    def on_tool_start(self, serialized, input_str: str, *, run_id: UUID, inputs=None, **kwargs: Any) -> None:
+        self._started[run_id] = time.perf_counter()
+        self._tool_inputs[run_id] = {"name": (serialized or {}).get("name"), "args": inputs or input_str}
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        latency_ms = (time.perf_counter() - self._started.pop(run_id, time.perf_counter())) * 1000
+        call = self._tool_inputs.pop(run_id, {})
+        content = getattr(output, "content", output)
+        self.tools.append({**call, "output": str(content), "latency_ms": round(latency_ms, 2)})
+
+    def fixture(self, provider: str) -> dict:
+        return {"question": self.question, "provider": provider, "turns": self.turns, "tools": self.tools}
+
+
+async def record(items: List[dict], out_dir: str, provider: str) -> None:
+    os.makedirs(out_dir, exist_ok=True)
+    react_app = GraphBuilder(model_provider=provider)()
+    for item in items:
+        question = item_question(item)
+        recorder = FixtureRecorder(question)
+        started = time.perf_counter()
+        await react_app.ainvoke({"messages": [question]}, config={"callbacks": [recorder]})
+        path = os.path.join(out_dir, f"{fixture_key(question)}.json")
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(recorder.fixture(provider), file, ensure_ascii=False, indent=2)
+        print(f"{path}: {len(recorder.turns)} LLM turns, {len(recorder.tools)} tool calls, "
+              f"{time.perf_counter() - started:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record real graph runs as replay fixtures")
+    parser.add_argument("requests", help="JSONL file with one request per line")
+    parser.add_argument("--out", default="benchmarks/fixtures", help="Fixture directory")
+    parser.add_argument("--provider", choices=["groq", "openai"], default="groq")
+    parser.add_argument("--limit", type=int, default=None, help="Record only the first N prompts")
+    args = parser.parse_args()
+    with open(args.requests, "r", encoding="utf-8") as file:
+        items = read_items(file)[:args.limit]
+    asyncio.run(record(items, args.out, args.provider))
+
+
+if __name__ == "__main__":
+    main()
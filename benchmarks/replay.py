@@ -0,0 +1,80 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+from typing import Any, Dict, List, Optional
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, messages_from_dict
+from langchain_core.outputs import ChatGeneration, ChatResult
+from utils.query_parser import normalize_text
+
+
+def fixture_key(question: str) -> str:
+    return hashlib.sha256(normalize_text(question).encode("utf-8")).hexdigest()[:16]
+
+
+def load_fixtures(directory: str) -> Dict[str, dict]:
+    fixtures = {}
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".json"):
+            with open(os.path.join(directory, name), "r", encoding="utf-8") as file:
+                fixture = json.load(file)
+            fixtures[fixture_key(fixture["question"])] = fixture
+    return fixtures
+
+
+class ReplayChatModel(BaseChatModel):
+    """
+    Chat model that replays the LLM turns recorded by benchmarks.record.
+
+    The fixture is chosen by the question (the first human message); questions that
+    were never recorded are mapped onto a recorded fixture by hash, so any prompt file
+    can drive a load test. Turn n of a run returns the n-th recorded AI message after
+    sleeping for its recorded latency times latency_scale.
+    """
+    fixtures: Dict[str, dict]
+    latency_scale: float = 1.0
+
+    @classmethod
+    def from_directory(cls, directory: str, latency_scale: float = 1.0) -> "ReplayChatModel":
+        fixtures = load_fixtures(directory)
+        if not fixtures:
+            raise ValueError(f"No replay fixtures found in {directory}")
+        return cls(fixtures=fixtures, latency_scale=latency_scale)
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay"
+
+    def bind_tools(self, tools, **kwargs) -> "ReplayChatModel":
+        return self
+
+    def _fixture(self, messages: List[BaseMessage]) -> dict:
+        question = next((str(m.content) for m in messages if isinstance(m, HumanMessage)), "")
+        key = fixture_key(question)
+        if key in self.fixtures:
+            return self.fixtures[key]
+        keys = sorted(self.fixtures)
+        return self.fixtures[keys[int(key, 16) % len(keys)]]
+
+    def _turn(self, messages: List[BaseMessage]) -> dict:
+        turns = self._fixture(messages)["turns"]
+        # The planner's synthetic prefetch turn is not an LLM turn
+        index = sum(1 for m in messages if isinstance(m, AIMessage) and m.response_metadata.get("source") != "prefetch")
+        return turns[min(index, len(turns) - 1)]
+
+    @staticmethod
+    def _result(turn: dict) -> ChatResult:
+        message = messages_from_dict([turn["message"]])[0]
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        turn = self._turn(messages)
+        time.sleep(turn.get("latency_ms", 0) / 1000 * self.latency_scale)
+        return self._result(turn)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        turn = self._turn(messages)
+        await asyncio.sleep(turn.get("latency_ms", 0) / 1000 * self.latency_scale)
+        return self._result(turn)
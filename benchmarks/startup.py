@@ -0,0 +1,96 @@
+"""
+Measure cold-start cost: import time of the app and time until it serves a request.
+
+Usage:
+    python -m benchmarks.startup                  # import-time profile of main.py
+    python -m benchmarks.startup --top 30 --module agent.graph_registry
+    python -m benchmarks.startup --serve --runs 3 # also time process start -> first /health 200
+
+The import profile runs `python -X importtime` in a fresh interpreter and reports the
+total, the most expensive top-level packages (self time summed over their modules)
+and the most expensive individual imports (cumulative time).
+"""
+import os
+import sys
+import time
+import socket
+import argparse
+import statistics
+import subprocess
+from collections import defaultdict
+from typing import Dict, List, Tuple
+import httpx
+
+
+def import_profile(module: str) -> List[Tuple[str, int, int]]:
+    """(module, self_us, cumulative_us) for every import made by `import module`"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def report_imports(module: str, top: int) -> None:
+    rows = import_profile(module)
+    total_us = next((cumulative for name, _, cumulative in rows if name == module), sum(r[1] for r in rows))
+    packages: Dict[str, int] = defaultdict(int)
+    for name, self_us, _ in rows:
+        packages[name.split(".")[0]] += self_us
+    print(f"import {module}: {total_us / 1e6:.3f}s, {len(rows)} modules")
+    print(f"\nTop {top} packages by self time:")
+    for name, self_us in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {self_us / 1e3:9.1f} ms  {name}")
+    print(f"\nTop {top} imports by cumulative time:")
+    for name, _, cumulative_us in sorted(rows, key=lambda row: -row[2])[:top]:
+        print(f"  {cumulative_us / 1e3:9.1f} ms  {name}")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_to_first_request(timeout: float = 120.0) -> float:
+    """Seconds from spawning uvicorn until GET /health first answers 200"""
+    port = _free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--port", str(port)],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=os.environ.copy())
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"server exited with code {process.returncode}")
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1.0).status_code == 200:
+                    return time.perf_counter() - started
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.05)
+        raise TimeoutError(f"no response from the server within {timeout}s")
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile TripWise import time and time to first request")
+    parser.add_argument("--module", default="main", help="Module to profile the import of")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--serve", action="store_true", help="Also time process start to the first served request")
+    parser.add_argument("--runs", type=int, default=3, help="Server starts to time with --serve")
+    args = parser.parse_args()
+    report_imports(args.module, args.top)
+    if args.serve:
+        timings = [time_to_first_request() for _ in range(args.runs)]
+        print(f"\nTime to first request over {args.runs} runs: median {statistics.median(timings):.3f}s, "
+              f"min {min(timings):.3f}s, max {max(timings):.3f}s")
+
+
+if __name__ == "__main__":
+    main()
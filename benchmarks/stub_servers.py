@@ -0,0 +1,144 @@
+"""
+Local stand-ins for the OpenWeatherMap, ExchangeRate-API, Tavily and Google Places APIs.
+
+Usage:
+    python -m benchmarks.stub_servers --port 8765 --latency-ms 80
+
+Every endpoint returns deterministic data derived from the request (the same city
+always gets the same weather), after an optional fixed delay that mimics network
+latency. benchmarks/config.bench.yaml points the app's upstream URLs here.
+"""
+import json
+import time
+import hashlib
+import argparse
+import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+CONDITIONS = ["clear sky", "few clouds", "scattered clouds", "light rain", "overcast clouds"]
+RATES_TO_USD = {"USD": 1.0, "EUR": 0.92, "GBP": 0.79, "INR": 83.2, "JPY": 151.4, "AUD": 1.52,
+                "CAD": 1.36, "CHF": 0.9, "CNY": 7.23, "SGD": 1.35, "AED": 3.67, "THB": 36.5}
+
+
+def _seed(text: str) -> int:
+    return int(hashlib.sha256(text.strip().lower().encode("utf-8")).hexdigest()[:8], 16)
+
+
+def current_weather(city: str) -> dict:
+    seed = _seed(city)
+    temp = 5 + seed % 28
+    return {
+        "name": city,
+        "main": {"temp": temp, "feels_like": temp - 1, "humidity": 40 + seed % 50},
+        "weather": [{"description": CONDITIONS[seed % len(CONDITIONS)]}],
+        "wind": {"speed": round(1 + (seed % 70) / 10, 1)},
+    }
+
+
+def forecast(city: str, count: int = 40) -> dict:
+    seed = _seed(city)
+    start = datetime.datetime(2025, 1, 1)
+    slots = []
+    for i in range(count):
+        slot = start + datetime.timedelta(hours=3 * i)
+        slots.append({
+            "dt_txt": slot.strftime("%Y-%m-%d %H:%M:%S"),
+            "main": {"temp": 5 + (seed + i * 7) % 28},
+            "weather": [{"description": CONDITIONS[(seed + i) % len(CONDITIONS)]}],
+        })
+    return {"city": {"name": city}, "list": slots}
+
+
+def exchange_rates(base: str) -> dict:
+    base = base.upper()
+    if base not in RATES_TO_USD:
+        return {"result": "error", "error-type": "unsupported-code"}
+    rates = {code: round(rate / RATES_TO_USD[base], 6) for code, rate in RATES_TO_USD.items()}
+    return {"result": "success", "base_code": base, "conversion_rates": rates}
+
+
+def tavily_answer(query: str) -> dict:
+    return {"query": query, "answer": f"Offline answer for '{query}': three well-reviewed options, "
+                                      f"open daily, typical cost 20-60 USD per person.", "results": []}
+
+
+def place_results(query: str) -> dict:
+    seed = _seed(query)
+    results = [{
+        "place_id": f"stub-{seed:x}-{i}",
+        "name": f"{query.split(' in ')[-1].title()} place {i + 1}",
+        "rating": round(3.5 + ((seed >> i) % 15) / 10, 1),
+        "price_level": 1 + (seed + i) % 4,
+        "formatted_address": f"{i + 1} Stub Street",
+    } for i in range(5)]
+    return {"status": "OK", "results": results}
+
+
+def place_details(place_id: str) -> dict:
+    return {"status": "OK", "result": {"place_id": place_id, "name": f"Place {place_id}",
+                                       "formatted_address": "1 Stub Street", "website": "https://example.com"}}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    latency_seconds = 0.0
+
+    def _reply(self, status: int, body: dict):
+        time.sleep(self.latency_seconds)
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        parts = [part for part in url.path.split("/") if part]
+        if url.path.endswith("/weather"):
+            return self._reply(200, current_weather(params.get("q", "")))
+        if url.path.endswith("/forecast"):
+            return self._reply(200, forecast(params.get("q", ""), int(params.get("cnt", 40))))
+        if len(parts) >= 2 and parts[-2] == "latest":
+            rates = exchange_rates(parts[-1])
+            return self._reply(200 if rates["result"] == "success" else 404, rates)
+        if url.path.endswith("/place/textsearch/json"):
+            return self._reply(200, place_results(params.get("query", "")))
+        if url.path.endswith("/place/details/json"):
+            return self._reply(200, place_details(params.get("place_id", "")))
+        return self._reply(404, {"error": f"no stub for {url.path}"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if urlparse(self.path).path.rstrip("/").endswith("/search"):
+            return self._reply(200, tavily_answer(body.get("query", "")))
+        return self._reply(404, {"error": f"no stub for {self.path}"})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host: str = "127.0.0.1", port: int = 8765, latency_ms: float = 0.0) -> ThreadingHTTPServer:
+    """Build the stub server; call serve_forever() on the result (or run it in a thread)"""
+    handler = type("Handler", (StubHandler,), {"latency_seconds": latency_ms / 1000})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve offline stubs of the weather, currency and places APIs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay added to every response")
+    args = parser.parse_args()
+    server = serve(args.host, args.port, args.latency_ms)
+    print(f"Stub APIs listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import os
+import sys
+import json
+import time
+import uuid
+import logging
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+_configured = False
+_current_trace: "contextvars.ContextVar[Optional[RequestTrace]]" = contextvars.ContextVar("request_trace", default=None)
+_current_span: "contextvars.ContextVar[Optional[dict]]" = contextvars.ContextVar("trace_span", default=None)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per log line, with the trace id of the current request when there is one"""
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        trace = _current_trace.get()
+        if trace is not None:
+            entry["trace_id"] = trace.trace_id
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["error"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def get_logger(name: str = "tripwise") -> logging.Logger:
+    """
+    Logger writing structured JSON lines to stderr, so stdout stays free for command
+    output (e.g. the JSONL results of agent.batch); the level comes from LOG_LEVEL (default INFO)
+    """
+    global _configured
+    if not _configured:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(JsonFormatter())
+        root = logging.getLogger("tripwise")
+        root.addHandler(handler)
+        root.setLevel(os.environ.get("LOG_LEVEL", "INFO").upper())
+        root.propagate = False
+        _configured = True
+    return logging.getLogger(name if name.startswith("tripwise") else f"tripwise.{name}")
+
+
+class RequestTrace:
+    """Spans recorded while one request is served, kept in a context variable"""
+    def __init__(self, name: str, trace_id: Optional[str] = None):
+        self.name = name
+        self.trace_id = trace_id or uuid.uuid4().hex[:16]
+        self.started = time.perf_counter()
+        self.spans: List[dict] = []
+
+    def elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self.started) * 1000, 2)
+
+    def summary(self) -> Dict[str, Any]:
+        """Timing breakdown: total, time and count per span kind, and every span in start order"""
+        by_kind: Dict[str, dict] = {}
+        for span in self.spans:
+            kind = by_kind.setdefault(span["kind"], {"count": 0, "total_ms": 0.0})
+            kind["count"] += 1
+            kind["total_ms"] = round(kind["total_ms"] + span["duration_ms"], 2)
+        return {
+            "trace_id": self.trace_id,
+            "total_ms": self.elapsed_ms(),
+            "by_kind": by_kind,
+            "spans": sorted(self.spans, key=lambda span: span["start_ms"]),
+        }
+
+
+def start_trace(name: str, trace_id: Optional[str] = None) -> RequestTrace:
+    trace = RequestTrace(name, trace_id)
+    _current_trace.set(trace)
+    return trace
+
+
+def current_trace() -> Optional[RequestTrace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def span(name: str, kind: str, **attrs) -> Iterator[dict]:
+    """
+    Time a block as a span of the current request trace.
+
+    Yields the span's attribute dict so the block (or code it calls, through
+    annotate_span) can add details such as token counts or cache results.
+    """
+    trace = _current_trace.get()
+    started = time.perf_counter()
+    token = _current_span.set(attrs)
+    try:
+        yield attrs
+    finally:
+        _current_span.reset(token)
+        duration_ms = round((time.perf_counter() - started) * 1000, 2)
+        if trace is not None:
+            trace.spans.append({
+                "name": name,
+                "kind": kind,
+                "start_ms": round((started - trace.started) * 1000, 2),
+                "duration_ms": duration_ms,
+                **attrs,
+            })
+        get_logger("trace").debug(name, extra={"fields": {"kind": kind, "duration_ms": duration_ms, **attrs}})
+
+
+def annotate_span(**attrs) -> None:
+    """Add attributes to the innermost open span, if any (e.g. cache="hit" from a cache layer)"""
+    current = _current_span.get()
+    if current is not None:
+        current.update(attrs)
@@ -1,49 +1,482 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from agent.agentic_workflow import GraphBuilder
-from utils.save_to_document import save_document
-from starlette.responses import JSONResponse
+from agent.graph_registry import GraphRegistry
+from agent.streaming import PlanStream
+from agent.batch import BatchRunner
+from agent.jobs import JobQueue
+from agent.sessions import SessionStore, open_checkpointer, session_config
+from utils.http_client import aclose_http_client, get_http_client
+from utils.currency_converter import CurrencyConverter
+from utils.weather_info import WeatherForecastTool
+from utils.plan_cache import PlanCache
+from utils.rate_limiter import ClientRateLimiter, rate_limit_stats
+from utils.admission import AdmissionController, Overloaded
+from logger.logging import current_trace, get_logger, start_trace
+from logger.metrics import ADMISSION_REJECTED, CONTEXT_TOKENS_SAVED, HTTP_LATENCY, HTTP_REQUESTS, REGISTRY
+from utils.config_loader import load_config
+from utils.plugins import LLM_PROVIDERS, TOOLS
+from utils.save_to_document import EXPORT_FORMATS, PlanExporter
+from starlette.background import BackgroundTask
+from starlette.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from contextlib import asynccontextmanager, nullcontext
+from typing import List, Literal, Optional
+import json
+import math
+import asyncio
+import hashlib
+import hmac
 import os
+import time
+import uuid
 import datetime
-from dotenv import load_dotenv
-from pydantic import BaseModel
-load_dotenv()
+from pydantic import BaseModel, Field
+from langchain_core.messages import AIMessage, HumanMessage
 
-app = FastAPI()
+logger = get_logger("api")
+DEBUG_TIMING_HEADER = "x-debug-timing"
+config = load_config()
+api_config = config.get("api", {})
+# Endpoints that start plans, and so are rate limited per client; /query/batch is charged per item
+PLAN_PATHS = {"/query", "/query/stream", "/jobs"}
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the compiled graphs once, before the first request is served
+    started = time.perf_counter()
+    app.state.graph_registry = GraphRegistry(default_provider="groq")
+    app.state.client_limiter = ClientRateLimiter.from_config(api_config.get("rate_limit", {}))
+    app.state.admission = AdmissionController.from_config(api_config.get("admission", {}))
+    app.state.plan_cache = PlanCache.from_config(config.get("plan_cache", {}))
+    app.state.batch_config = config.get("batch", {})
+    app.state.batch_runner = BatchRunner(app.state.graph_registry, app.state.plan_cache,
+                                         app.state.batch_config.get("max_concurrency", 4), app.state.admission)
+    app.state.exporter = PlanExporter.from_config(config.get("export", {}))
+    app.state.job_queue = JobQueue.from_config(config.get("jobs", {}), app.state.graph_registry, app.state.plan_cache,
+                                               app.state.admission)
+    if config.get("app", {}).get("background_warm_up", False):
+        # Serve at once; a plan request arriving first builds its graph on demand
+        app.state.warm_up = asyncio.create_task(asyncio.to_thread(app.state.graph_registry.warm_up))
+    else:
+        await asyncio.to_thread(app.state.graph_registry.warm_up)
+    app.state.job_queue.start()
+    async with open_checkpointer(config.get("sessions", {})) as checkpointer:
+        app.state.graph_registry.checkpointer = checkpointer
+        app.state.sessions = SessionStore.from_config(config.get("sessions", {}), checkpointer)
+        if app.state.sessions is not None:
+            await app.state.sessions.setup()
+            app.state.sessions.start()
+        app.state.startup_seconds = time.perf_counter() - started
+        logger.info("startup finished", extra={"fields": {"startup_seconds": round(app.state.startup_seconds, 3)}})
+        yield
+        await app.state.job_queue.stop()
+        if app.state.sessions is not None:
+            await app.state.sessions.stop()
+    await app.state.graph_registry.aclose()
+    await aclose_http_client()
+
+
+app = FastAPI(lifespan=lifespan)
+
+def hash_key(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+# Only these keys get a bucket of their own; made-up keys would let a caller bypass its IP's limit
+API_KEYS = {hash_key(key.strip()) for key in [*api_config.get("api_keys", []),
+                                      *os.environ.get("TRIPWISE_API_KEYS", "").split(",")] if key.strip()}
+
+# Required as "Authorization: Bearer <token>" on /admin endpoints, which are disabled without one
+ADMIN_TOKEN = os.environ.get("TRIPWISE_ADMIN_TOKEN") or api_config.get("admin_token")
+
+def client_id(request: Request) -> str:
+    """The caller's API key (hashed) when it is a configured one, otherwise its IP address"""
+    api_key = request.headers.get(api_config.get("client_id_header", "X-API-Key"))
+    if api_key and hash_key(api_key) in API_KEYS:
+        return "key:" + hash_key(api_key)
+    forwarded = request.headers.get("x-forwarded-for")
+    if forwarded and api_config.get("trust_forwarded_for", False):
+        return "ip:" + forwarded.split(",")[0].strip()
+    return "ip:" + (request.client.host if request.client else "unknown")
+
+def overloaded_response(status_code: int, error: str, retry_after: float) -> JSONResponse:
+    return JSONResponse(status_code=status_code, content={"error": error},
+                        headers={"Retry-After": str(max(1, math.ceil(retry_after)))})
+
+def plan_graph(request: Request, model_provider: str, thread: Optional[str]):
+    """The compiled graph for a request: checkpointed per thread for sessions, plain otherwise"""
+    registry = request.app.state.graph_registry
+    return registry.session_graph(model_provider) if thread else registry.get(model_provider)
+
+async def session_thread(request: Request, thread_id: Optional[str]):
+    """
+    (checkpoint thread, None) for a follow-up on thread_id, or (None, error response) when
+    it cannot continue; (None, None) for a first request
+    """
+    sessions = request.app.state.sessions
+    if not thread_id:
+        return None, None
+    if sessions is None:
+        return None, JSONResponse(status_code=400, content={"error": "sessions are disabled on this server"})
+    thread = sessions.thread_key(client_id(request), thread_id)
+    if not await sessions.exists(thread):
+        return None, JSONResponse(status_code=404, content={"error": f"thread {thread_id} not found or expired"})
+    return thread, None
+
+async def open_session(request: Request, model_provider: str, messages: list) -> Optional[str]:
+    """Start a session from a finished one-off plan; returns its new thread_id, None when sessions are disabled"""
+    sessions = request.app.state.sessions
+    if sessions is None:
+        return None
+    thread_id = uuid.uuid4().hex
+    react_app = await asyncio.to_thread(request.app.state.graph_registry.session_graph, model_provider)
+    await sessions.open_thread(react_app, sessions.thread_key(client_id(request), thread_id), messages)
+    return thread_id
+
+async def admit_plan(request: Request):
+    """Admission slot for one plan, or None when admission control is disabled; raises Overloaded"""
+    admission = request.app.state.admission
+    return await admission.admit() if admission is not None else None
+
+def charge_client(request: Request, cost: int = 1) -> Optional[JSONResponse]:
+    """Take cost tokens from the caller's bucket; a 429 response with Retry-After when it is empty"""
+    limiter = getattr(request.app.state, "client_limiter", None)
+    retry_after = limiter.allow(client_id(request), cost) if limiter is not None else 0.0
+    if retry_after:
+        ADMISSION_REJECTED.inc(reason="client_rate")
+        return overloaded_response(429, "rate limit exceeded, retry later", retry_after)
+    return None
+
+@app.middleware("http")
+async def limit_clients(request: Request, call_next):
+    """Reject plan requests beyond a client's token-bucket rate with 429 and Retry-After"""
+    if request.method == "POST" and request.url.path in PLAN_PATHS:
+        rejected = charge_client(request)
+        if rejected is not None:
+            return rejected
+    return await call_next(request)
+
+# Declared last so it wraps the other middleware and also traces rejected requests
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Open a trace for every request, log it and record the HTTP metrics"""
+    trace = start_trace(request.url.path, request.headers.get("x-request-id"))
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        response.headers["X-Trace-Id"] = trace.trace_id
+        return response
+    finally:
+        route = request.scope.get("route")
+        path = getattr(route, "path", "unmatched")
+        HTTP_REQUESTS.inc(method=request.method, path=path, status=status)
+        HTTP_LATENCY.observe(trace.elapsed_ms() / 1000, method=request.method, path=path)
+        logger.info("request", extra={"fields": {"method": request.method, "path": path, "status": status,
+                                                  "elapsed_ms": trace.elapsed_ms()}})
+
+def record_tokens_saved(tokens_saved: int) -> None:
+    """Report the prompt tokens the context manager trimmed during one plan"""
+    if tokens_saved:
+        CONTEXT_TOKENS_SAVED.inc(tokens_saved)
+        logger.info("context trimmed", extra={"fields": {"tokens_saved": tokens_saved}})
+
+def timing_requested(request: Request) -> bool:
+    return request.headers.get(DEBUG_TIMING_HEADER, "").lower() in ("1", "true", "yes")
+
+cors_config = api_config.get("cors", {})
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # set specific origins in prod
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=cors_config.get("allow_origins", []),
+    allow_credentials=cors_config.get("allow_credentials", False),
+    allow_methods=cors_config.get("allow_methods", ["GET", "POST"]),
+    allow_headers=cors_config.get("allow_headers", ["*"]),
+    expose_headers=["Retry-After", "X-Trace-Id"],
 )
 class QueryRequest(BaseModel):
     question: str
+    model_provider: Optional[Literal["groq", "openai"]] = None
+    # Session id returned with a plan; follow-ups sending it refine that plan instead of starting over
+    thread_id: Optional[str] = Field(None, min_length=1, max_length=128)
+
+class BatchItem(BaseModel):
+    request_id: Optional[str] = None
+    question: Optional[str] = None
+    title: Optional[str] = None
+    body: Optional[str] = None
+
+class BatchRequest(BaseModel):
+    items: List[BatchItem]
+    model_provider: Optional[Literal["groq", "openai"]] = None
+    max_concurrency: Optional[int] = None
+
+class ExportRequest(BaseModel):
+    answer: str = Field(..., min_length=1, max_length=config.get("export", {}).get("max_answer_chars", 100000))
+    formats: List[Literal["md", "json", "gz"]] = ["md"]
+
+class ReloadRequest(BaseModel):
+    model_provider: Optional[Literal["groq", "openai"]] = None
 
 @app.post("/query")
-async def query_travel_agent(query:QueryRequest):
+async def query_travel_agent(query:QueryRequest, request: Request):
     try:
-        print(query)
-        graph = GraphBuilder(model_provider="groq")
-        react_app=graph()
-        #react_app = graph.build_graph()
+        logger.info("query received", extra={"fields": {"model_provider": query.model_provider, "question_chars": len(query.question)}})
+        thread, error = await session_thread(request, query.thread_id)
+        if error is not None:
+            return error
+        # Follow-ups depend on the session's history, so only first plans use the plan cache
+        plan_cache = request.app.state.plan_cache if thread is None else None
+        model_provider = query.model_provider or request.app.state.graph_registry.default_provider
+        if plan_cache is not None:
+            cached = plan_cache.lookup(query.question, namespace=model_provider)
+            if cached is not None:
+                answer, match = cached
+                response = {"answer": answer, "cache": match}
+                thread_id = await open_session(request, model_provider, [HumanMessage(query.question), AIMessage(answer)])
+                if thread_id:
+                    response["thread_id"] = thread_id
+                if timing_requested(request):
+                    response["timing"] = current_trace().summary()
+                return response
 
-        png_graph = react_app.get_graph().draw_mermaid_png()
-        with open("my_graph.png", "wb") as f:
-            f.write(png_graph)
+        try:
+            admission = await admit_plan(request)
+        except Overloaded as e:
+            return overloaded_response(503, str(e), e.retry_after)
+        try:
+            started = time.perf_counter()
+            react_app = await asyncio.to_thread(plan_graph, request, model_provider, thread)
 
-        print(f"Graph saved as 'my_graph.png' in {os.getcwd()}")
-        # Assuming request is a pydantic object like: {"question": "your text"}
-        messages={"messages": [query.question]}
-        output = react_app.invoke(messages)
+            # Assuming request is a pydantic object like: {"question": "your text"}
+            messages={"messages": [query.question]}
+            # tokens_saved accumulates over a session's turns, so this run saved after minus before
+            tokens_saved_before = 0
+            if thread is None:
+                output = await react_app.ainvoke(messages)
+            else:
+                async with request.app.state.sessions.hold(thread):
+                    state = await react_app.aget_state(session_config(thread))
+                    tokens_saved_before = state.values.get("tokens_saved", 0)
+                    output = await react_app.ainvoke(messages, config=session_config(thread))
+                    await request.app.state.sessions.touch(thread)
+        finally:
+            if admission is not None:
+                admission.release()
+
+        if isinstance(output, dict):
+            record_tokens_saved(output.get("tokens_saved", 0) - tokens_saved_before)
 
         # If result is dict with messages:
         if isinstance(output, dict) and "messages" in output:
             final_output = output["messages"][-1].content  # Last AI response
         else:
             final_output = str(output)
-        
-        return {"answer": final_output}
+
+        if plan_cache is not None:
+            plan_cache.store(query.question, final_output, time.perf_counter() - started, namespace=model_provider)
+        response = {"answer": final_output}
+        thread_id = query.thread_id if thread else await open_session(request, model_provider, output["messages"])
+        if thread_id:
+            response["thread_id"] = thread_id
+        if timing_requested(request):
+            response["timing"] = current_trace().summary()
+        return response
     except Exception as e:
-        return JSONResponse(status_code=500, content={"error": str(e)})
\ No newline at end of file
+        return JSONResponse(status_code=500, content={"error": str(e)})
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.post("/query/stream")
+async def query_travel_agent_stream(query:QueryRequest, request: Request):
+    """Stream the plan as server-sent events: LLM tokens, tool progress and the end of the run"""
+    thread, error = await session_thread(request, query.thread_id)
+    if error is not None:
+        return error
+    plan_cache = request.app.state.plan_cache if thread is None else None
+    model_provider = query.model_provider or request.app.state.graph_registry.default_provider
+    trace = current_trace()
+    include_timing = timing_requested(request)
+    cached = plan_cache.lookup(query.question, namespace=model_provider) if plan_cache is not None else None
+    admission = None
+    if cached is None:
+        try:
+            admission = await admit_plan(request)
+        except Overloaded as e:
+            return overloaded_response(503, str(e), e.retry_after)
+
+    def release():
+        if admission is not None:
+            admission.release()
+
+    async def event_stream():
+        try:
+            if cached is not None:
+                answer, match = cached
+                yield sse_event("final", {"answer": answer, "cache": match})
+                done = {"turns": 0, "cache": match}
+                thread_id = await open_session(request, model_provider, [HumanMessage(query.question), AIMessage(answer)])
+                if thread_id:
+                    done["thread_id"] = thread_id
+                yield sse_event("done", done)
+                return
+
+            started = time.perf_counter()
+            react_app = await asyncio.to_thread(plan_graph, request, model_provider, thread)
+            plan_stream = PlanStream(react_app, {"messages": [query.question]}, session_config(thread))
+            async with request.app.state.sessions.hold(thread) if thread else nullcontext():
+                async for event, data in plan_stream.events():
+                    if event == "done":
+                        data["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+                        if thread:
+                            await request.app.state.sessions.touch(thread)
+                            thread_id = query.thread_id
+                        else:
+                            thread_id = await open_session(request, model_provider,
+                                                           [HumanMessage(query.question), AIMessage(plan_stream.answer or "")])
+                        if thread_id:
+                            data["thread_id"] = thread_id
+                        if include_timing:
+                            data["timing"] = trace.summary()
+                    yield sse_event(event, data)
+
+            record_tokens_saved(plan_stream.tokens_saved)
+            if plan_cache is not None and plan_stream.answer:
+                plan_cache.store(query.question, plan_stream.answer, time.perf_counter() - started, namespace=model_provider)
+        except Exception as e:
+            yield sse_event("error", {"error": str(e)})
+        finally:
+            release()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Also frees the slot when the client disconnects before the stream starts
+        background=BackgroundTask(release),
+    )
+
+@app.post("/query/batch")
+async def query_travel_agent_batch(batch: BatchRequest, request: Request):
+    """Plan a list of trip requests concurrently and stream one JSON line per plan as it finishes"""
+    batch_config = request.app.state.batch_config
+    if len(batch.items) > batch_config.get("max_items", 200):
+        return JSONResponse(status_code=413, content={"error": f"at most {batch_config.get('max_items', 200)} items per batch"})
+    # One token per item, so a batch costs the same as sending its plans one by one
+    rejected = charge_client(request, max(len(batch.items), 1))
+    if rejected is not None:
+        return rejected
+    max_concurrency = min(batch.max_concurrency or batch_config.get("max_concurrency", 4), batch_config.get("max_concurrency", 4))
+    items = [item.model_dump(exclude_none=True) for item in batch.items]
+
+    async def result_lines():
+        async for result in request.app.state.batch_runner.run(items, batch.model_provider, max(max_concurrency, 1)):
+            yield json.dumps(result, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(result_lines(), media_type="application/x-ndjson")
+
+@app.post("/jobs", status_code=202)
+async def create_job(query: QueryRequest, request: Request):
+    """Queue a plan for background generation; poll GET /jobs/{job_id} for progress and the answer"""
+    if query.thread_id:
+        return JSONResponse(status_code=400, content={"error": "thread_id is only supported on /query and /query/stream"})
+    model_provider = query.model_provider or request.app.state.graph_registry.default_provider
+    try:
+        job_id = await request.app.state.job_queue.submit(query.question, model_provider)
+    except asyncio.QueueFull:
+        return JSONResponse(status_code=503, content={"error": "job queue is full, retry later"}, headers={"Retry-After": "30"})
+    return {"job_id": job_id, "status": "queued", "status_url": f"/jobs/{job_id}"}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, request: Request):
+    job = await request.app.state.job_queue.get(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"error": f"job {job_id} not found"})
+    return job
+
+@app.post("/exports", status_code=202)
+async def export_plan(export_request: ExportRequest, request: Request):
+    """Write a plan to disk in the background; the download URLs are valid immediately"""
+    plan_id = request.app.state.exporter.schedule(export_request.answer, list(dict.fromkeys(export_request.formats)))
+    return {"export_id": plan_id, "downloads": {fmt: f"/exports/{plan_id}/{fmt}" for fmt in export_request.formats}}
+
+@app.get("/exports/{export_id}/{fmt}")
+async def download_export(export_id: str, fmt: str, request: Request):
+    """Stream an exported plan from disk"""
+    exporter = request.app.state.exporter
+    path = exporter.path_for(export_id, fmt)
+    if path is None:
+        return JSONResponse(status_code=400, content={"error": f"invalid export id or format (one of {sorted(EXPORT_FORMATS)})"})
+    try:
+        await exporter.wait_for(export_id, fmt)
+    except Exception as e:
+        return JSONResponse(status_code=500, content={"error": str(e)})
+    if not os.path.exists(path):
+        return JSONResponse(status_code=404, content={"error": f"export {export_id}.{fmt} not found"})
+    return FileResponse(path, media_type=EXPORT_FORMATS[fmt][1], filename=os.path.basename(path),
+                        headers={"Cache-Control": "public, max-age=86400, immutable"})
+
+def admin_rejection(request: Request) -> Optional[JSONResponse]:
+    """403 when no admin token is configured, 401 when the request does not carry it"""
+    if not ADMIN_TOKEN:
+        return JSONResponse(status_code=403, content={"error": "admin endpoints are disabled (set TRIPWISE_ADMIN_TOKEN)"})
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8")):
+        return JSONResponse(status_code=401, content={"error": "invalid or missing admin token"},
+                            headers={"WWW-Authenticate": "Bearer"})
+    return None
+
+@app.post("/admin/reload")
+async def reload_graphs(reload_request: ReloadRequest, request: Request):
+    """Rebuild the compiled graphs from the current config without a restart"""
+    rejected = admin_rejection(request)
+    if rejected is not None:
+        return rejected
+    try:
+        providers = await asyncio.to_thread(request.app.state.graph_registry.reload, reload_request.model_provider)
+        request.app.state.graph_registry.drain_retired_http_clients()
+        return {"reloaded": providers, **request.app.state.graph_registry.stats()}
+    except Exception as e:
+        return JSONResponse(status_code=500, content={"error": str(e)})
+
+@app.get("/graph.png")
+async def graph_png(request: Request, model_provider: Optional[Literal["groq", "openai"]] = None):
+    """Serve the Mermaid diagram of the agent graph, rendered once and cached in memory"""
+    try:
+        png_graph, etag = await asyncio.to_thread(request.app.state.graph_registry.graph_png, model_provider)
+        headers = {"ETag": f'"{etag}"', "Cache-Control": "public, max-age=3600"}
+        if request.headers.get("if-none-match") == headers["ETag"]:
+            return Response(status_code=304, headers=headers)
+        return Response(content=png_graph, media_type="image/png", headers=headers)
+    except Exception as e:
+        return JSONResponse(status_code=500, content={"error": str(e)})
+
+@app.get("/metrics")
+async def metrics():
+    """Request, LLM and tool metrics in the Prometheus text format"""
+    return Response(content=REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/health")
+async def health(request: Request):
+    # Reported only when enabled: asking the registry must not import the tool module
+    places = TOOLS.loaded("places")
+    return {
+        "status": "ok",
+        "startup_seconds": request.app.state.startup_seconds,
+        "ready": request.app.state.graph_registry.ready(),
+        **request.app.state.graph_registry.stats(),
+        "caches": {
+            "currency": CurrencyConverter.cache_stats(),
+            "weather": WeatherForecastTool.cache_stats(),
+            "places": places.cache_stats() if places else None,
+        },
+        "plan_cache": request.app.state.plan_cache.stats() if request.app.state.plan_cache else {"enabled": False},
+        "upstream_latency": get_http_client().stats(),
+        "upstream_providers": {"places": places.router_stats() if places else None},
+        "rate_limits": rate_limit_stats(),
+        "admission": request.app.state.admission.stats() if request.app.state.admission else {"enabled": False},
+        "client_rate_limit": request.app.state.client_limiter.stats() if request.app.state.client_limiter else {"enabled": False},
+        "sessions": request.app.state.sessions.stats() if request.app.state.sessions else {"enabled": False},
+        "jobs": request.app.state.job_queue.stats(),
+        "exports": request.app.state.exporter.stats(),
+        "plugins": {"llm_providers": LLM_PROVIDERS.stats(), "tools": TOOLS.stats()},
+    }
@@ -18,7 +18,9 @@ SYSTEM_PROMPT = SystemMessage(
     - Per Day expense budget approximately
     - Weather details
     
-    Use the available tools to gather information and make detailed cost breakdowns.
+    Use the available tools to gather information. For the cost breakdown, call
+    calculate_trip_budget once with every cost line of the plan instead of adding up
+    numbers one by one.
     Provide everything in one comprehensive response formatted in clean Markdown.
     """
 )
\ No newline at end of file
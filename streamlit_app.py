@@ -3,6 +3,7 @@ import requests
 import datetime
 import pandas as pd
 import re
+import json
 
 # Backend API endpoint
 BASE_URL = "https://tripwise-fumv.onrender.com"
@@ -34,6 +35,8 @@ if "last_prompt" not in st.session_state:
     st.session_state.last_prompt = ""
 if "last_plan" not in st.session_state:
     st.session_state.last_plan = ""
+if "thread_id" not in st.session_state:
+    st.session_state.thread_id = ""
 
 # --------- 🧾 Budget Filter & Input Form -----------
 with st.form(key="tripwise_form", clear_on_submit=True):
@@ -60,21 +63,63 @@ def apply_budget_to_prompt(prompt, budget_pref):
     return prompt
 
 # --------- 🧠 Query Function ---------------
-def generate_itinerary(prompt):
+def generate_itinerary(prompt, thread_id=None):
+    """
+    Stream the plan from the backend, rendering it progressively as tokens arrive.
+    A new plan is sent without a thread_id (so the server may answer from its plan
+    cache) and the thread_id it returns is kept; a refinement sends that id, so it
+    reuses the plan and the data already gathered instead of starting over.
+    """
+    status = st.empty()
+    draft = st.empty()
+    plan = ""
     try:
-        with st.spinner("🧠 Crafting your perfect journey..."):
-            response = requests.post(f"{BASE_URL}/query", json={"question": prompt})
-        if response.status_code == 200:
-            plan = response.json().get("answer", "No plan returned.")
+        status.info("🧠 Crafting your perfect journey...")
+        payload = {"question": prompt, "thread_id": thread_id} if thread_id else {"question": prompt}
+        new_thread_id = thread_id
+        with requests.post(f"{BASE_URL}/query/stream", json=payload, stream=True, timeout=(10, 600)) as response:
+            if response.status_code != 200:
+                st.error(f"❌ Failed to generate travel plan. Details: {response.text}")
+                return None
+            event = None
+            for raw_line in response.iter_lines():
+                line = raw_line.decode("utf-8") if raw_line else ""
+                if line.startswith("event:"):
+                    event = line[len("event:"):].strip()
+                    continue
+                if not line.startswith("data:"):
+                    continue
+                data = json.loads(line[len("data:"):])
+                if event == "token":
+                    plan += data["text"]
+                    draft.markdown(plan)
+                elif event == "tool_start":
+                    # Text before a tool call is the agent thinking, not the plan
+                    plan = ""
+                    draft.empty()
+                    status.info(f"🔎 Looking up {data['name'].replace('_', ' ')}...")
+                elif event == "tool_end":
+                    status.info(f"✅ Finished {data['name'].replace('_', ' ')}")
+                elif event == "final":
+                    plan = data["answer"]
+                    draft.markdown(plan)
+                elif event == "done":
+                    new_thread_id = data.get("thread_id", new_thread_id)
+                elif event == "error":
+                    st.error(f"❌ Failed to generate travel plan. Details: {data['error']}")
+                    return None
+        plan = plan or "No plan returned."
+        if not thread_id:
             st.session_state.last_prompt = prompt
-            st.session_state.last_plan = plan
-            return plan
-        else:
-            st.error(f"❌ Failed to generate travel plan. Details: {response.text}")
-            return None
+        st.session_state.thread_id = new_thread_id or ""
+        st.session_state.last_plan = plan
+        return plan
     except Exception as e:
         st.error(f"⚠️ Error: {e}")
         return None
+    finally:
+        status.empty()
+        draft.empty()
 
 # --------- 📤 Main Output ---------------
 if submit_button and user_input.strip():
@@ -113,6 +158,10 @@ if submit_button and user_input.strip():
 # --------- 📎 Extras (Download, Map, etc.) ---------------
 if st.session_state.last_plan:
     itinerary = st.session_state.last_plan
+    if not submit_button:
+        # Shown after a rerun, e.g. once a refinement has replaced the plan
+        st.subheader("🗺️ Your Current Plan")
+        st.markdown(itinerary)
 
 
     # 📄 Download Itinerary
@@ -120,7 +169,16 @@ if st.session_state.last_plan:
 
    
 
-    # 🔁 Regenerate Option
+    # ✏️ Refine Option: a follow-up in the same session, only the change is recomputed
+    with st.form(key="refine_form", clear_on_submit=True):
+        refinement = st.text_input("Refine this plan (e.g. “make day 2 cheaper”, “swap the hotel”):")
+        refine_button = st.form_submit_button("✏️ Refine Plan")
+    if refine_button and refinement.strip() and st.session_state.thread_id:
+        itinerary = generate_itinerary(refinement, st.session_state.thread_id)
+        if itinerary:
+            st.rerun()
+
+    # 🔁 Regenerate Option: a fresh session from the original prompt
     if st.button("🔁 Regenerate Plan"):
         itinerary = generate_itinerary(st.session_state.last_prompt)
         if itinerary:
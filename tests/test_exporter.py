@@ -0,0 +1,23 @@
+import os
+import time
+from utils.save_to_document import PlanExporter
+
+
+def test_prune_removes_old_exports_then_the_oldest_beyond_max_files(tmp_path):
+    exporter = PlanExporter(str(tmp_path), max_age_seconds=3600, max_files=2)
+    paths = [exporter.export(f"plan {i}") for i in range(4)]
+    now = time.time()
+    os.utime(paths[0], (now - 7200, now - 7200))
+    for offset, path in enumerate(paths[1:]):
+        os.utime(path, (now - 100 + offset, now - 100 + offset))
+    assert exporter.prune() == 2
+    assert [os.path.exists(path) for path in paths] == [False, False, True, True]
+
+
+def test_reexport_refreshes_the_age(tmp_path):
+    exporter = PlanExporter(str(tmp_path), max_age_seconds=3600)
+    path = exporter.export("plan")
+    os.utime(path, (time.time() - 7200, time.time() - 7200))
+    exporter.export("plan")
+    assert exporter.prune() == 0
+    assert os.path.exists(path)
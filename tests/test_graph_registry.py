@@ -0,0 +1,38 @@
+import asyncio
+from agent.graph_registry import GraphRegistry
+from utils.http_client import HttpClient
+
+
+def test_retired_http_client_is_closed_once_its_calls_finish():
+    async def drain():
+        registry = GraphRegistry()
+        registry.drain_poll_seconds = 0.01
+        client = HttpClient()
+        client.async_client
+        client.in_flight = 1
+        registry._retired_http_clients.append(client)
+        registry.drain_retired_http_clients()
+        await asyncio.sleep(0.05)
+        still_open = client._async_client is not None
+        client.in_flight = 0
+        await asyncio.sleep(0.05)
+        return still_open, client, registry
+    still_open, client, registry = asyncio.run(drain())
+    assert still_open
+    assert client._async_client is None
+    assert registry._retired_http_clients == []
+
+
+def test_aclose_closes_retired_clients_still_in_use():
+    async def shutdown():
+        registry = GraphRegistry()
+        client = HttpClient()
+        client.async_client
+        client.in_flight = 1
+        registry._retired_http_clients.append(client)
+        registry.drain_retired_http_clients()
+        await registry.aclose()
+        return client, registry
+    client, registry = asyncio.run(shutdown())
+    assert client._async_client is None
+    assert registry._retired_http_clients == []
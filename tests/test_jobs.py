@@ -0,0 +1,26 @@
+import time
+import asyncio
+from agent.jobs import JobQueue, JobStore
+
+
+def test_prune_deletes_only_old_finished_jobs(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite"))
+    old, recent, running = (store.create(question, "groq") for question in ("old", "recent", "running"))
+    store.update(old, status="succeeded", finished_at=time.time() - 100)
+    store.update(recent, status="failed", finished_at=time.time())
+    store.update(running, status="running")
+    assert store.prune(time.time() - 10) == 1
+    assert store.get(old) is None
+    assert store.get(recent)["status"] == "failed"
+    assert store.get(running)["status"] == "running"
+
+
+def test_concurrent_submits_beyond_the_queue_leave_no_rows(tmp_path):
+    async def submit_three():
+        queue = JobQueue(JobStore(str(tmp_path / "jobs.sqlite")), graph_registry=None, max_queue=1)
+        results = await asyncio.gather(*(queue.submit(f"trip {i}", "groq") for i in range(3)), return_exceptions=True)
+        return queue, results
+    queue, results = asyncio.run(submit_three())
+    assert sum(isinstance(result, asyncio.QueueFull) for result in results) == 2
+    assert queue.store.counts() == {"queued": 1}
+    assert queue.queue.qsize() == 1
@@ -0,0 +1,37 @@
+import pytest
+from langchain_core.runnables import RunnableLambda
+from utils.llm_router import LLMEndpoint, LLMRouter
+
+
+class StatusError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+def failing(status_code: int) -> RunnableLambda:
+    def call(_):
+        raise StatusError(status_code)
+    return RunnableLambda(call)
+
+
+def router(first: RunnableLambda) -> LLMRouter:
+    # A negligible weight makes the healthy endpoint the second one tried
+    return LLMRouter([LLMEndpoint("first", weight=1.0), LLMEndpoint("second", weight=1e-12)],
+                     [first, RunnableLambda(lambda _: "ok")])
+
+
+@pytest.mark.parametrize("status_code", [429, 500, 503])
+def test_retryable_errors_fail_over(status_code):
+    pool = router(failing(status_code))
+    assert pool.invoke("hi") == "ok"
+    assert pool.endpoints[0].counters["errors"] == 1
+
+
+def test_bad_request_is_raised_without_failover():
+    pool = router(failing(400))
+    with pytest.raises(StatusError):
+        pool.invoke("hi")
+    assert pool.endpoints[0].counters["not_retried"] == 1
+    assert pool.endpoints[0].breaker.stats()["state"] == "closed"
+    assert pool.endpoints[1].counters["calls"] == 0
@@ -0,0 +1,38 @@
+import json
+import asyncio
+from langchain_core.tools import StructuredTool
+from tools.place_search_tool import PlaceSearchTool
+
+
+def category_tool(category: str) -> StructuredTool:
+    def search(place: str) -> str:
+        if category == "activities":
+            raise RuntimeError("upstream down")
+        return json.dumps({"place": place, "category": category, "results": []})
+
+    async def asearch(place: str) -> str:
+        return search(place)
+
+    return StructuredTool.from_function(func=search, coroutine=asearch, name=f"search_{category}",
+                                        description=f"Search {category} of a place")
+
+
+def place_search(monkeypatch) -> PlaceSearchTool:
+    monkeypatch.setenv("GPLACES_API_KEY", "AIzaTest")
+    monkeypatch.setenv("TAVILY_API_KEY", "test")
+    tool = PlaceSearchTool({"cache": {"places": {"backend": "memory"}}})
+    tool.place_search_tool_list = [category_tool(category) for category in
+                                   ("attractions", "restaurants", "activities", "transportation")]
+    return tool
+
+
+def test_search_all_returns_every_category(monkeypatch):
+    results = place_search(monkeypatch).search_all("Goa")
+    assert list(results) == ["attractions", "restaurants", "activities", "transportation"]
+    assert results["attractions"] == {"place": "Goa", "category": "attractions", "results": []}
+    assert results["activities"] == {"error": "upstream down"}
+
+
+def test_asearch_all_matches_search_all(monkeypatch):
+    tool = place_search(monkeypatch)
+    assert asyncio.run(tool.asearch_all("Goa")) == tool.search_all("Goa")
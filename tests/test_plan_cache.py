@@ -0,0 +1,47 @@
+import pytest
+from utils.plan_cache import PlanCache
+
+
+@pytest.fixture
+def cache():
+    plan_cache = PlanCache(similarity_threshold=0.5)
+    plan_cache.store("3 day trip to Goa in December", "december plan", 1.0)
+    return plan_cache
+
+
+def test_same_trip_is_an_exact_hit(cache):
+    assert cache.lookup("3 day trip to Goa in December") == ("december plan", "exact")
+
+
+@pytest.mark.parametrize("question", [
+    "3 day trip to Goa in June",
+    "3 day trip to Goa in December, costs in INR",
+    "3 day trip to Goa in December for $800",
+])
+def test_different_month_currency_or_budget_is_a_miss(cache, question):
+    assert cache.lookup(question) is None
+
+
+def test_different_start_date_is_a_miss():
+    plan_cache = PlanCache(similarity_threshold=0.5)
+    plan_cache.store("3 day trip to Goa starting 2026-01-05", "january plan", 1.0)
+    assert plan_cache.lookup("3 day trip to Goa starting 2026-07-05") is None
+    assert plan_cache.lookup("3 day trip to Goa starting 2026-01-05") == ("january plan", "exact")
+
+
+@pytest.mark.parametrize("question", [
+    "Plan a 3 day trip to Goa and Mumbai",
+    "Plan a 3 day vegetarian trip to Goa for a wheelchair user",
+    "Plan a 3 day trip to Goa with a toddler, no flights",
+])
+def test_added_requirements_are_a_miss(question):
+    plan_cache = PlanCache()
+    plan_cache.store("Plan a 3 day trip to Goa", "goa plan", 1.0)
+    assert plan_cache.lookup(question) is None
+
+
+def test_rephrasing_is_a_semantic_hit():
+    plan_cache = PlanCache()
+    plan_cache.store("Plan a 3 day trip to Goa", "goa plan", 1.0)
+    assert plan_cache.lookup("plan a 3 day trip to goa!") == ("goa plan", "exact")
+    assert plan_cache.lookup("Please plan a 3 day trip to Goa") == ("goa plan", "semantic")
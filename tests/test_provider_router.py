@@ -0,0 +1,126 @@
+import time
+import asyncio
+import pytest
+from utils.provider_router import CircuitBreaker, CircuitOpenError, ProviderRouter
+
+
+def router(**kwargs) -> ProviderRouter:
+    settings = {"hedge_default_seconds": 0.1, "timeout_seconds": 2.0, **kwargs}
+    return ProviderRouter("primary", "fallback", **settings)
+
+
+def answer(value, delay: float = 0.0):
+    def call():
+        time.sleep(delay)
+        return value
+    return call
+
+
+def fail(delay: float = 0.0):
+    def call():
+        time.sleep(delay)
+        raise RuntimeError("upstream down")
+    return call
+
+
+def aanswer(value, delay: float = 0.0, cancelled: list = None):
+    async def call():
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            if cancelled is not None:
+                cancelled.append(value)
+            raise
+        return value
+    return call
+
+
+def afail():
+    async def call():
+        raise RuntimeError("upstream down")
+    return call
+
+
+def test_breaker_half_open_lets_one_probe_through():
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=0.05)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert breaker.state == "half_open" and not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and breaker.times_opened == 2
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_guard_fails_fast_while_the_breaker_is_open():
+    pool = router(failure_threshold=1)
+    guarded = pool.guard("primary", fail())
+    with pytest.raises(RuntimeError):
+        guarded()
+    with pytest.raises(CircuitOpenError):
+        guarded()
+    assert pool.counters["primary"]["rejected"] == 1
+
+
+def test_fast_primary_wins_without_hedging():
+    pool = router()
+    assert pool.call(answer("p"), answer("f")) == ("primary", "p")
+    assert pool.hedged == 0
+
+
+def test_slow_primary_is_hedged_after_the_delay():
+    pool = router()
+    started = time.perf_counter()
+    assert pool.call(answer("p", delay=0.5), answer("f")) == ("fallback", "f")
+    assert 0.08 < time.perf_counter() - started < 0.4
+    assert pool.hedged == 1
+
+
+def test_hedge_delay_follows_the_primary_p95():
+    pool = router(min_samples=5, hedge_min_seconds=0.2, hedge_max_seconds=1.0)
+    assert pool.hedge_delay() == 0.1
+    for seconds in (0.01, 0.02, 0.03, 0.04, 0.5):
+        pool.latency["primary"].record(seconds)
+    assert pool.hedge_delay() == 0.5
+    pool.latency["primary"].record(5.0)
+    assert pool.hedge_delay() == 1.0
+
+
+def test_failed_or_empty_primary_falls_back_at_once():
+    pool = router(hedge_default_seconds=1.0)
+    started = time.perf_counter()
+    assert pool.call(fail(), answer("f")) == ("fallback", "f")
+    assert pool.call(answer([]), answer(["f"])) == ("fallback", ["f"])
+    assert time.perf_counter() - started < 0.5
+    assert pool.counters["primary"]["empty"] == 1 and pool.hedged == 0
+
+
+def test_empty_results_are_returned_when_nothing_better_arrives():
+    assert router().call(answer([]), answer({})) == ("fallback", {})
+
+
+def test_errors_are_raised_when_every_provider_fails():
+    with pytest.raises(RuntimeError, match="upstream down"):
+        router().call(fail(), fail())
+
+
+def test_async_slow_primary_is_hedged_and_cancelled():
+    pool, cancelled = router(), []
+    result = asyncio.run(pool.acall(aanswer("p", delay=1.0, cancelled=cancelled), aanswer("f")))
+    assert result == ("fallback", "f")
+    assert cancelled == ["p"] and pool.hedged == 1
+
+
+def test_async_failed_or_empty_primary_falls_back():
+    pool = router(hedge_default_seconds=1.0)
+    assert asyncio.run(pool.acall(afail(), aanswer("f"))) == ("fallback", "f")
+    assert asyncio.run(pool.acall(aanswer(""), aanswer("f"))) == ("fallback", "f")
+    assert asyncio.run(pool.acall(aanswer(""), aanswer(""))) == ("fallback", "")
+    with pytest.raises(RuntimeError):
+        asyncio.run(pool.acall(afail(), afail()))
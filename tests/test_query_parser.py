@@ -0,0 +1,52 @@
+import pytest
+from utils.query_parser import parse_trip_request
+
+
+@pytest.mark.parametrize("question, destination", [
+    ("I want to visit New York City for a week", "new york city"),
+    ("We are going to explore Kyoto for 5 days", "kyoto"),
+    ("I'd love to go see Rome in spring", "rome"),
+    ("Planning to spend 3 days in Lisbon", "lisbon"),
+    ("Looking to travel to Bali with friends", "bali"),
+])
+def test_verbs_are_not_part_of_the_destination(question, destination):
+    assert parse_trip_request(question).destinations == [destination]
+
+
+def test_months_and_currencies_are_not_destinations():
+    trip = parse_trip_request("Plan a 3 day trip to Goa in December, costs in INR")
+    assert trip.destinations == ["goa"]
+    assert trip.month == 12
+    assert trip.currency == "INR"
+
+
+def test_start_date_sets_the_month():
+    trip = parse_trip_request("Trip to Paris starting 2026-07-05")
+    assert trip.start_date == "2026-07-05"
+    assert trip.month == 7
+
+
+def test_may_is_a_month_only_after_a_preposition():
+    assert parse_trip_request("Trip to Tokyo in May").month == 5
+    assert parse_trip_request("You may like a trip to Tokyo").month is None
+
+
+@pytest.mark.parametrize("question, amount", [
+    ("Trip to Paris with a budget of $1,500", 1500.0),
+    ("Trip to Goa under 50000 INR", 50000.0),
+    ("Trip to Rome for 2k euros", 2000.0),
+    ("Trip to Rome", None),
+])
+def test_budget_amount(question, amount):
+    assert parse_trip_request(question).budget_amount == amount
+
+
+@pytest.mark.parametrize("question, destinations", [
+    ("Plan a 3 day trip to Goa and Mumbai", ["goa", "mumbai"]),
+    ("Trip to Tokyo and Kyoto for 5 days", ["tokyo", "kyoto"]),
+    ("Visit Rome, Florence and Venice in May", ["rome", "florence", "venice"]),
+    ("Plan a trip to Goa and relax on the beach", ["goa"]),
+    ("Go to Bali, with friends", ["bali"]),
+])
+def test_listed_destinations(question, destinations):
+    assert parse_trip_request(question).destinations == destinations
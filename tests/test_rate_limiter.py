@@ -0,0 +1,15 @@
+from utils.rate_limiter import ClientRateLimiter
+
+
+def test_client_limiter_rejects_beyond_burst():
+    limiter = ClientRateLimiter(rate=0.01, burst=2)
+    assert limiter.allow("a") == 0
+    assert limiter.allow("a") == 0
+    assert limiter.allow("a") > 0
+    assert limiter.allow("b") == 0
+
+
+def test_cost_above_burst_is_admitted_once_then_waited_off():
+    limiter = ClientRateLimiter(rate=1.0, burst=5)
+    assert limiter.allow("a", cost=20) == 0
+    assert limiter.allow("a") > 15
@@ -0,0 +1,29 @@
+import time
+from langchain_core.messages import AIMessage
+from langchain_core.tools import StructuredTool
+from agent.tool_executor import ParallelToolNode
+
+
+def nap(seconds: float) -> str:
+    """Sleep for the given number of seconds"""
+    time.sleep(seconds)
+    return "done"
+
+
+def state_with_calls(*seconds):
+    calls = [{"name": "nap", "args": {"seconds": value}, "id": f"call-{index}"} for index, value in enumerate(seconds)]
+    return {"messages": [AIMessage(content="", tool_calls=calls)]}
+
+
+def test_queued_calls_get_their_full_timeout():
+    node = ParallelToolNode([StructuredTool.from_function(nap)], max_concurrency=1, timeout_seconds=0.3)
+    result = node.invoke_node(state_with_calls(0.2, 0.2), {})
+    assert [message.status for message in result["messages"]] == ["success", "success"]
+
+
+def test_timeout_records_the_elapsed_time():
+    node = ParallelToolNode([StructuredTool.from_function(nap)], max_concurrency=2, timeout_seconds=0.2)
+    node.invoke_node(state_with_calls(0.6, 0.05), {})
+    slow, fast = node.turn_timings[-1]["tools"]
+    assert slow["status"] == "timeout" and 150 < slow["elapsed_ms"] < 500
+    assert fast["status"] == "success" and fast["elapsed_ms"] < 150
@@ -1,21 +1,41 @@
 import os
 from utils.currency_converter import CurrencyConverter
-from typing import List
-from langchain.tools import tool
-from dotenv import load_dotenv
+from typing import List, Optional
+from langchain_core.tools import StructuredTool
+from utils.config_loader import load_config
 
 class CurrencyConverterTool:
-    def __init__(self):
-        load_dotenv()
+    def __init__(self, config: Optional[dict] = None):
+        config = config if config is not None else load_config()
+        cache_config = config.get("cache", {}).get("currency", {})
+        CurrencyConverter.configure_cache(cache_config.get("ttl_seconds"), cache_config.get("max_entries"))
         self.api_key = os.environ.get("EXCHANGE_RATE_API_KEY")
-        self.currency_service = CurrencyConverter(self.api_key)
+        self.currency_service = CurrencyConverter(self.api_key, config.get("upstream", {}).get("exchangerate"))
         self.currency_converter_tool_list = self._setup_tools()
 
+    @property
+    def tool_list(self) -> List:
+        return self.currency_converter_tool_list
+
+    @staticmethod
+    def _payload(amount: float, from_currency: str, to_currency: str, converted: float) -> dict:
+        return {
+            "amount": amount,
+            "from": from_currency.upper(),
+            "to": to_currency.upper(),
+            "converted": round(converted, 2),
+            "rate": round(converted / amount, 6) if amount else None,
+        }
+
     def _setup_tools(self) -> List:
         """Setup all tools for the currency converter tool"""
-        @tool
         def convert_currency(amount:float, from_currency:str, to_currency:str):
             """Convert amount from one currency to another"""
-            return self.currency_service.convert(amount, from_currency, to_currency)
-        
-        return [convert_currency]
\ No newline at end of file
+            converted = self.currency_service.convert(amount, from_currency, to_currency)
+            return self._payload(amount, from_currency, to_currency, converted)
+
+        async def aconvert_currency(amount:float, from_currency:str, to_currency:str):
+            converted = await self.currency_service.aconvert(amount, from_currency, to_currency)
+            return self._payload(amount, from_currency, to_currency, converted)
+
+        return [StructuredTool.from_function(func=convert_currency, coroutine=aconvert_currency)]
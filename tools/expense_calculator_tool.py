@@ -1,27 +1,39 @@
-from utils.expense_calculator import Calculator
-from typing import List
-from langchain.tools import tool
+import os
+from typing import List, Optional
+from langchain_core.tools import StructuredTool
+from utils.config_loader import load_config
+from utils.currency_converter import CurrencyConverter
+from utils.expense_calculator import BudgetCalculator, CostItem
+from utils.tool_output import cap_output
 
 class CalculatorTool:
-    def __init__(self):
-        self.calculator = Calculator()
+    def __init__(self, config: Optional[dict] = None):
+        config = config if config is not None else load_config()
+        self.max_chars = config.get("tools", {}).get("output", {}).get("max_chars", 1500)
+        currency_service = CurrencyConverter(os.environ.get("EXCHANGE_RATE_API_KEY"), config.get("upstream", {}).get("exchangerate"))
+        self.calculator = BudgetCalculator(currency_service)
         self.calculator_tool_list = self._setup_tools()
 
+    @property
+    def tool_list(self) -> List:
+        return self.calculator_tool_list
+
+    @staticmethod
+    def _items(items: List) -> List[CostItem]:
+        return [item if isinstance(item, CostItem) else CostItem.model_validate(item) for item in items]
+
     def _setup_tools(self) -> List:
         """Setup all tools for the calculator tool"""
-        @tool
-        def estimate_total_hotel_cost(price_per_night:str, total_days:float) -> float:
-            """Calculate total hotel cost"""
-            return self.calculator.multiply(price_per_night, total_days)
-        
-        @tool
-        def calculate_total_expense(*costs: float) -> float:
-            """Calculate total expense of the trip"""
-            return self.calculator.calculate_total(*costs)
-        
-        @tool
-        def calculate_daily_expense_budget(total_cost: float, days: int) -> float:
-            """Calculate daily expense"""
-            return self.calculator.calculate_daily_budget(total_cost, days)
-        
-        return [estimate_total_hotel_cost, calculate_total_expense, calculate_daily_expense_budget]
\ No newline at end of file
+        def calculate_trip_budget(items: List[CostItem], currency: str = "USD", days: Optional[int] = None) -> str:
+            """
+            Price a whole trip cost sheet in one call. Pass every cost line (hotel nights,
+            meals, transport, tickets, ...) with quantity, unit_price, its own currency and
+            the trip days it falls on. Returns the total, per-category and per-day amounts
+            and the per-day average, all converted to `currency`.
+            """
+            return cap_output(self.calculator.calculate(self._items(items), currency, days), self.max_chars)
+
+        async def acalculate_trip_budget(items: List[CostItem], currency: str = "USD", days: Optional[int] = None) -> str:
+            return cap_output(await self.calculator.acalculate(self._items(items), currency, days), self.max_chars)
+
+        return [StructuredTool.from_function(func=calculate_trip_budget, coroutine=acalculate_trip_budget)]
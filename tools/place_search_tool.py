@@ -1,61 +1,179 @@
 import os
+import json
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from utils.place_info_search import GooglePlaceSearchTool, TavilyPlaceSearchTool
-from typing import List
-from langchain.tools import tool
-from dotenv import load_dotenv
+from typing import Dict, List, Optional
+from langchain_core.tools import StructuredTool
+from utils.cache import ResponseCache, make_backend
+from utils.provider_router import ProviderRouter
+from utils.config_loader import load_config
+from utils.tool_output import cap_output, compact_places
 
 class PlaceSearchTool:
-    def __init__(self):
-        load_dotenv()
+    # Provider results are shared by every instance in the process and persisted to disk by default
+    place_cache: Optional[ResponseCache] = None
+    _cache_settings = None
+    # Breakers and latency windows must see every call in the process, so the router is shared too
+    router: Optional[ProviderRouter] = None
+    _router_settings = None
+    _executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="places")
+
+    def __init__(self, config: Optional[dict] = None):
+        config = config if config is not None else load_config()
+        PlaceSearchTool.configure_cache(config.get("cache", {}).get("places", {}))
+        PlaceSearchTool.configure_router(config.get("routing", {}).get("places", {}))
+        output_config = config.get("tools", {}).get("output", {})
+        self.top_k = output_config.get("top_k", 5)
+        self.max_chars = output_config.get("max_chars", 1500)
         self.google_api_key = os.environ.get("GPLACES_API_KEY")
-        self.google_places_search = GooglePlaceSearchTool(self.google_api_key)
-        self.tavily_search = TavilyPlaceSearchTool()
+        upstream = config.get("upstream", {})
+        self.google_places_search = GooglePlaceSearchTool(self.google_api_key, upstream.get("google_places"))
+        self.tavily_api_key = os.environ.get("TAVILY_API_KEY")
+        self.tavily_search = TavilyPlaceSearchTool(self.tavily_api_key, upstream.get("tavily"))
         self.place_search_tool_list = self._setup_tools()
 
-    def _setup_tools(self) -> List:
-        """Setup all tools for the place search tool"""
-        @tool
-        def search_attractions(place:str) -> str:
-            """Search attractions of a place"""
-            try:
-                attraction_result = self.google_places_search.google_search_attractions(place)
-                if attraction_result:
-                    return f"Following are the attractions of {place} as suggested by google: {attraction_result}"
-            except Exception as e:
-                tavily_result = self.tavily_search.tavily_search_attractions(place)
-                return f"Google cannot find the details due to {e}. \nFollowing are the attractions of {place}: {tavily_result}"  ## Fallback search using tavily in case google places fail
-        
-        @tool
-        def search_restaurants(place:str) -> str:
-            """Search restaurants of a place"""
-            try:
-                restaurants_result = self.google_places_search.google_search_restaurants(place)
-                if restaurants_result:
-                    return f"Following are the restaurants of {place} as suggested by google: {restaurants_result}"
-            except Exception as e:
-                tavily_result = self.tavily_search.tavily_search_restaurants(place)
-                return f"Google cannot find the details due to {e}. \nFollowing are the restaurants of {place}: {tavily_result}"  ## Fallback search using tavily in case google places fail
-        
-        @tool
-        def search_activities(place:str) -> str:
-            """Search activities of a place"""
-            try:
-                restaurants_result = self.google_places_search.google_search_activity(place)
-                if restaurants_result:
-                    return f"Following are the activities in and around {place} as suggested by google: {restaurants_result}"
-            except Exception as e:
-                tavily_result = self.tavily_search.tavily_search_activity(place)
-                return f"Google cannot find the details due to {e}. \nFollowing are the activities of {place}: {tavily_result}"  ## Fallback search using tavily in case google places fail
-        
-        @tool
-        def search_transportation(place:str) -> str:
-            """Search transportation of a place"""
+    @property
+    def tool_list(self) -> List:
+        return self.place_search_tool_list
+
+    def search_all(self, place: str) -> Dict[str, dict]:
+        """
+        Runs the attractions, restaurants, activities and transportation searches for a place
+        in parallel through the search_* tools, so every lookup goes through the shared router
+        and cache, and returns their payloads keyed by category. A failed category holds {"error": ...}.
+        """
+        futures = {tool.name.removeprefix("search_"): self._executor.submit(tool.invoke, {"place": place})
+                   for tool in self.tool_list}
+        results = {}
+        for category, future in futures.items():
             try:
-                restaurants_result = self.google_places_search.google_search_transportation(place)
-                if restaurants_result:
-                    return f"Following are the modes of transportation available in {place} as suggested by google: {restaurants_result}"
+                results[category] = json.loads(future.result())
             except Exception as e:
-                tavily_result = self.tavily_search.tavily_search_transportation(place)
-                return f"Google cannot find the details due to {e}. \nFollowing are the modes of transportation available in {place}: {tavily_result}"  ## Fallback search using tavily in case google places fail
-        
-        return [search_attractions, search_restaurants, search_activities, search_transportation]
\ No newline at end of file
+                results[category] = {"error": str(e)}
+        return results
+
+    async def asearch_all(self, place: str) -> Dict[str, dict]:
+        """
+        Async variant of search_all.
+        """
+        answers = await asyncio.gather(*(tool.ainvoke({"place": place}) for tool in self.tool_list),
+                                       return_exceptions=True)
+        return {
+            tool.name.removeprefix("search_"): {"error": str(answer)} if isinstance(answer, Exception) else json.loads(answer)
+            for tool, answer in zip(self.tool_list, answers)
+        }
+
+    @classmethod
+    def configure_cache(cls, cache_config: dict):
+        """Rebuild the shared result cache from the cache.places section of config.yaml"""
+        if cls.place_cache is not None and cache_config == cls._cache_settings:
+            return
+        settings = {"backend": "sqlite", "max_entries": 5000, **cache_config}
+        cls.place_cache = ResponseCache(
+            make_backend(settings, namespace="places"),
+            ttl=settings.get("ttl_seconds", 86400),
+            stale_ttl=settings.get("stale_seconds", 604800),
+        )
+        cls._cache_settings = dict(cache_config)
+
+    @classmethod
+    def cache_stats(cls) -> dict:
+        return cls.place_cache.stats() if cls.place_cache is not None else {}
+
+    @classmethod
+    def configure_router(cls, routing_config: dict):
+        """Rebuild the shared google/tavily router from the routing.places section of config.yaml"""
+        if cls.router is not None and routing_config == cls._router_settings:
+            return
+        cls.router = ProviderRouter.from_config({"primary": "google", "fallback": "tavily", **routing_config})
+        cls._router_settings = dict(routing_config)
+
+    @classmethod
+    def router_stats(cls) -> dict:
+        return cls.router.stats() if cls.router is not None else {}
+
+    @staticmethod
+    def _cache_key(provider: str, category: str, place: str) -> str:
+        # v2: google entries hold raw Places results instead of GooglePlacesTool prose
+        return f"v2:{provider}:{category}:{' '.join(place.strip().lower().split())}"
+
+    def _cached(self, provider: str, category: str, search):
+        def cached_search(place:str):
+            return self.place_cache.get_or_fetch(self._cache_key(provider, category, place), lambda: search(place))
+        return cached_search
+
+    def _acached(self, provider: str, category: str, asearch):
+        async def cached_search(place:str):
+            return await self.place_cache.aget_or_fetch(self._cache_key(provider, category, place), lambda: asearch(place))
+        return cached_search
+
+    def _google_payload(self, place: str, category: str, results: List[dict]) -> str:
+        return cap_output({"place": place, "category": category, "source": "google",
+                           "results": compact_places(results, self.top_k)}, self.max_chars)
+
+    def _tavily_payload(self, place: str, category: str, result) -> str:
+        payload = {"place": place, "category": category, "source": "tavily"}
+        if isinstance(result, dict):
+            payload["results"] = [
+                {"title": item.get("title"), "snippet": (item.get("content") or "")[:200]}
+                for item in result.get("results", [])[:self.top_k]
+            ]
+        else:
+            payload["summary"] = str(result)
+        return cap_output(payload, self.max_chars)
+
+    def _search_tool(self, category: str, description: str, google_search, agoogle_search,
+                     tavily_search, atavily_search) -> StructuredTool:
+        """
+        Build a search tool with sync and async paths that hedges google places with tavily.
+        Tavily starts when google fails, comes back empty or is slower than its p95 (see ProviderRouter).
+        Both providers are read through the shared place cache before going to the network, and the
+        tool returns a compact JSON payload capped at max_chars.
+        """
+        router = self.router
+        google_search = self._cached("google", category, router.guard("google", google_search))
+        agoogle_search = self._acached("google", category, router.aguard("google", agoogle_search))
+        tavily_search = self._cached("tavily", category, router.guard("tavily", tavily_search))
+        atavily_search = self._acached("tavily", category, router.aguard("tavily", atavily_search))
+
+        def payload(place: str, provider: str, result) -> str:
+            if provider == "google":
+                return self._google_payload(place, category, result or [])
+            return self._tavily_payload(place, category, result)
+
+        def search(place:str) -> str:
+            provider, result = router.call(lambda: google_search(place), lambda: tavily_search(place))
+            return payload(place, provider, result)
+
+        async def asearch(place:str) -> str:
+            provider, result = await router.acall(lambda: agoogle_search(place), lambda: atavily_search(place))
+            return payload(place, provider, result)
+
+        return StructuredTool.from_function(func=search, coroutine=asearch, name=f"search_{category}", description=description)
+
+    def _setup_tools(self) -> List:
+        """Setup all tools for the place search tool"""
+        google, tavily = self.google_places_search, self.tavily_search
+
+        search_attractions = self._search_tool(
+            "attractions", "Search attractions of a place",
+            google.google_search_attractions, google.agoogle_search_attractions,
+            tavily.tavily_search_attractions, tavily.atavily_search_attractions)
+
+        search_restaurants = self._search_tool(
+            "restaurants", "Search restaurants of a place",
+            google.google_search_restaurants, google.agoogle_search_restaurants,
+            tavily.tavily_search_restaurants, tavily.atavily_search_restaurants)
+
+        search_activities = self._search_tool(
+            "activities", "Search activities of a place",
+            google.google_search_activity, google.agoogle_search_activity,
+            tavily.tavily_search_activity, tavily.atavily_search_activity)
+
+        search_transportation = self._search_tool(
+            "transportation", "Search transportation of a place",
+            google.google_search_transportation, google.agoogle_search_transportation,
+            tavily.tavily_search_transportation, tavily.atavily_search_transportation)
+
+        return [search_attractions, search_restaurants, search_activities, search_transportation]
@@ -0,0 +1,50 @@
+"""
+Pre-warm the place-search cache for the most requested destinations.
+
+Usage:
+    python -m tools.prewarm_places destinations.txt --top 20 --concurrency 4
+
+The destinations file has one place per line, most popular first. Blank lines
+and lines starting with '#' are skipped. Each destination warms all four place
+categories at once through PlaceSearchTool.asearch_all.
+"""
+import time
+import asyncio
+import argparse
+from typing import List
+from tools.place_search_tool import PlaceSearchTool
+
+
+def read_destinations(path: str, top: int) -> List[str]:
+    with open(path, "r", encoding="utf-8") as file:
+        destinations = [line.strip() for line in file if line.strip() and not line.strip().startswith("#")]
+    return list(dict.fromkeys(destinations))[:top]
+
+
+async def prewarm(destinations: List[str], concurrency: int = 4) -> None:
+    place_search = PlaceSearchTool()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def warm(place: str) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            results = await place_search.asearch_all(place)
+            failed = {category: result["error"] for category, result in results.items() if "error" in result}
+            print(f"{place:<30} {(time.perf_counter() - started) * 1000:8.1f}ms"
+                  + (f"  failed: {failed}" if failed else ""))
+
+    await asyncio.gather(*(warm(place) for place in destinations))
+    print(f"Cache stats: {PlaceSearchTool.cache_stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-warm the place-search cache for the top N destinations")
+    parser.add_argument("destinations", help="File with one destination per line, most popular first")
+    parser.add_argument("--top", type=int, default=20, help="Number of destinations to warm")
+    parser.add_argument("--concurrency", type=int, default=4, help="Destinations warmed at once")
+    args = parser.parse_args()
+    asyncio.run(prewarm(read_destinations(args.destinations, args.top), args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,41 +1,50 @@
 import os
 from utils.weather_info import WeatherForecastTool
-from langchain.tools import tool
-from typing import List
-from dotenv import load_dotenv
+from langchain_core.tools import StructuredTool
+from typing import List, Optional
+from utils.config_loader import load_config
+from utils.tool_output import cap_output, current_weather, daily_forecast
 
 class WeatherInfoTool:
-    def __init__(self):
-        load_dotenv()
+    def __init__(self, config: Optional[dict] = None):
+        config = config if config is not None else load_config()
+        WeatherForecastTool.configure_cache(config.get("cache", {}).get("weather", {}))
+        self.max_chars = config.get("tools", {}).get("output", {}).get("max_chars", 1500)
         self.api_key = os.environ.get("OPENWEATHERMAP_API_KEY")
-        self.weather_service = WeatherForecastTool(self.api_key)
+        self.weather_service = WeatherForecastTool(self.api_key, config.get("upstream", {}).get("openweathermap"))
         self.weather_tool_list = self._setup_tools()
-    
+
+    @property
+    def tool_list(self) -> List:
+        return self.weather_tool_list
+
+    def _format_current_weather(self, city: str, weather_data: dict) -> str:
+        if weather_data:
+            return cap_output({"city": city, **current_weather(weather_data)}, self.max_chars)
+        return cap_output({"city": city, "error": "weather unavailable"}, self.max_chars)
+
+    def _format_forecast(self, city: str, forecast_data: dict) -> str:
+        if forecast_data and 'list' in forecast_data:
+            return cap_output({"city": city, "units": "celsius", "daily": daily_forecast(forecast_data)}, self.max_chars)
+        return cap_output({"city": city, "error": "forecast unavailable"}, self.max_chars)
+
     def _setup_tools(self) -> List:
         """Setup all tools for the weather forecast tool"""
-        @tool
         def get_current_weather(city: str) -> str:
             """Get current weather for a city"""
-            weather_data = self.weather_service.get_current_weather(city)
-            if weather_data:
-                temp = weather_data.get('main', {}).get('temp', 'N/A')
-                desc = weather_data.get('weather', [{}])[0].get('description', 'N/A')
-                return f"Current weather in {city}: {temp}°C, {desc}"
-            return f"Could not fetch weather for {city}"
-        
-        @tool
+            return self._format_current_weather(city, self.weather_service.get_current_weather(city))
+
+        async def aget_current_weather(city: str) -> str:
+            return self._format_current_weather(city, await self.weather_service.aget_current_weather(city))
+
         def get_weather_forecast(city: str) -> str:
-            """Get weather forecast for a city"""
-            forecast_data = self.weather_service.get_forecast_weather(city)
-            if forecast_data and 'list' in forecast_data:
-                forecast_summary = []
-                for i in range(len(forecast_data['list'])):
-                    item = forecast_data['list'][i]
-                    date = item['dt_txt'].split(' ')[0]
-                    temp = item['main']['temp']
-                    desc = item['weather'][0]['description']
-                    forecast_summary.append(f"{date}: {temp} degree celcius , {desc}")
-                return f"Weather forecast for {city}:\n" + "\n".join(forecast_summary)
-            return f"Could not fetch forecast for {city}"
-    
-        return [get_current_weather, get_weather_forecast]
\ No newline at end of file
+            """Get the daily min/max temperature and condition forecast for a city for the next 5 days"""
+            return self._format_forecast(city, self.weather_service.get_forecast_weather(city))
+
+        async def aget_weather_forecast(city: str) -> str:
+            return self._format_forecast(city, await self.weather_service.aget_forecast_weather(city))
+
+        return [
+            StructuredTool.from_function(func=get_current_weather, coroutine=aget_current_weather),
+            StructuredTool.from_function(func=get_weather_forecast, coroutine=aget_weather_forecast),
+        ]
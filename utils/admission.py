@@ -0,0 +1,112 @@
+import math
+import time
+import asyncio
+from typing import Optional
+from logger.metrics import ADMISSION_IN_FLIGHT, ADMISSION_QUEUE_DEPTH, ADMISSION_REJECTED, ADMISSION_WAIT
+
+
+class Overloaded(Exception):
+    """Raised when a plan cannot be admitted; retry_after is a hint in seconds"""
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"server is at capacity ({reason}), retry in {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Admission:
+    """Slot held by one admitted plan; release() is idempotent"""
+    def __init__(self, controller: "AdmissionController"):
+        self.controller = controller
+        self.started = time.perf_counter()
+        self.released = False
+
+    def release(self) -> None:
+        if not self.released:
+            self.released = True
+            self.controller._release(time.perf_counter() - self.started)
+
+
+class AdmissionController:
+    """
+    Global cap on concurrently running plans, with a bounded wait queue.
+
+    Up to max_concurrent plans run at once; up to max_queue more wait, each for at most
+    queue_timeout_seconds. Anything beyond that is refused at once with Overloaded, so
+    under overload admitted plans keep their normal latency instead of all slowing down.
+    The Retry-After hint comes from the recent mean plan duration.
+    """
+    def __init__(self, max_concurrent: int = 8, max_queue: int = 16, queue_timeout_seconds: float = 10.0):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.mean_seconds = 0.0
+        self._slots = asyncio.Semaphore(max_concurrent)
+
+    @classmethod
+    def from_config(cls, admission_config: dict) -> Optional["AdmissionController"]:
+        if not admission_config or not admission_config.get("enabled", True):
+            return None
+        return cls(
+            max_concurrent=admission_config.get("max_concurrent", 8),
+            max_queue=admission_config.get("max_queue", 16),
+            queue_timeout_seconds=admission_config.get("queue_timeout_seconds", 10.0),
+        )
+
+    def retry_after(self) -> int:
+        """Seconds until the queue ahead of a new request has likely drained"""
+        backlog = (self.waiting + 1) / self.max_concurrent
+        return max(1, math.ceil(backlog * (self.mean_seconds or self.queue_timeout_seconds)))
+
+    def _gauges(self) -> None:
+        ADMISSION_IN_FLIGHT.set(self.in_flight)
+        ADMISSION_QUEUE_DEPTH.set(self.waiting)
+
+    def _reject(self, reason: str) -> Overloaded:
+        ADMISSION_REJECTED.inc(reason=reason)
+        return Overloaded(reason, self.retry_after())
+
+    async def admit(self) -> Admission:
+        """Wait for a slot; raises Overloaded when the queue is full or the wait times out"""
+        if self.in_flight + self.waiting >= self.max_concurrent + self.max_queue:
+            self.rejected += 1
+            raise self._reject("queue_full")
+        started = time.perf_counter()
+        self.waiting += 1
+        self._gauges()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout_seconds)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise self._reject("queue_timeout")
+        finally:
+            self.waiting -= 1
+            self._gauges()
+        ADMISSION_WAIT.observe(time.perf_counter() - started)
+        self.in_flight += 1
+        self.admitted += 1
+        self._gauges()
+        return Admission(self)
+
+    def _release(self, seconds: float) -> None:
+        self.in_flight -= 1
+        # Exponential moving average of plan duration, for the Retry-After hint
+        self.mean_seconds = seconds if not self.mean_seconds else 0.8 * self.mean_seconds + 0.2 * seconds
+        self._slots.release()
+        self._gauges()
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "mean_plan_seconds": round(self.mean_seconds, 3),
+        }
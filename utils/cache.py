@@ -0,0 +1,319 @@
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+from logger.logging import annotate_span, get_logger
+
+logger = get_logger("cache")
+
+
+class TTLCache:
+    """
+    Thread-safe in-memory cache whose entries expire after a TTL.
+
+    Holds at most maxsize entries and evicts the least recently used one when full.
+    Hits and misses of get() are counted and reported by stats().
+    """
+    def __init__(self, maxsize: int = 128, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _live(self, key: Hashable, now: float):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= now:
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return entry
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._live(key, time.monotonic())
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return entry[1]
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """Like get(), without touching the hit/miss counters"""
+        with self._lock:
+            entry = self._live(key, time.monotonic())
+            return default if entry is None else entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def items(self) -> List[tuple]:
+        """Live (key, value) pairs, most recently used last"""
+        now = time.monotonic()
+        with self._lock:
+            return [(key, value) for key, (expires_at, value) in self._data.items() if expires_at > now]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self.items())
+
+    def stats(self) -> Dict[str, Any]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self), "maxsize": self.maxsize, "ttl": self.ttl}
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Collapses concurrent fetches of the same key into one upstream call.
+
+    Callers that arrive while a fetch for their key is in flight wait for it and
+    share its result (or its exception) instead of starting their own.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._futures: Dict[Hashable, asyncio.Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    self._calls.pop(key, None)
+                call.event.set()
+        else:
+            call.event.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._futures.get(key)
+        if future is None or future.get_loop() is not asyncio.get_running_loop():
+            future = asyncio.ensure_future(fn())
+            self._futures[key] = future
+            future.add_done_callback(lambda done: self._futures.pop(key, None) if self._futures.get(key) is done else None)
+        # shield() keeps one cancelled caller from cancelling the fetch the others are waiting on
+        return await asyncio.shield(future)
+
+
+class MemoryBackend:
+    """In-process LRU storage for ResponseCache"""
+    def __init__(self, maxsize: int = 512):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[tuple]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+            return entry
+
+    def set(self, key: str, value: Any, stored_at: float) -> None:
+        with self._lock:
+            self._data[key] = (stored_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteBackend:
+    """
+    SQLite storage for ResponseCache, so cached responses survive restarts.
+
+    Values are stored as JSON. Several caches can share one file by using
+    different namespaces. The oldest rows of a namespace are pruned once it
+    holds more than maxsize rows.
+    """
+    def __init__(self, path: str, namespace: str = "default", maxsize: int = 10000):
+        self.path = path
+        self.namespace = namespace
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache (namespace TEXT, key TEXT, stored_at REAL, value TEXT, "
+                "PRIMARY KEY (namespace, key))"
+            )
+
+    def get(self, key: str) -> Optional[tuple]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT stored_at, value FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key)
+            ).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def set(self, key: str, value: Any, stored_at: float) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, stored_at, value) VALUES (?, ?, ?, ?)",
+                (self.namespace, key, stored_at, json.dumps(value, ensure_ascii=False)),
+            )
+            self._conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND key NOT IN "
+                "(SELECT key FROM cache WHERE namespace = ? ORDER BY stored_at DESC LIMIT ?)",
+                (self.namespace, self.namespace, self.maxsize),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache WHERE namespace = ?", (self.namespace,)).fetchone()[0]
+
+
+def make_backend(cache_config: dict, namespace: str):
+    """Create the storage backend named by a cache section of config.yaml"""
+    backend = cache_config.get("backend", "memory")
+    max_entries = cache_config.get("max_entries", 512)
+    if backend == "memory":
+        return MemoryBackend(maxsize=max_entries)
+    if backend == "sqlite":
+        return SQLiteBackend(cache_config.get("path", ".cache/tripwise.sqlite"), namespace=namespace, maxsize=max_entries)
+    raise ValueError(f"Unknown cache backend: {backend}")
+
+
+class ResponseCache:
+    """
+    Read-through cache for upstream responses with stale-while-revalidate.
+
+    Entries younger than ttl are served as hits. Entries older than ttl but within
+    stale_ttl after that are served immediately while one background refresh updates
+    them. Anything older is fetched, with concurrent misses for a key coalesced into
+    a single upstream call. Values that fail should_cache (empty responses by default)
+    are returned but not stored.
+    """
+    def __init__(self, backend, ttl: float, stale_ttl: float = 0.0,
+                 should_cache: Callable[[Any], bool] = bool):
+        self.backend = backend
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.should_cache = should_cache
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.fetches = 0
+        self._flight = SingleFlight()
+        self._background: set = set()
+
+    def _lookup(self, key: str) -> tuple:
+        """Return (state, value) where state is 'fresh', 'stale' or 'miss'"""
+        entry = self.backend.get(key)
+        if entry is None:
+            return "miss", None
+        stored_at, value = entry
+        age = time.time() - stored_at
+        if age < self.ttl:
+            return "fresh", value
+        if age < self.ttl + self.stale_ttl:
+            return "stale", value
+        return "miss", None
+
+    def _store(self, key: str, value: Any) -> Any:
+        self.fetches += 1
+        if self.should_cache(value):
+            self.backend.set(key, value, time.time())
+        return value
+
+    def get_or_fetch(self, key: str, fetch: Callable[[], Any]) -> Any:
+        state, value = self._lookup(key)
+        annotate_span(cache={"fresh": "hit", "stale": "stale"}.get(state, "miss"))
+        if state == "fresh":
+            self.hits += 1
+            return value
+        if state == "stale":
+            self.stale_hits += 1
+            self.refreshes += 1
+            threading.Thread(target=self._refresh, args=(key, fetch), daemon=True).start()
+            return value
+        self.misses += 1
+        return self._flight.do(key, lambda: self._store(key, fetch()))
+
+    def _refresh(self, key: str, fetch: Callable[[], Any]) -> None:
+        try:
+            self._flight.do(key, lambda: self._store(key, fetch()))
+        except Exception as e:
+            logger.warning("background refresh failed", extra={"fields": {"key": key, "error": str(e)}})
+
+    async def aget_or_fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        state, value = self._lookup(key)
+        annotate_span(cache={"fresh": "hit", "stale": "stale"}.get(state, "miss"))
+        if state == "fresh":
+            self.hits += 1
+            return value
+        if state == "stale":
+            self.stale_hits += 1
+            self.refreshes += 1
+            task = asyncio.ensure_future(self._arefresh(key, fetch))
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+            return value
+        self.misses += 1
+        return await self._flight.ado(key, lambda: self._afetch_and_store(key, fetch))
+
+    async def _afetch_and_store(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        return self._store(key, await fetch())
+
+    async def _arefresh(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            await self._flight.ado(key, lambda: self._afetch_and_store(key, fetch))
+        except Exception as e:
+            logger.warning("background refresh failed", extra={"fields": {"key": key, "error": str(e)}})
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "fetches": self.fetches,
+            "size": len(self.backend),
+            "ttl": self.ttl,
+            "stale_ttl": self.stale_ttl,
+        }
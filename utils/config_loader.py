@@ -1,8 +1,46 @@
 import yaml
 import os
+import threading
+from dotenv import load_dotenv
 
-def load_config(config_path: str = "config/config.yaml") -> dict:
-    with open(config_path, "r") as file:
-        config = yaml.safe_load(file)
-        # print(config)
-    return config
\ No newline at end of file
+_configs = {}
+_env_loaded = False
+_lock = threading.Lock()
+
+
+def _merge(base: dict, overlay: dict) -> dict:
+    merged = dict(base)
+    for key, value in overlay.items():
+        merged[key] = _merge(merged[key], value) if isinstance(value, dict) and isinstance(merged.get(key), dict) else value
+    return merged
+
+
+def load_env() -> None:
+    """Load .env into the process environment, once"""
+    global _env_loaded
+    if not _env_loaded:
+        load_dotenv()
+        _env_loaded = True
+
+
+def load_config(config_path: str = "config/config.yaml", reload: bool = False) -> dict:
+    """
+    Load config.yaml. When TRIPWISE_CONFIG_OVERLAY names another YAML file, its
+    values are merged on top (used e.g. by the offline benchmarks).
+
+    The file is parsed once per process and the same dict is returned to every
+    caller, so treat it as read-only; reload=True re-reads it (e.g. /admin/reload).
+    The first call also loads .env.
+    """
+    overlay_path = os.environ.get("TRIPWISE_CONFIG_OVERLAY")
+    key = (config_path, overlay_path)
+    with _lock:
+        load_env()
+        if reload or key not in _configs:
+            with open(config_path, "r") as file:
+                config = yaml.safe_load(file)
+            if overlay_path:
+                with open(overlay_path, "r") as file:
+                    config = _merge(config, yaml.safe_load(file) or {})
+            _configs[key] = config
+        return _configs[key]
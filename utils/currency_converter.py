@@ -1,16 +1,90 @@
-import requests
+from typing import Optional
+from utils.cache import TTLCache, SingleFlight
+from utils.http_client import get_http_client
+from logger.logging import annotate_span
 
 class CurrencyConverter:
-    def __init__(self, api_key: str):
-        self.base_url = f"https://v6.exchangerate-api.com/v6/{api_key}/latest/"
-    
-    def convert(self, amount:float, from_currency:str, to_currency:str):
-        """Convert the amount from one currency to another"""
-        url = f"{self.base_url}/{from_currency}"
-        response = requests.get(url)
+    # Rate tables are shared by every converter in the process, keyed by base currency
+    rate_cache = TTLCache(maxsize=64, ttl=3600)
+    _fetches = SingleFlight()
+    cross_rate_hits = 0
+    fetches = 0
+
+    def __init__(self, api_key: str, base_url: Optional[str] = None):
+        self.base_url = f"{(base_url or 'https://v6.exchangerate-api.com/v6').rstrip('/')}/{api_key}/latest"
+
+    @classmethod
+    def configure_cache(cls, ttl_seconds: Optional[float] = None, max_entries: Optional[int] = None):
+        """Set the TTL and size bound of the shared rate-table cache"""
+        if ttl_seconds is not None:
+            cls.rate_cache.ttl = ttl_seconds
+        if max_entries is not None:
+            cls.rate_cache.maxsize = max_entries
+
+    @classmethod
+    def cache_stats(cls) -> dict:
+        return {**cls.rate_cache.stats(), "cross_rate_hits": cls.cross_rate_hits, "fetches": cls.fetches}
+
+    @staticmethod
+    def _parse_rates(response) -> dict:
         if response.status_code != 200:
             raise Exception("API call failed:", response.json())
-        rates = response.json()["conversion_rates"]
+        return response.json()["conversion_rates"]
+
+    def _fetch_rates(self, from_currency:str) -> dict:
+        url = f"{self.base_url}/{from_currency}"
+        rates = self._parse_rates(get_http_client().get(url))
+        CurrencyConverter.fetches += 1
+        self.rate_cache.set(from_currency, rates)
+        return rates
+
+    async def _afetch_rates(self, from_currency:str) -> dict:
+        url = f"{self.base_url}/{from_currency}"
+        rates = self._parse_rates(await get_http_client().aget(url))
+        CurrencyConverter.fetches += 1
+        self.rate_cache.set(from_currency, rates)
+        return rates
+
+    def _cached_rate(self, from_currency:str, to_currency:str) -> Optional[float]:
+        """
+        Rate from the cache: the from_currency table if present, otherwise a cross rate
+        derived from any cached table that quotes both currencies.
+        """
+        if from_currency == to_currency:
+            return 1.0
+        rates = self.rate_cache.get(from_currency)
+        if rates is not None:
+            if to_currency not in rates:
+                raise ValueError(f"{to_currency} not found in exchange rates.")
+            return rates[to_currency]
+        for _, rates in self.rate_cache.items():
+            if rates.get(from_currency) and to_currency in rates:
+                CurrencyConverter.cross_rate_hits += 1
+                return rates[to_currency] / rates[from_currency]
+        return None
+
+    @staticmethod
+    def _apply_rate(rates: dict, amount:float, to_currency:str):
         if to_currency not in rates:
             raise ValueError(f"{to_currency} not found in exchange rates.")
-        return amount * rates[to_currency]
\ No newline at end of file
+        return amount * rates[to_currency]
+
+    def convert(self, amount:float, from_currency:str, to_currency:str):
+        """Convert the amount from one currency to another"""
+        from_currency, to_currency = from_currency.upper(), to_currency.upper()
+        rate = self._cached_rate(from_currency, to_currency)
+        annotate_span(cache="miss" if rate is None else "hit")
+        if rate is not None:
+            return amount * rate
+        rates = self._fetches.do(from_currency, lambda: self._fetch_rates(from_currency))
+        return self._apply_rate(rates, amount, to_currency)
+
+    async def aconvert(self, amount:float, from_currency:str, to_currency:str):
+        """Convert the amount from one currency to another without blocking the event loop"""
+        from_currency, to_currency = from_currency.upper(), to_currency.upper()
+        rate = self._cached_rate(from_currency, to_currency)
+        annotate_span(cache="miss" if rate is None else "hit")
+        if rate is not None:
+            return amount * rate
+        rates = await self._fetches.ado(from_currency, lambda: self._afetch_rates(from_currency))
+        return self._apply_rate(rates, amount, to_currency)
@@ -1,43 +1,84 @@
-class Calculator:
+import asyncio
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+from pydantic import BaseModel, Field
+from utils.currency_converter import CurrencyConverter
+
+
+class CostItem(BaseModel):
+    """One line of a trip cost sheet"""
+    category: str = Field(description="Cost category, e.g. lodging, food, transport, activities")
+    description: str = Field("", description="What the cost is, e.g. 'Hotel Mandovi, double room'")
+    quantity: float = Field(1, ge=0, description="Number of units, e.g. nights, people or tickets")
+    unit_price: float = Field(ge=0, description="Price of one unit")
+    currency: str = Field("USD", description="ISO currency code of unit_price")
+    start_day: Optional[int] = Field(None, ge=1, description="First trip day (1-based) the cost falls on; omit for the whole trip")
+    end_day: Optional[int] = Field(None, ge=1, description="Last trip day the cost falls on; defaults to start_day")
+
+
+class BudgetCalculator:
+    """
+    Prices a whole cost sheet at once.
+
+    Every line is converted to the target currency with one rate table (the target's,
+    from the shared CurrencyConverter cache), then totals, per-category and per-day
+    sums are built in a single pass. A line's cost (quantity x unit_price) is spread
+    evenly over its day range; lines without one are spread over the whole trip.
+    """
+    def __init__(self, currency_service: CurrencyConverter):
+        self.currency_service = currency_service
+
     @staticmethod
-    def multiply(a: int, b: int) -> int:
-        """
-        Multiply two integers.
-
-        Args:
-            a (int): The first integer.
-            b (int): The second integer.
-
-        Returns:
-            int: The product of a and b.
-        """
-        return a * b
-    
+    def _currencies(items: Iterable[CostItem], currency: str) -> List[str]:
+        return sorted({item.currency.upper() for item in items} - {currency})
+
+    def rates(self, items: List[CostItem], currency: str) -> Dict[str, float]:
+        """Rate from each currency on the sheet to the target currency"""
+        return {code: 1 / self.currency_service.convert(1.0, currency, code) for code in self._currencies(items, currency)}
+
+    async def arates(self, items: List[CostItem], currency: str) -> Dict[str, float]:
+        codes = self._currencies(items, currency)
+        # Every lookup uses the target currency's table, so concurrent misses share one fetch
+        inverse = await asyncio.gather(*(self.currency_service.aconvert(1.0, currency, code) for code in codes))
+        return {code: 1 / rate for code, rate in zip(codes, inverse)}
+
     @staticmethod
-    def calculate_total(*x: float) -> float:
-        """
-        Calculate sum of the given list of numbers
-
-        Args:
-            x (list): List of floating numbers
-
-        Returns:
-            float: The sum of numbers in the list x
-        """
-        return sum(x)
-    
+    def trip_days(items: List[CostItem], days: Optional[int] = None) -> int:
+        return days or max([item.end_day or item.start_day or 1 for item in items] or [1])
+
     @staticmethod
-    def calculate_daily_budget(total: float, days: int) -> float:
-        """
-        Calculate daily budget
-
-        Args:
-            total (float): Total cost.
-            days (int): Total number of days
-
-        Returns:
-            float: Expense for a single day
-        """
-        return total / days if days > 0 else 0
-    
-    
\ No newline at end of file
+    def summarize(items: List[CostItem], currency: str, rates: Dict[str, float], days: Optional[int] = None) -> dict:
+        """Totals of a cost sheet whose foreign-currency lines are priced with rates"""
+        trip_days = BudgetCalculator.trip_days(items, days)
+        by_category: Dict[str, float] = defaultdict(float)
+        per_day = [0.0] * trip_days
+        for item in items:
+            first = item.start_day or 1
+            last = item.end_day or item.start_day or trip_days
+            if last < first:
+                raise ValueError(f"'{item.description or item.category}': end_day {last} is before start_day {first}")
+            if last > trip_days:
+                raise ValueError(f"'{item.description or item.category}': day {last} is outside the {trip_days}-day trip")
+            amount = item.quantity * item.unit_price * rates.get(item.currency.upper(), 1.0)
+            by_category[item.category.strip().lower()] += amount
+            share = amount / (last - first + 1)
+            for day in range(first - 1, last):
+                per_day[day] += share
+        total = sum(by_category.values())
+        return {
+            "currency": currency,
+            "total": round(total, 2),
+            "days": trip_days,
+            "per_day_average": round(total / trip_days, 2),
+            "by_category": {name: round(amount, 2) for name, amount in sorted(by_category.items(), key=lambda entry: -entry[1])},
+            "per_day": [round(amount, 2) for amount in per_day],
+            "rates": {code: round(rate, 6) for code, rate in rates.items()},
+        }
+
+    def calculate(self, items: List[CostItem], currency: str = "USD", days: Optional[int] = None) -> dict:
+        currency = currency.upper()
+        return self.summarize(items, currency, self.rates(items, currency), days)
+
+    async def acalculate(self, items: List[CostItem], currency: str = "USD", days: Optional[int] = None) -> dict:
+        currency = currency.upper()
+        return self.summarize(items, currency, await self.arates(items, currency), days)
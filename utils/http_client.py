@@ -0,0 +1,232 @@
+import time
+import random
+import asyncio
+import bisect
+import threading
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from utils.config_loader import load_config
+from utils.rate_limiter import get_rate_limiter
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+class LatencyHistograms:
+    """Per-host request latency histograms with fixed millisecond buckets"""
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = list(buckets)
+        self._hosts: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, host: str, elapsed_ms: float, status: str) -> None:
+        with self._lock:
+            host_stats = self._hosts.setdefault(host, {
+                "count": 0, "sum_ms": 0.0, "retries": 0, "status": {},
+                "buckets": [0] * (len(self.buckets) + 1),
+            })
+            host_stats["count"] += 1
+            host_stats["sum_ms"] += elapsed_ms
+            host_stats["status"][status] = host_stats["status"].get(status, 0) + 1
+            host_stats["buckets"][bisect.bisect_left(self.buckets, elapsed_ms)] += 1
+
+    def retried(self, host: str) -> None:
+        with self._lock:
+            if host in self._hosts:
+                self._hosts[host]["retries"] += 1
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            snapshot = {}
+            for host, host_stats in self._hosts.items():
+                labels = [f"le_{bound}ms" for bound in self.buckets] + ["le_inf"]
+                snapshot[host] = {
+                    "count": host_stats["count"],
+                    "avg_ms": round(host_stats["sum_ms"] / host_stats["count"], 2) if host_stats["count"] else 0.0,
+                    "sum_ms": round(host_stats["sum_ms"], 2),
+                    "retries": host_stats["retries"],
+                    "status": dict(host_stats["status"]),
+                    "buckets": dict(zip(labels, host_stats["buckets"])),
+                }
+            return snapshot
+
+
+class HttpClient:
+    """
+    Shared HTTP layer for all upstream APIs.
+
+    Holds one pooled requests.Session (sync) and one httpx.AsyncClient (async), both
+    keeping connections alive per host, applies connect/read timeouts to every call and
+    retries connection errors, timeouts and 429/5xx responses with jittered exponential
+    backoff (honouring Retry-After). Hosts listed under rate_limits in config.yaml are
+    throttled with a token bucket before each attempt. Every attempt is recorded in per-host latency histograms.
+    """
+    def __init__(self, connect_timeout: float = 5.0, read_timeout: float = 15.0, max_retries: int = 3,
+                 backoff_base: float = 0.5, backoff_max: float = 8.0, pool_maxsize: int = 20,
+                 async_transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.pool_maxsize = pool_maxsize
+        self.latency = LatencyHistograms()
+        self._async_transport = async_transport
+        self._async_client: Optional[httpx.AsyncClient] = None
+        # Calls still running on this client, so a replaced client is closed only once they finish
+        self.in_flight = 0
+        self._in_flight_lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    @classmethod
+    def from_config(cls, http_config: dict) -> "HttpClient":
+        return cls(
+            connect_timeout=http_config.get("connect_timeout_seconds", 5.0),
+            read_timeout=http_config.get("read_timeout_seconds", 15.0),
+            max_retries=http_config.get("max_retries", 3),
+            backoff_base=http_config.get("backoff_base_seconds", 0.5),
+            backoff_max=http_config.get("backoff_max_seconds", 8.0),
+            pool_maxsize=http_config.get("pool_maxsize", 20),
+        )
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        if self._async_client is None or self._async_client.is_closed:
+            self._async_client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout[1], connect=self.timeout[0]),
+                limits=httpx.Limits(max_keepalive_connections=self.pool_maxsize, keepalive_expiry=60),
+                transport=self._async_transport,
+            )
+        return self._async_client
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _track(self, delta: int) -> None:
+        with self._in_flight_lock:
+            self.in_flight += delta
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        self._track(1)
+        try:
+            return self._request(method, url, **kwargs)
+        finally:
+            self._track(-1)
+
+    async def arequest(self, method: str, url: str, **kwargs) -> httpx.Response:
+        self._track(1)
+        try:
+            return await self._arequest(method, url, **kwargs)
+        finally:
+            self._track(-1)
+
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        host = urlsplit(url).netloc
+        limiter = get_rate_limiter(host)
+        kwargs.setdefault("timeout", self.timeout)
+        for attempt in range(self.max_retries + 1):
+            if limiter is not None:
+                limiter.acquire()
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self.latency.observe(host, (time.perf_counter() - started) * 1000, type(e).__name__)
+                if attempt == self.max_retries:
+                    raise
+                retry_after = None
+            else:
+                self.latency.observe(host, (time.perf_counter() - started) * 1000, str(response.status_code))
+                if response.status_code not in RETRY_STATUS_CODES or attempt == self.max_retries:
+                    return response
+                retry_after = response.headers.get("Retry-After")
+            self.latency.retried(host)
+            time.sleep(self._backoff(attempt, retry_after))
+
+    async def _arequest(self, method: str, url: str, **kwargs) -> httpx.Response:
+        host = urlsplit(url).netloc
+        limiter = get_rate_limiter(host)
+        for attempt in range(self.max_retries + 1):
+            if limiter is not None:
+                await limiter.aacquire()
+            started = time.perf_counter()
+            try:
+                response = await self.async_client.request(method, url, **kwargs)
+            except (httpx.TransportError, httpx.TimeoutException) as e:
+                self.latency.observe(host, (time.perf_counter() - started) * 1000, type(e).__name__)
+                if attempt == self.max_retries:
+                    raise
+                retry_after = None
+            else:
+                self.latency.observe(host, (time.perf_counter() - started) * 1000, str(response.status_code))
+                if response.status_code not in RETRY_STATUS_CODES or attempt == self.max_retries:
+                    return response
+                retry_after = response.headers.get("Retry-After")
+            self.latency.retried(host)
+            await asyncio.sleep(self._backoff(attempt, retry_after))
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    async def aget(self, url: str, **kwargs) -> httpx.Response:
+        return await self.arequest("GET", url, **kwargs)
+
+    async def apost(self, url: str, **kwargs) -> httpx.Response:
+        return await self.arequest("POST", url, **kwargs)
+
+    async def aclose(self) -> None:
+        """Close the pooled connections of both the sync session and the async client"""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+        self.session.close()
+
+    def stats(self) -> Dict[str, dict]:
+        return self.latency.snapshot()
+
+
+_http_client: Optional[HttpClient] = None
+_http_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """
+    Return the process-wide HttpClient, created from the http section of config.yaml on first use.
+    """
+    global _http_client
+    if _http_client is None:
+        with _http_client_lock:
+            if _http_client is None:
+                _http_client = HttpClient.from_config(load_config().get("http", {}))
+    return _http_client
+
+
+def set_http_client(http_client: HttpClient) -> Optional[HttpClient]:
+    """
+    Replace the process-wide HttpClient and return the previous one, which the caller
+    closes; GraphRegistry.reload() uses it to apply a changed http section.
+    """
+    global _http_client
+    with _http_client_lock:
+        previous, _http_client = _http_client, http_client
+    return previous
+
+
+async def aclose_http_client() -> None:
+    """Close the shared async connections, called when the app shuts down"""
+    if _http_client is not None:
+        await _http_client.aclose()
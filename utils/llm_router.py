@@ -0,0 +1,164 @@
+import time
+import random
+import asyncio
+import threading
+from typing import Any, List, Optional
+from langchain_core.runnables import Runnable, RunnableConfig
+from utils.provider_router import CircuitBreaker, LatencyTracker
+from logger.logging import get_logger
+
+logger = get_logger("llm_router")
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    return getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    return _status_code(error) == 429 or "ratelimit" in type(error).__name__.lower()
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    True for errors another endpoint may not have: 429, 5xx, timeouts and connection
+    errors. Anything else (a 400, a context-length error, a bug) fails on every endpoint.
+    """
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)) or is_rate_limited(error):
+        return True
+    status_code = _status_code(error)
+    if isinstance(status_code, int):
+        return status_code >= 500
+    # SDK errors without a status, e.g. APIConnectionError / APITimeoutError or httpx.ConnectError
+    return any("Timeout" in cls.__name__ or "Connect" in cls.__name__ for cls in type(error).__mro__)
+
+
+class LLMEndpoint:
+    """One provider/model of the pool with its own latency window, circuit breaker and counters"""
+    def __init__(self, name: str, weight: float = 1.0, breaker: Optional[CircuitBreaker] = None):
+        self.name = name
+        self.weight = weight
+        self.breaker = breaker or CircuitBreaker(failure_threshold=3, reset_seconds=30.0)
+        self.latency = LatencyTracker()
+        self.counters = {"calls": 0, "errors": 0, "rate_limited": 0, "timeouts": 0, "not_retried": 0}
+        self.in_flight = 0
+        self.cooldown_until = 0.0
+
+    def stats(self) -> dict:
+        calls = self.counters["calls"]
+        return {
+            **self.counters,
+            "weight": self.weight,
+            "rate_limited_ratio": round(self.counters["rate_limited"] / calls, 4) if calls else 0.0,
+            "breaker": self.breaker.stats(),
+            "latency": self.latency.stats(),
+        }
+
+
+class LLMRouter(Runnable):
+    """
+    Weighted pool of chat models that behaves like a single one (invoke/ainvoke/bind_tools).
+
+    Each call picks an endpoint at random, weighted by its configured weight and
+    divided by the calls it already has in flight. 429s, 5xx, timeouts and connection
+    errors fail over to the next endpoint; a 429 also puts the endpoint in cooldown for
+    rate_limit_cooldown_seconds, and repeated failures open its circuit breaker. Other
+    errors, such as a bad request, are raised at once without counting against the endpoint.
+    """
+    def __init__(self, endpoints: List[LLMEndpoint], clients: List[Any], timeout_seconds: float = 60.0,
+                 rate_limit_cooldown_seconds: float = 20.0):
+        self.endpoints = endpoints
+        self.clients = dict(zip((endpoint.name for endpoint in endpoints), clients))
+        self.timeout_seconds = timeout_seconds
+        self.rate_limit_cooldown_seconds = rate_limit_cooldown_seconds
+        self._lock = threading.Lock()
+
+    def bind_tools(self, tools, **kwargs) -> "LLMRouter":
+        """A router over the same endpoints (and stats) whose clients have the tools bound"""
+        return LLMRouter(
+            self.endpoints,
+            [self.clients[endpoint.name].bind_tools(tools, **kwargs) for endpoint in self.endpoints],
+            self.timeout_seconds,
+            self.rate_limit_cooldown_seconds,
+        )
+
+    def _order(self) -> List[LLMEndpoint]:
+        """Endpoints in the order to try them: a weighted draw among the available ones, the rest last"""
+        now = time.monotonic()
+        with self._lock:
+            available = [e for e in self.endpoints if e.cooldown_until <= now and e.breaker.state == "closed"]
+            others = [e for e in self.endpoints if e not in available]
+            order = []
+            while available:
+                weights = [e.weight / (1 + e.in_flight) for e in available]
+                endpoint = random.choices(available, weights=weights)[0]
+                available.remove(endpoint)
+                order.append(endpoint)
+        return order + others
+
+    def _start(self, endpoint: LLMEndpoint) -> Optional[float]:
+        if not endpoint.breaker.allow():
+            return None
+        with self._lock:
+            endpoint.counters["calls"] += 1
+            endpoint.in_flight += 1
+        return time.perf_counter()
+
+    def _finish(self, endpoint: LLMEndpoint, started: float, error: Optional[BaseException] = None) -> None:
+        """Record a call's outcome; re-raises errors that failing over would not fix"""
+        endpoint.latency.record(time.perf_counter() - started)
+        with self._lock:
+            endpoint.in_flight -= 1
+            if error is None:
+                endpoint.breaker.record_success()
+                return
+            if not is_retryable(error):
+                endpoint.counters["not_retried"] += 1
+                raise error
+            endpoint.counters["errors"] += 1
+            if isinstance(error, (asyncio.TimeoutError, TimeoutError)):
+                endpoint.counters["timeouts"] += 1
+            if is_rate_limited(error):
+                endpoint.counters["rate_limited"] += 1
+                endpoint.cooldown_until = time.monotonic() + self.rate_limit_cooldown_seconds
+        endpoint.breaker.record_failure()
+        logger.warning("LLM endpoint failed, failing over",
+                       extra={"fields": {"endpoint": endpoint.name, "error": type(error).__name__}})
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs) -> Any:
+        last_error: Optional[BaseException] = None
+        for endpoint in self._order():
+            started = self._start(endpoint)
+            if started is None:
+                continue
+            try:
+                result = self.clients[endpoint.name].invoke(input, config, **kwargs)
+            except Exception as e:
+                self._finish(endpoint, started, e)
+                last_error = e
+                continue
+            self._finish(endpoint, started)
+            return result
+        raise last_error or RuntimeError("No LLM endpoint available")
+
+    async def ainvoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs) -> Any:
+        last_error: Optional[BaseException] = None
+        for endpoint in self._order():
+            started = self._start(endpoint)
+            if started is None:
+                continue
+            try:
+                result = await asyncio.wait_for(self.clients[endpoint.name].ainvoke(input, config, **kwargs), self.timeout_seconds)
+            except asyncio.CancelledError:
+                with self._lock:
+                    endpoint.in_flight -= 1
+                raise
+            except Exception as e:
+                self._finish(endpoint, started, e)
+                last_error = e
+                continue
+            self._finish(endpoint, started)
+            return result
+        raise last_error or RuntimeError("No LLM endpoint available")
+
+    def stats(self) -> dict:
+        return {endpoint.name: endpoint.stats() for endpoint in self.endpoints}
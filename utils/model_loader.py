@@ -1,20 +1,27 @@
 import os
-from dotenv import load_dotenv
 from typing import Literal, Optional, Any
 from pydantic import BaseModel, Field
 from utils.config_loader import load_config
-from langchain_groq import ChatGroq
-from langchain_openai import ChatOpenAI
+from utils.llm_router import LLMEndpoint, LLMRouter
+from utils.plugins import LLM_PROVIDERS
+from logger.logging import get_logger
+
+logger = get_logger("model_loader")
+
+API_KEY_ENV = {"groq": "GROQ_API_KEY", "openai": "OPENAI_API_KEY"}
 
 
 class ConfigLoader:
     def __init__(self):
-        print(f"Loaded config.....")
+        logger.debug("Loaded config")
         self.config = load_config()
     
     def __getitem__(self, key):
         return self.config[key]
 
+    def get(self, key, default=None):
+        return self.config.get(key, default)
+
 class ModelLoader(BaseModel):
     model_provider: Literal["groq", "openai"] = "groq"
     config: Optional[ConfigLoader] = Field(default=None, exclude=True)
@@ -25,22 +32,54 @@ class ModelLoader(BaseModel):
     class Config:
         arbitrary_types_allowed = True
     
+    @staticmethod
+    def _client(provider: str, model_name: str, **kwargs):
+        api_key = os.getenv(API_KEY_ENV[provider])
+        # The provider SDK is imported here, on first use, not when the app starts
+        client_class = LLM_PROVIDERS.get(provider)
+        if provider == "groq":
+            return client_class(model=model_name, api_key=api_key, **kwargs)
+        return client_class(model_name=model_name, api_key=api_key, **kwargs)
+
     def load_llm(self):
         """
         Load and return the LLM model.
+
+        When llm_pool is enabled in config.yaml and lists endpoints for this provider,
+        an LLMRouter balancing over them is returned instead of a single client.
         """
-        print("LLM loading...")
-        print(f"Loading model from provider: {self.model_provider}")
-        if self.model_provider == "groq":
-            print("Loading LLM from Groq..............")
-            groq_api_key = os.getenv("GROQ_API_KEY")
-            model_name = self.config["llm"]["groq"]["model_name"]
-            llm=ChatGroq(model=model_name, api_key=groq_api_key)
-        elif self.model_provider == "openai":
-            print("Loading LLM from OpenAI..............")
-            openai_api_key = os.getenv("OPENAI_API_KEY")
-            model_name = self.config["llm"]["openai"]["model_name"]
-            llm = ChatOpenAI(model_name="o4-mini", api_key=openai_api_key)
-        
-        return llm
-    
\ No newline at end of file
+        pool_config = self.config.get("llm_pool", {}) or {}
+        if pool_config.get("enabled") and pool_config.get(self.model_provider):
+            return self._load_pool(pool_config)
+        llm_config = self.config["llm"][self.model_provider]
+        if llm_config.get("provider") == "replay":
+            # Offline benchmarks: answer from recorded fixtures instead of calling a provider
+            from benchmarks.replay import ReplayChatModel
+            logger.info("Loading replay LLM", extra={"fields": {"fixtures": llm_config["fixtures"]}})
+            return ReplayChatModel.from_directory(llm_config["fixtures"], latency_scale=llm_config.get("latency_scale", 1.0))
+        model_name = llm_config["model_name"]
+        logger.info("Loading LLM", extra={"fields": {"provider": self.model_provider, "model": model_name}})
+        return self._client(self.model_provider, model_name)
+
+    def _load_pool(self, pool_config: dict) -> LLMRouter:
+        endpoints, clients = [], []
+        for entry in pool_config[self.model_provider]:
+            provider, model_name = entry["provider"], entry["model_name"]
+            if not os.getenv(API_KEY_ENV[provider]):
+                logger.warning(f"Skipping pool endpoint {provider}:{model_name}, {API_KEY_ENV[provider]} is not set")
+                continue
+            endpoints.append(LLMEndpoint(f"{provider}:{model_name}", weight=entry.get("weight", 1)))
+            clients.append(self._client(provider, model_name, timeout=pool_config.get("timeout_seconds", 60),
+                                        max_retries=pool_config.get("max_retries", 0)))
+        if not endpoints:
+            raise ValueError(f"No usable endpoint in llm_pool.{self.model_provider}")
+        logger.info("Loaded LLM pool", extra={"fields": {"endpoints": [endpoint.name for endpoint in endpoints]}})
+        return LLMRouter(endpoints, clients, timeout_seconds=pool_config.get("timeout_seconds", 60),
+                         rate_limit_cooldown_seconds=pool_config.get("rate_limit_cooldown_seconds", 20))
+
+    def load_fast_llm(self):
+        """Small, fast model for cheap sub-tasks (llm.fast in config.yaml), or None when not configured"""
+        fast_config = self.config["llm"].get("fast")
+        if not fast_config or not os.getenv(API_KEY_ENV[fast_config["provider"]]):
+            return None
+        return self._client(fast_config["provider"], fast_config["model_name"])
@@ -1,78 +1,163 @@
 import os
 import json
-from langchain_tavily import TavilySearch
-from langchain_google_community import GooglePlacesTool, GooglePlacesAPIWrapper 
+import asyncio
+from utils.http_client import get_http_client
+from utils.rate_limiter import get_rate_limiter
+from typing import List, Optional
+from langchain_google_community import GooglePlacesAPIWrapper
 
 class GooglePlaceSearchTool:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, base_url: Optional[str] = None):
         self.places_wrapper = GooglePlacesAPIWrapper(gplaces_api_key=api_key)
-        self.places_tool = GooglePlacesTool(api_wrapper=self.places_wrapper)
-    
-    def google_search_attractions(self, place: str) -> dict:
+        if base_url:
+            self.places_wrapper.google_map_client.base_url = base_url.rstrip("/")
+
+    def _search(self, query: str) -> List[dict]:
+        """
+        Raw Places text-search results (name, rating, price_level, address, ...).
+        One API call per query; GooglePlacesTool.run would also fetch the details
+        of every result and format them as prose.
+        """
+        limiter = get_rate_limiter("maps.googleapis.com")
+        if limiter is not None:
+            limiter.acquire()
+        return self.places_wrapper.google_map_client.places(query).get("results", [])
+
+    def google_search_attractions(self, place: str) -> List[dict]:
         """
         Searches for attractions in the specified place using GooglePlaces API.
         """
-        return self.places_tool.run(f"top attractive places in and around {place}")
-    
-    def google_search_restaurants(self, place: str) -> dict:
+        return self._search(f"top attractive places in and around {place}")
+
+    def google_search_restaurants(self, place: str) -> List[dict]:
         """
         Searches for available restaurants in the specified place using GooglePlaces API.
         """
-        return self.places_tool.run(f"what are the top 10 restaurants and eateries in and around {place}?")
-    
-    def google_search_activity(self, place: str) -> dict:
+        return self._search(f"what are the top 10 restaurants and eateries in and around {place}?")
+
+    def google_search_activity(self, place: str) -> List[dict]:
         """
         Searches for popular activities in the specified place using GooglePlaces API.
         """
-        return self.places_tool.run(f"Activities in and around {place}")
+        return self._search(f"Activities in and around {place}")
 
-    def google_search_transportation(self, place: str) -> dict:
+    def google_search_transportation(self, place: str) -> List[dict]:
         """
         Searches for available modes of transportation in the specified place using GooglePlaces API.
         """
-        return self.places_tool.run(f"What are the different modes of transportations available in {place}")
+        return self._search(f"What are the different modes of transportations available in {place}")
 
-class TavilyPlaceSearchTool:
-    def __init__(self):
-        pass
+    async def agoogle_search_attractions(self, place: str) -> List[dict]:
+        """
+        Async variant of google_search_attractions. The googlemaps client is blocking,
+        so the call runs in a worker thread instead of on the event loop.
+        """
+        return await asyncio.to_thread(self.google_search_attractions, place)
 
-    def tavily_search_attractions(self, place: str) -> dict:
+    async def agoogle_search_restaurants(self, place: str) -> List[dict]:
         """
-        Searches for attractions in the specified place using TavilySearch.
+        Async variant of google_search_restaurants.
+        """
+        return await asyncio.to_thread(self.google_search_restaurants, place)
+
+    async def agoogle_search_activity(self, place: str) -> List[dict]:
+        """
+        Async variant of google_search_activity.
         """
-        tavily_tool = TavilySearch(topic="general", include_answer="advanced")
-        result = tavily_tool.invoke({"query": f"top attractive places in and around {place}"})
+        return await asyncio.to_thread(self.google_search_activity, place)
+
+    async def agoogle_search_transportation(self, place: str) -> List[dict]:
+        """
+        Async variant of google_search_transportation.
+        """
+        return await asyncio.to_thread(self.google_search_transportation, place)
+
+class TavilyPlaceSearchTool:
+    """
+    Place search through the Tavily search API.
+
+    Requests go over the shared pooled HTTP client (see utils/http_client.py) instead
+    of a new TavilySearch client, and with it a new connection, per call.
+    """
+    api_url = "https://api.tavily.com/search"
+    queries = {
+        "attractions": "top attractive places in and around {place}",
+        "restaurants": "what are the top 10 restaurants and eateries in and around {place}.",
+        "activities": "activities in and around {place}",
+        "transportation": "What are the different modes of transportations available in {place}",
+    }
+
+    def __init__(self, api_key: str = None, api_url: Optional[str] = None):
+        self.api_key = api_key or os.environ.get("TAVILY_API_KEY")
+        self.api_url = api_url or self.api_url
+
+    def _payload(self, query: str) -> dict:
+        return {"query": query, "topic": "general", "include_answer": "advanced"}
+
+    def _headers(self) -> dict:
+        return {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
+
+    @staticmethod
+    def _answer(status_code: int, result: dict):
+        if status_code != 200:
+            detail = result.get("detail", {}) if isinstance(result, dict) else {}
+            raise ValueError(f"Error {status_code}: {detail.get('error') if isinstance(detail, dict) else detail}")
         if isinstance(result, dict) and result.get("answer"):
             return result["answer"]
         return result
-    
+
+    def _search(self, query: str):
+        response = get_http_client().post(self.api_url, json=self._payload(query), headers=self._headers())
+        return self._answer(response.status_code, response.json())
+
+    async def _asearch(self, query: str):
+        response = await get_http_client().apost(self.api_url, json=self._payload(query), headers=self._headers())
+        return self._answer(response.status_code, response.json())
+
+    def tavily_search_attractions(self, place: str) -> dict:
+        """
+        Searches for attractions in the specified place using TavilySearch.
+        """
+        return self._search(self.queries["attractions"].format(place=place))
+
     def tavily_search_restaurants(self, place: str) -> dict:
         """
         Searches for available restaurants in the specified place using TavilySearch.
         """
-        tavily_tool = TavilySearch(topic="general", include_answer="advanced")
-        result = tavily_tool.invoke({"query": f"what are the top 10 restaurants and eateries in and around {place}."})
-        if isinstance(result, dict) and result.get("answer"):
-            return result["answer"]
-        return result
-    
+        return self._search(self.queries["restaurants"].format(place=place))
+
     def tavily_search_activity(self, place: str) -> dict:
         """
         Searches for popular activities in the specified place using TavilySearch.
         """
-        tavily_tool = TavilySearch(topic="general", include_answer="advanced")
-        result = tavily_tool.invoke({"query": f"activities in and around {place}"})
-        if isinstance(result, dict) and result.get("answer"):
-            return result["answer"]
-        return result
+        return self._search(self.queries["activities"].format(place=place))
 
     def tavily_search_transportation(self, place: str) -> dict:
         """
         Searches for available modes of transportation in the specified place using TavilySearch.
         """
-        tavily_tool = TavilySearch(topic="general", include_answer="advanced")
-        result = tavily_tool.invoke({"query": f"What are the different modes of transportations available in {place}"})
-        if isinstance(result, dict) and result.get("answer"):
-            return result["answer"]
-        return result
-    
\ No newline at end of file
+        return self._search(self.queries["transportation"].format(place=place))
+
+    async def atavily_search_attractions(self, place: str) -> dict:
+        """
+        Async variant of tavily_search_attractions.
+        """
+        return await self._asearch(self.queries["attractions"].format(place=place))
+
+    async def atavily_search_restaurants(self, place: str) -> dict:
+        """
+        Async variant of tavily_search_restaurants.
+        """
+        return await self._asearch(self.queries["restaurants"].format(place=place))
+
+    async def atavily_search_activity(self, place: str) -> dict:
+        """
+        Async variant of tavily_search_activity.
+        """
+        return await self._asearch(self.queries["activities"].format(place=place))
+
+    async def atavily_search_transportation(self, place: str) -> dict:
+        """
+        Async variant of tavily_search_transportation.
+        """
+        return await self._asearch(self.queries["transportation"].format(place=place))
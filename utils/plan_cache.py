@@ -0,0 +1,135 @@
+import math
+import hashlib
+import threading
+from collections import Counter
+from typing import Dict, Optional, Tuple
+from utils.cache import TTLCache
+from utils.query_parser import TripRequest, normalize_text, parse_trip_request
+
+EMBEDDING_DIMENSIONS = 2048
+
+
+def embed(text: str) -> Dict[int, float]:
+    """
+    Local, dependency-free text embedding: hashed word and character-trigram counts,
+    L2-normalised into a sparse vector. Good enough to match rephrasings of the same
+    trip request without calling an embedding model.
+    """
+    normalized = normalize_text(text)
+    features = normalized.split()
+    padded = f" {normalized} "
+    features += [padded[i:i + 3] for i in range(len(padded) - 2)]
+    counts = Counter(
+        int(hashlib.blake2b(feature.encode("utf-8"), digest_size=4).hexdigest(), 16) % EMBEDDING_DIMENSIONS
+        for feature in features
+    )
+    norm = math.sqrt(sum(value * value for value in counts.values())) or 1.0
+    return {index: value / norm for index, value in counts.items()}
+
+
+def cosine(a: Dict[int, float], b: Dict[int, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(value * b.get(index, 0.0) for index, value in a.items())
+
+
+class PlanCache:
+    """
+    Whole-answer cache for /query.
+
+    A question's exact key is its normalized text, so only the same question (up to case,
+    punctuation and spacing) is an exact hit. Otherwise the closest cached question by
+    embedding similarity is served when it is above similarity_threshold and the trip
+    details the parser extracts (destinations, days, budget tier and amount, themes,
+    currency, start date, month) do not contradict it.
+    """
+    def __init__(self, ttl_seconds: float = 21600, max_entries: int = 1000, similarity_threshold: float = 0.9):
+        self.similarity_threshold = similarity_threshold
+        self.answers = TTLCache(maxsize=max_entries, ttl=ttl_seconds)
+        self._index: "Dict[str, Tuple[Dict[int, float], TripRequest]]" = {}
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+    @classmethod
+    def from_config(cls, plan_cache_config: dict) -> Optional["PlanCache"]:
+        """Create the cache from the plan_cache section of config.yaml, or None when disabled"""
+        if not plan_cache_config.get("enabled", False):
+            return None
+        return cls(
+            ttl_seconds=plan_cache_config.get("ttl_seconds", 21600),
+            max_entries=plan_cache_config.get("max_entries", 1000),
+            similarity_threshold=plan_cache_config.get("similarity_threshold", 0.9),
+        )
+
+    @staticmethod
+    def normalized_key(question: str, namespace: str = "") -> str:
+        return f"{namespace}:{normalize_text(question)}"
+
+    @staticmethod
+    def _compatible(a: TripRequest, b: TripRequest) -> bool:
+        for field in ("days", "budget_tier"):
+            if getattr(a, field) is not None and getattr(b, field) is not None and getattr(a, field) != getattr(b, field):
+                return False
+        # A plan priced or dated for one currency, date or budget is wrong for any other, or for none
+        for field in ("currency", "start_date", "month", "budget_amount"):
+            if getattr(a, field) != getattr(b, field):
+                return False
+        # Details the parser found in one question must be in the other too
+        return set(a.destinations) == set(b.destinations) and set(a.themes) == set(b.themes)
+
+    def _semantic_match(self, vector: Dict[int, float], trip: TripRequest, namespace: str) -> Optional[str]:
+        best_key, best_score = None, self.similarity_threshold
+        with self._lock:
+            candidates = list(self._index.items())
+        for key, (candidate_vector, candidate_trip) in candidates:
+            if not key.startswith(f"{namespace}:") or not self._compatible(trip, candidate_trip):
+                continue
+            score = cosine(vector, candidate_vector)
+            if score >= best_score:
+                best_key, best_score = key, score
+        return best_key
+
+    def lookup(self, question: str, namespace: str = "") -> Optional[Tuple[str, str]]:
+        """Return (answer, 'exact' | 'semantic') for a cached plan, or None"""
+        key = self.normalized_key(question, namespace)
+        entry = self.answers.peek(key)
+        match = "exact"
+        if entry is None:
+            semantic_key = self._semantic_match(embed(question), parse_trip_request(question), namespace)
+            entry = self.answers.peek(semantic_key) if semantic_key else None
+            match = "semantic"
+        if entry is None:
+            self.misses += 1
+            return None
+        answer, generation_seconds = entry
+        if match == "exact":
+            self.exact_hits += 1
+        else:
+            self.semantic_hits += 1
+        self.saved_seconds += generation_seconds
+        return answer, match
+
+    def store(self, question: str, answer: str, generation_seconds: float, namespace: str = "") -> None:
+        key = self.normalized_key(question, namespace)
+        self.answers.set(key, (answer, generation_seconds))
+        with self._lock:
+            self._index[key] = (embed(question), parse_trip_request(question))
+            live_keys = {live_key for live_key, _ in self.answers.items()}
+            for stale_key in [indexed for indexed in self._index if indexed not in live_keys]:
+                del self._index[stale_key]
+
+    def stats(self) -> dict:
+        lookups = self.exact_hits + self.semantic_hits + self.misses
+        hits = self.exact_hits + self.semantic_hits
+        return {
+            "lookups": lookups,
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "saved_llm_seconds": round(self.saved_seconds, 2),
+            "entries": len(self.answers),
+        }
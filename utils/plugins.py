@@ -0,0 +1,56 @@
+import time
+import importlib
+import threading
+from typing import Dict, Optional
+
+
+class PluginRegistry:
+    """
+    Named "module:attribute" specs that are imported on first use.
+
+    LLM provider SDKs and the tool wrappers pull in large dependency trees, so they
+    are only imported when a graph actually needs them (a provider in use, a tool
+    listed in tools.enabled) instead of when main.py is imported.
+    """
+    def __init__(self, kind: str, specs: Dict[str, str]):
+        self.kind = kind
+        self.specs = specs
+        self._loaded: Dict[str, object] = {}
+        self._import_seconds: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str):
+        """Import (once) and return the object registered under name"""
+        plugin = self._loaded.get(name)
+        if plugin is not None:
+            return plugin
+        if name not in self.specs:
+            raise KeyError(f"Unknown {self.kind} '{name}', expected one of {sorted(self.specs)}")
+        with self._lock:
+            if name not in self._loaded:
+                module_name, attribute = self.specs[name].split(":")
+                started = time.perf_counter()
+                self._loaded[name] = getattr(importlib.import_module(module_name), attribute)
+                self._import_seconds[name] = round(time.perf_counter() - started, 3)
+            return self._loaded[name]
+
+    def loaded(self, name: str) -> Optional[object]:
+        """The plugin if it has been imported already, without importing it"""
+        return self._loaded.get(name)
+
+    def stats(self) -> dict:
+        return {"available": sorted(self.specs), "import_seconds": dict(self._import_seconds)}
+
+
+LLM_PROVIDERS = PluginRegistry("LLM provider", {
+    "groq": "langchain_groq:ChatGroq",
+    "openai": "langchain_openai:ChatOpenAI",
+})
+
+# Each tool class takes config= and exposes its StructuredTools as .tool_list
+TOOLS = PluginRegistry("tool", {
+    "weather": "tools.weather_info_tool:WeatherInfoTool",
+    "places": "tools.place_search_tool:PlaceSearchTool",
+    "calculator": "tools.expense_calculator_tool:CalculatorTool",
+    "currency": "tools.currency_conversion_tool:CurrencyConverterTool",
+})
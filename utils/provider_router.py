@@ -0,0 +1,281 @@
+import time
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+from logger.logging import get_logger
+
+logger = get_logger("provider_router")
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a provider whose circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Classic closed / open / half-open breaker.
+
+    After failure_threshold consecutive failures the breaker opens and calls fail fast
+    for reset_seconds; then a single probe call is let through (half-open) and its
+    outcome closes or re-opens the breaker.
+    """
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self.state = "half_open"
+                self._probing = False
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self.consecutive_failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            self._probing = False
+            if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.times_opened += 1
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def stats(self) -> dict:
+        return {"state": self.state, "consecutive_failures": self.consecutive_failures, "times_opened": self.times_opened}
+
+
+class LatencyTracker:
+    """Sliding window of recent call latencies with percentile lookups"""
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(q / 100 * len(samples)))]
+
+    def stats(self) -> dict:
+        p50, p95 = self.percentile(50), self.percentile(95)
+        return {
+            "samples": len(self),
+            "p50_ms": round(p50 * 1000, 2) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 2) if p95 is not None else None,
+        }
+
+
+class ProviderRouter:
+    """
+    Routes a request to a primary provider and hedges it with a fallback provider.
+
+    The primary is called first. The fallback is started as soon as the primary fails,
+    returns an empty result, or has not answered within its own p95 latency (clamped
+    to [hedge_min_seconds, hedge_max_seconds]); whichever acceptable answer arrives first
+    wins. Upstream calls go through guard()/aguard(), which keep a circuit breaker and a
+    latency window per provider, so an open breaker makes that provider fail instantly.
+    """
+    def __init__(self, primary: str, fallback: str, hedge_min_seconds: float = 0.3, hedge_max_seconds: float = 3.0,
+                 hedge_default_seconds: float = 1.5, min_samples: int = 20, timeout_seconds: float = 20.0,
+                 failure_threshold: int = 5, reset_seconds: float = 30.0, max_workers: int = 16):
+        self.primary = primary
+        self.fallback = fallback
+        self.hedge_min_seconds = hedge_min_seconds
+        self.hedge_max_seconds = hedge_max_seconds
+        self.hedge_default_seconds = hedge_default_seconds
+        self.min_samples = min_samples
+        self.timeout_seconds = timeout_seconds
+        self.breakers = {name: CircuitBreaker(failure_threshold, reset_seconds) for name in (primary, fallback)}
+        self.latency = {name: LatencyTracker() for name in (primary, fallback)}
+        self.counters = {name: {"calls": 0, "failures": 0, "rejected": 0, "empty": 0, "wins": 0}
+                         for name in (primary, fallback)}
+        self.requests = 0
+        self.hedged = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="router")
+
+    @classmethod
+    def from_config(cls, routing_config: dict) -> "ProviderRouter":
+        return cls(
+            primary=routing_config.get("primary", "google"),
+            fallback=routing_config.get("fallback", "tavily"),
+            hedge_min_seconds=routing_config.get("hedge_min_seconds", 0.3),
+            hedge_max_seconds=routing_config.get("hedge_max_seconds", 3.0),
+            hedge_default_seconds=routing_config.get("hedge_default_seconds", 1.5),
+            min_samples=routing_config.get("min_samples", 20),
+            timeout_seconds=routing_config.get("timeout_seconds", 20.0),
+            failure_threshold=routing_config.get("failure_threshold", 5),
+            reset_seconds=routing_config.get("reset_seconds", 30.0),
+        )
+
+    def _count(self, name: str, counter: str) -> None:
+        with self._lock:
+            self.counters[name][counter] += 1
+
+    def hedge_delay(self) -> float:
+        tracker = self.latency[self.primary]
+        if len(tracker) < self.min_samples:
+            return self.hedge_default_seconds
+        return min(max(tracker.percentile(95), self.hedge_min_seconds), self.hedge_max_seconds)
+
+    def _before_call(self, name: str) -> float:
+        if not self.breakers[name].allow():
+            self._count(name, "rejected")
+            raise CircuitOpenError(f"{name} circuit breaker is open")
+        self._count(name, "calls")
+        return time.perf_counter()
+
+    def _after_call(self, name: str, started: float, ok: bool) -> None:
+        self.latency[name].record(time.perf_counter() - started)
+        if ok:
+            self.breakers[name].record_success()
+        else:
+            self._count(name, "failures")
+            self.breakers[name].record_failure()
+
+    def guard(self, name: str, call: Callable[..., Any]) -> Callable[..., Any]:
+        """Wrap an upstream call with the provider's circuit breaker and latency window"""
+        def guarded(*args, **kwargs):
+            started = self._before_call(name)
+            try:
+                result = call(*args, **kwargs)
+            except Exception:
+                self._after_call(name, started, ok=False)
+                raise
+            self._after_call(name, started, ok=True)
+            return result
+        return guarded
+
+    def aguard(self, name: str, call: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        async def guarded(*args, **kwargs):
+            started = self._before_call(name)
+            try:
+                result = await call(*args, **kwargs)
+            except asyncio.CancelledError:
+                self.latency[name].record(time.perf_counter() - started)  # lost the hedge; still a latency sample
+                raise
+            except Exception:
+                self._after_call(name, started, ok=False)
+                raise
+            self._after_call(name, started, ok=True)
+            return result
+        return guarded
+
+    def _settle(self, name: str, outcome: Tuple[Any, Optional[BaseException]], accept, empty: List) -> bool:
+        result, error = outcome
+        if error is not None:
+            logger.warning("provider failed", extra={"fields": {"provider": name, "error": repr(error)}})
+            return False
+        if accept(result):
+            self._count(name, "wins")
+            return True
+        self._count(name, "empty")
+        empty.append((name, result))
+        return False
+
+    def _give_up(self, empty: List, errors: List[BaseException]) -> Tuple[str, Any]:
+        if empty:
+            return empty[-1]
+        if errors:
+            raise errors[-1]
+        raise TimeoutError(f"no provider answered within {self.timeout_seconds}s")
+
+    def call(self, primary: Callable[[], Any], fallback: Callable[[], Any], accept: Callable[[Any], bool] = bool) -> Tuple[str, Any]:
+        """Run the hedged request on the router's thread pool and return (provider, result)"""
+        with self._lock:
+            self.requests += 1
+        started = time.monotonic()
+        deadline, hedge_at = started + self.timeout_seconds, started + self.hedge_delay()
+        pending = {self._executor.submit(primary): self.primary}
+        fallback_started = False
+        empty, errors = [], []
+        while True:
+            until = deadline if fallback_started else min(hedge_at, deadline)
+            done, _ = wait(pending, timeout=max(until - time.monotonic(), 0), return_when=FIRST_COMPLETED)
+            for future in done:
+                name = pending.pop(future)
+                error = future.exception()
+                if error is not None:
+                    errors.append(error)
+                if self._settle(name, (None if error else future.result(), error), accept, empty):
+                    return name, future.result()
+            if not fallback_started and (not pending or time.monotonic() >= hedge_at):
+                if pending:
+                    with self._lock:
+                        self.hedged += 1
+                pending[self._executor.submit(fallback)] = self.fallback
+                fallback_started = True
+            elif not pending or time.monotonic() >= deadline:
+                return self._give_up(empty, errors)
+
+    async def acall(self, primary: Callable[[], Awaitable[Any]], fallback: Callable[[], Awaitable[Any]],
+                    accept: Callable[[Any], bool] = bool) -> Tuple[str, Any]:
+        """Async hedged request; the losing call is cancelled once a winner is known"""
+        with self._lock:
+            self.requests += 1
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline, hedge_at = started + self.timeout_seconds, started + self.hedge_delay()
+        pending = {asyncio.ensure_future(primary()): self.primary}
+        fallback_started = False
+        empty, errors = [], []
+        try:
+            while True:
+                until = deadline if fallback_started else min(hedge_at, deadline)
+                done, _ = await asyncio.wait(pending, timeout=max(until - loop.time(), 0), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = pending.pop(task)
+                    error = task.exception()
+                    if error is not None:
+                        errors.append(error)
+                    if self._settle(name, (None if error else task.result(), error), accept, empty):
+                        return name, task.result()
+                if not fallback_started and (not pending or loop.time() >= hedge_at):
+                    if pending:
+                        with self._lock:
+                            self.hedged += 1
+                    pending[asyncio.ensure_future(fallback())] = self.fallback
+                    fallback_started = True
+                elif not pending or loop.time() >= deadline:
+                    return self._give_up(empty, errors)
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "hedge_delay_ms": round(self.hedge_delay() * 1000, 2),
+            "providers": {
+                name: {**self.counters[name], "breaker": self.breakers[name].stats(), "latency": self.latency[name].stats()}
+                for name in (self.primary, self.fallback)
+            },
+        }
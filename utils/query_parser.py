@@ -0,0 +1,194 @@
+import re
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "fourteen": 14, "a": 1, "an": 1,
+}
+
+BUDGET_CUES = {
+    "budget": ["budget", "cheap", "low-cost", "low cost", "affordable", "backpack", "($)"],
+    "luxury": ["luxury", "luxurious", "premium", "5-star", "five star", "($$$$)"],
+    "mid-range": ["mid-range", "mid range", "moderate", "($$)"],
+}
+
+THEMES = {
+    "adventure": "adventure", "beach": "beach", "cultur": "culture", "family": "family", "food": "food",
+    "histor": "history", "honeymoon": "honeymoon", "nature": "nature", "nightlife": "nightlife",
+    "off-beat": "off-beat", "religio": "religious", "romantic": "romantic", "shopping": "shopping",
+    "trek": "trekking", "wildlife": "wildlife",
+}
+
+PLACE = r"([A-Za-z][A-Za-z'\-]*(?:\s+[A-Za-z][A-Za-z'\-]*){0,3}?)"
+CONNECTORS = ["for", "with", "on", "during", "in", "from", "to", "under", "and", "next", "this", "starting", "trip",
+              "by", "within"]
+PLACE_END = r"(?=\s+(?:" + "|".join(CONNECTORS) + r")\b|\s*[,.!?;()&]|\s*$)"
+DESTINATION_PATTERN = re.compile(r"\b(?:to|in|from|visit|visiting|around|explore|exploring)\s+" + PLACE + PLACE_END,
+                                 re.IGNORECASE)
+# Further places listed after a destination: "Tokyo and Kyoto", "Rome, Florence and Venice"
+MORE_PLACES_PATTERN = re.compile(r"\s*(?:,\s*(?:and\s+)?|\s+and\s+|\s*&\s*)" + PLACE + PLACE_END, re.IGNORECASE)
+NOT_DESTINATIONS = {
+    "a", "an", "the", "my", "our", "me", "us", "plan", "trip", "travel", "go", "days", "day", "week",
+    "around", "budget", "luxury", "mid", "summer", "winter", "spring", "autumn",
+    # Verbs that precede a place ("I want to visit New York", "to go see Rome")
+    "visit", "visiting", "see", "seeing", "explore", "exploring", "going", "travelling", "traveling",
+    "fly", "flying", "head", "heading", "tour", "touring", "spend", "stay", "staying", "take", "get",
+    "vacation", "holiday", "backpack", "backpacking", "discover", "experience",
+}
+CURRENCY_CODES = {
+    "USD", "EUR", "GBP", "INR", "JPY", "AUD", "CAD", "CHF", "CNY", "SGD", "AED", "THB",
+    "IDR", "MYR", "NZD", "HKD", "KRW", "TRY", "ZAR", "SEK", "NOK", "DKK", "MXN", "BRL",
+}
+CURRENCY_WORDS = {
+    "dollar": "USD", "euro": "EUR", "pound": "GBP", "rupee": "INR", "yen": "JPY", "dirham": "AED",
+    "baht": "THB", "rupiah": "IDR", "lira": "TRY", "₹": "INR", "€": "EUR", "£": "GBP", "¥": "JPY",
+}
+MONTHS = ["january", "february", "march", "april", "may", "june", "july", "august",
+          "september", "october", "november", "december"]
+ISO_DATE_PATTERN = re.compile(r"\b(\d{4})-(\d{2})-(\d{2})\b")
+DAY_MONTH_PATTERN = re.compile(r"\b(\d{1,2})(?:st|nd|rd|th)?\s+(" + "|".join(m[:3] for m in MONTHS) + r")[a-z]*\b", re.IGNORECASE)
+MONTH_DAY_PATTERN = re.compile(r"\b(" + "|".join(m[:3] for m in MONTHS) + r")[a-z]*\s+(\d{1,2})(?:st|nd|rd|th)?\b", re.IGNORECASE)
+# "may" is only a month after a preposition ("in May"), not in "you may"
+MONTH_PATTERN = re.compile(r"\b(" + "|".join(m for m in MONTHS if m != "may") + r"|(?<=in |of )may)\b", re.IGNORECASE)
+BUDGET_AMOUNT_PATTERN = re.compile(
+    r"(?:[$₹€£]|\b(?:usd|inr|eur|gbp|rs\.?))\s?(\d[\d,]*(?:\.\d+)?)\s?(k)?\b"
+    r"|\b(\d[\d,]*(?:\.\d+)?)\s?(k)?\s?(?:usd|inr|eur|gbp|dollars?|rupees?|euros?|pounds?)\b",
+    re.IGNORECASE,
+)
+DAYS_PATTERN = re.compile(r"\b(\d+|" + "|".join(NUMBER_WORDS) + r")\s*[- ]?\s*(days?|nights?|weeks?)\b", re.IGNORECASE)
+
+
+class TripRequest(BaseModel):
+    """Trip details extracted from a free-text question"""
+    destinations: List[str] = Field(default_factory=list)
+    days: Optional[int] = None
+    budget_tier: Optional[str] = None
+    themes: List[str] = Field(default_factory=list)
+    currency: Optional[str] = None
+    start_date: Optional[str] = None
+    month: Optional[int] = None
+    budget_amount: Optional[float] = None
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(re.sub(r"[^\w\s$-]", " ", text.lower()).split())
+
+
+def _parse_days(question: str) -> Optional[int]:
+    match = DAYS_PATTERN.search(question)
+    if not match:
+        return None
+    count, unit = match.group(1).lower(), match.group(2).lower()
+    count = int(count) if count.isdigit() else NUMBER_WORDS[count]
+    return count * 7 if unit.startswith("week") else count
+
+
+def _parse_budget_tier(question: str) -> Optional[str]:
+    lowered = question.lower()
+    for tier, cues in BUDGET_CUES.items():
+        if any(cue in lowered for cue in cues):
+            return tier
+    return None
+
+
+def _destination(place: str) -> Optional[str]:
+    """The place as a lowercase destination, or None when it is not one (a month, a duration, a currency, ...)"""
+    words = [word for word in place.split() if word.lower() not in NOT_DESTINATIONS]
+    candidate = " ".join(words)
+    if not words or DAYS_PATTERN.fullmatch(candidate) or candidate.upper() in CURRENCY_CODES \
+            or candidate.lower().rstrip("s") in CURRENCY_WORDS:
+        return None
+    destination = candidate.strip(" -'").lower()
+    return destination if destination and destination not in MONTHS else None
+
+
+def _parse_destinations(question: str) -> List[str]:
+    destinations = []
+    for match in DESTINATION_PATTERN.finditer(question):
+        destination = _destination(match.group(1))
+        if destination is None:
+            continue
+        found = [destination]
+        capitalized = match.group(1)[0].isupper()
+        position = match.end()
+        while True:
+            more = MORE_PLACES_PATTERN.match(question, position)
+            # In a capitalized question a lowercase word ends the list ("Goa and relax")
+            if more is None or more.group(1).split()[0].lower() in CONNECTORS \
+                    or (capitalized and not more.group(1)[0].isupper()):
+                break
+            destination = _destination(more.group(1))
+            if destination is None:
+                break
+            found.append(destination)
+            position = more.end()
+        destinations.extend(place for place in found if place not in destinations)
+    return destinations
+
+
+def _parse_currency(question: str) -> Optional[str]:
+    for token in re.findall(r"\b[A-Z]{3}\b", question):
+        if token in CURRENCY_CODES:
+            return token
+    lowered = question.lower()
+    for word, code in CURRENCY_WORDS.items():
+        if word in lowered:
+            return code
+    return None
+
+
+def _parse_start_date(question: str) -> Optional[str]:
+    """Start date as YYYY-MM-DD, or MM-DD when the question gives no year"""
+    match = ISO_DATE_PATTERN.search(question)
+    if match:
+        return match.group(0)
+    match = DAY_MONTH_PATTERN.search(question)
+    if match:
+        day, month = match.group(1), match.group(2)
+    else:
+        match = MONTH_DAY_PATTERN.search(question)
+        if not match:
+            return None
+        month, day = match.group(1), match.group(2)
+    month_number = [m[:3] for m in MONTHS].index(month[:3].lower()) + 1
+    return f"{month_number:02d}-{int(day):02d}" if 1 <= int(day) <= 31 else None
+
+
+def _parse_month(question: str, start_date: Optional[str]) -> Optional[int]:
+    """Travel month (1-12), from the start date or else the first month named"""
+    if start_date:
+        return int(start_date.split("-")[-2])
+    match = MONTH_PATTERN.search(question)
+    return MONTHS.index(match.group(1).lower()) + 1 if match else None
+
+
+def _parse_budget_amount(question: str) -> Optional[float]:
+    """Absolute budget such as "$1,500", "50000 INR" or "2k euros", in the question's currency"""
+    match = BUDGET_AMOUNT_PATTERN.search(question)
+    if not match:
+        return None
+    number, thousands = (match.group(1), match.group(2)) if match.group(1) else (match.group(3), match.group(4))
+    amount = float(number.replace(",", ""))
+    return amount * 1000 if thousands else amount
+
+
+def parse_trip_request(question: str) -> TripRequest:
+    """
+    Extract destinations, trip length, budget tier, themes, currency and start date from a question.
+
+    Uses the same budget cues the Streamlit app prepends to the prompt
+    (see apply_budget_to_prompt), e.g. "Plan a budget-friendly ($) trip."
+    """
+    lowered = question.lower()
+    start_date = _parse_start_date(question)
+    return TripRequest(
+        destinations=_parse_destinations(question),
+        days=_parse_days(question),
+        budget_tier=_parse_budget_tier(question),
+        themes=sorted({theme for cue, theme in THEMES.items() if cue in lowered}),
+        currency=_parse_currency(question),
+        start_date=start_date,
+        month=_parse_month(question, start_date),
+        budget_amount=_parse_budget_amount(question),
+    )
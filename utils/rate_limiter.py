@@ -0,0 +1,141 @@
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+from utils.config_loader import load_config
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter usable from threads and from the event loop.
+
+    Holds up to burst tokens, refilled at rate tokens per second; each call takes one
+    token and waits (time.sleep / asyncio.sleep) until one is available.
+    """
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self.acquired = 0
+        self.waited_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token, possibly in advance, and return how long to wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= 1
+            self.acquired += 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            self.waited_seconds += wait
+            return wait
+
+    def try_acquire(self, cost: int = 1) -> float:
+        """
+        Take cost tokens if one is available now; otherwise return the seconds until one is.
+
+        A cost above the tokens left drives the bucket negative, so a large request
+        (e.g. a batch) is let through once and the client then waits it off.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            if self.tokens < 1:
+                return (1 - self.tokens) / self.rate
+            self.tokens -= cost
+            self.acquired += cost
+            return 0.0
+
+    def acquire(self) -> None:
+        wait = self._reserve()
+        if wait:
+            time.sleep(wait)
+
+    async def aacquire(self) -> None:
+        wait = self._reserve()
+        if wait:
+            await asyncio.sleep(wait)
+
+    def stats(self) -> dict:
+        return {
+            "rate_per_second": self.rate,
+            "burst": self.burst,
+            "acquired": self.acquired,
+            "waited_seconds": round(self.waited_seconds, 3),
+        }
+
+
+class ClientRateLimiter:
+    """
+    One token bucket per client (API key or IP) for the public endpoints.
+
+    Unlike the upstream limiters this never waits: allow() answers at once so the API
+    can reply 429 with a Retry-After. Only the max_clients most recently seen clients
+    keep a bucket; a client that comes back after being evicted starts with a full one.
+    """
+    def __init__(self, rate: float, burst: int = 1, max_clients: int = 10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self.rejected = 0
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, clients_config: dict) -> Optional["ClientRateLimiter"]:
+        if not clients_config or not clients_config.get("enabled", True):
+            return None
+        return cls(clients_config.get("rate_per_second", 1.0), clients_config.get("burst", 1),
+                   clients_config.get("max_clients", 10000))
+
+    def allow(self, client: str, cost: int = 1) -> float:
+        """0 when the client may proceed (charged cost tokens), otherwise the seconds until it may retry"""
+        with self._lock:
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                bucket = self._buckets[client] = TokenBucket(self.rate, self.burst)
+                if len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(client)
+        retry_after = bucket.try_acquire(cost)
+        if retry_after:
+            self.rejected += 1
+        return retry_after
+
+    def stats(self) -> dict:
+        return {"rate_per_second": self.rate, "burst": self.burst, "clients": len(self._buckets), "rejected": self.rejected}
+
+
+_limiters: Optional[Dict[str, TokenBucket]] = None
+_limiters_lock = threading.Lock()
+
+
+def configure_rate_limits(rate_limits_config: dict) -> None:
+    """(Re)create the limiters from the rate_limits section of config.yaml"""
+    global _limiters
+    _limiters = {
+        name: TokenBucket(settings.get("rate_per_second", 1.0), settings.get("burst", 1))
+        for name, settings in (rate_limits_config or {}).items()
+    }
+
+
+def get_rate_limiter(name: str) -> Optional[TokenBucket]:
+    """
+    Return the process-wide limiter for a provider (an LLM provider name or an upstream
+    host), or None when that provider is not rate limited.
+    """
+    if _limiters is None:
+        with _limiters_lock:
+            if _limiters is None:
+                configure_rate_limits(load_config().get("rate_limits", {}))
+    return _limiters.get(name)
+
+
+def rate_limit_stats() -> Dict[str, dict]:
+    return {name: limiter.stats() for name, limiter in (_limiters or {}).items()}
@@ -1,40 +1,207 @@
 import os
+import re
+import gzip
+import json
+import asyncio
+import time
+import hashlib
 import datetime
+import tempfile
+import threading
+from typing import Dict, List, Optional, Set
+from logger.logging import get_logger
 
-def save_document(response_text: str, directory: str = "./output"):
-    """Export travel plan to Markdown file with proper formatting"""
-    os.makedirs(directory, exist_ok=True)
-    
-    
-    # Create markdown content with metadata header
-    markdown_content = f"""# 🌍 AI Travel Plan
+logger = get_logger("export")
+
+EXPORT_FORMATS = {
+    "md": ("md", "text/markdown; charset=utf-8"),
+    "json": ("json", "application/json"),
+    "gz": ("md.gz", "application/gzip"),
+}
+EXPORT_ID_PATTERN = re.compile(r"^[0-9a-f]{16}$")
+HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.*)$")
+
+DISCLAIMER = ("*This travel plan was generated by AI. Please verify all information, especially prices, "
+              "operating hours, and travel requirements before your trip.*")
+
+
+def export_id(response_text: str) -> str:
+    """Content address of a plan: the same plan text always maps to the same files"""
+    return hashlib.sha256(response_text.encode("utf-8")).hexdigest()[:16]
 
-    # **Generated:** {datetime.datetime.now().strftime('%Y-%m-%d at %H:%M')}  
-    # **Created by:** Atriyo's Travel Agent
 
-    ---
+def render_markdown(response_text: str, generated: datetime.datetime) -> str:
+    return (
+        "# 🌍 AI Travel Plan\n\n"
+        f"**Generated:** {generated.strftime('%Y-%m-%d at %H:%M')}  \n"
+        "**Created by:** Atriyo's Travel Agent\n\n"
+        "---\n\n"
+        f"{response_text}\n\n"
+        "---\n\n"
+        f"{DISCLAIMER}\n"
+    )
 
-    {response_text}
 
-    ---
+def plan_sections(response_text: str) -> List[dict]:
+    """Split a markdown plan into {"title", "level", "content"} sections at its headings"""
+    sections = [{"title": "", "level": 0, "lines": []}]
+    for line in response_text.splitlines():
+        heading = HEADING_PATTERN.match(line.strip())
+        if heading:
+            sections.append({"title": heading.group(2).strip(" *"), "level": len(heading.group(1)), "lines": []})
+        else:
+            sections[-1]["lines"].append(line)
+    return [
+        {"title": section["title"], "level": section["level"], "content": "\n".join(section["lines"]).strip()}
+        for section in sections if section["title"] or "\n".join(section["lines"]).strip()
+    ]
 
-    *This travel plan was generated by AI. Please verify all information, especially prices, operating hours, and travel requirements before your trip.*
+
+class PlanExporter:
+    """
+    Writes travel plans to disk as markdown, JSON (structured sections) or gzipped markdown.
+
+    Files are named after the hash of the plan text, so concurrent exports never collide
+    and exporting the same plan again is a no-op. Files are written to a temporary name
+    and renamed into place, so a download never sees a half-written file. schedule()
+    runs the writes on a worker thread and returns immediately.
+
+    Exports not written or re-exported for max_age_seconds are deleted, and beyond
+    max_files the oldest go first; schedule() runs that cleanup at most once per
+    prune_interval_seconds.
     """
-            
+    def __init__(self, directory: str = "./output", max_age_seconds: float = 604800, max_files: int = 1000,
+                 prune_interval_seconds: float = 600):
+        self.directory = directory
+        self.max_age_seconds = max_age_seconds
+        self.max_files = max_files
+        self.prune_interval_seconds = prune_interval_seconds
+        self.written = 0
+        self.deduplicated = 0
+        self.pruned = 0
+        self._pruned_at = 0.0
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._tasks: Set[asyncio.Future] = set()
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def from_config(cls, export_config: dict) -> "PlanExporter":
+        return cls(
+            export_config.get("directory", "./output"),
+            max_age_seconds=export_config.get("max_age_seconds", 604800),
+            max_files=export_config.get("max_files", 1000),
+            prune_interval_seconds=export_config.get("prune_interval_seconds", 600),
+        )
+
+    def path_for(self, plan_id: str, fmt: str) -> Optional[str]:
+        """Path of an export, or None for an unknown format or a malformed id"""
+        if fmt not in EXPORT_FORMATS or not EXPORT_ID_PATTERN.match(plan_id):
+            return None
+        return os.path.join(self.directory, f"AI_Trip_Planner_{plan_id}.{EXPORT_FORMATS[fmt][0]}")
+
+    def _content(self, response_text: str, fmt: str, generated: datetime.datetime) -> bytes:
+        if fmt == "json":
+            document = {
+                "id": export_id(response_text),
+                "generated": generated.isoformat(timespec="seconds"),
+                "sections": plan_sections(response_text),
+                "disclaimer": DISCLAIMER.strip("*"),
+            }
+            return json.dumps(document, ensure_ascii=False, indent=2).encode("utf-8")
+        markdown = render_markdown(response_text, generated).encode("utf-8")
+        # mtime=0 keeps the gzip bytes identical for identical plans
+        return gzip.compress(markdown, mtime=0) if fmt == "gz" else markdown
+
+    def export(self, response_text: str, fmt: str = "md") -> str:
+        """Write one format of a plan unless it already exists and return its path"""
+        path = self.path_for(export_id(response_text), fmt)
+        if path is None:
+            raise ValueError(f"Unknown export format: {fmt}")
+        if os.path.exists(path):
+            # Counts as a fresh export for the age-based cleanup
+            os.utime(path)
+            with self._lock:
+                self.deduplicated += 1
+            return path
+        content = self._content(response_text, fmt, datetime.datetime.now())
+        handle, temp_path = tempfile.mkstemp(dir=self.directory, prefix=".export-")
+        try:
+            with os.fdopen(handle, "wb") as file:
+                file.write(content)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        with self._lock:
+            self.written += 1
+        logger.info("plan exported", extra={"fields": {"path": path}})
+        return path
+
+    def prune(self) -> int:
+        """Delete exports (and leftover temporary files) past max_age_seconds, then the oldest beyond max_files"""
+        cutoff = time.time() - self.max_age_seconds
+        exports, removed = [], 0
+        for entry in os.scandir(self.directory):
+            if not entry.is_file() or not entry.name.startswith(("AI_Trip_Planner_", ".export-")):
+                continue
+            try:
+                modified = entry.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            if modified < cutoff:
+                removed += self._remove(entry.path)
+            elif entry.name.startswith("AI_Trip_Planner_"):
+                exports.append((modified, entry.path))
+        for _, path in sorted(exports)[:max(len(exports) - self.max_files, 0)]:
+            removed += self._remove(path)
+        with self._lock:
+            self.pruned += removed
+        return removed
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def schedule(self, response_text: str, formats: List[str]) -> str:
+        """Start writing the plan in the background and return its export id right away"""
+        plan_id = export_id(response_text)
+        if time.monotonic() - self._pruned_at >= self.prune_interval_seconds:
+            self._pruned_at = time.monotonic()
+            self._background(asyncio.to_thread(self.prune))
+        for fmt in formats:
+            task = self._background(asyncio.to_thread(self.export, response_text, fmt))
+            self._pending[f"{plan_id}.{fmt}"] = task
+            task.add_done_callback(lambda done, key=f"{plan_id}.{fmt}": self._pending.pop(key, None)
+                                   if self._pending.get(key) is done else None)
+        return plan_id
+
+    def _background(self, coroutine) -> asyncio.Future:
+        task = asyncio.ensure_future(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def wait_for(self, plan_id: str, fmt: str) -> None:
+        """Wait for a scheduled export of this plan and format, if one is still being written"""
+        task = self._pending.get(f"{plan_id}.{fmt}")
+        if task is not None:
+            await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        return {"written": self.written, "deduplicated": self.deduplicated, "pending": len(self._pending),
+                "pruned": self.pruned}
+
+
+def save_document(response_text: str, directory: str = "./output"):
+    """Export travel plan to Markdown file with proper formatting"""
     try:
-        # Write to markdown file with UTF-8 encoding
-        # Generate timestamp-based filename
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        filename = f"{directory}/AI_Trip_Planner_{timestamp}.md"
-
-        print(filename)
-
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(markdown_content)
-        
-        print(f"Markdown file saved as: {filename}")
-        return filename
-        
+        return PlanExporter(directory).export(response_text, "md")
     except Exception as e:
-        print(f"Error saving markdown file: {e}")
-        return None
\ No newline at end of file
+        logger.error("saving markdown file failed", extra={"fields": {"directory": directory, "error": str(e)}})
+        return None
@@ -0,0 +1,84 @@
+import json
+from collections import Counter
+from typing import Any, Dict, List
+
+PLACE_FIELDS = ("name", "rating", "price_level")
+
+
+def to_json(payload: Any) -> str:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+
+
+def cap_output(payload: Dict[str, Any], max_chars: int = 1500) -> str:
+    """
+    Serialize a tool payload as compact JSON of at most max_chars characters.
+
+    The longest list in the payload is shortened first (keeping its top entries),
+    then long strings are cut, so the result always stays valid JSON.
+    """
+    payload = dict(payload)
+    text = to_json(payload)
+    while len(text) > max_chars:
+        lists = [key for key, value in payload.items() if isinstance(value, list) and len(value) > 1]
+        if lists:
+            key = max(lists, key=lambda name: len(to_json(payload[name])))
+            payload[key] = payload[key][:-1]
+            payload["truncated"] = True
+        else:
+            strings = [key for key, value in payload.items() if isinstance(value, str) and len(value) > 40]
+            if not strings:
+                break
+            key = max(strings, key=lambda name: len(payload[name]))
+            overflow = len(text) - max_chars
+            payload[key] = payload[key][:max(40, len(payload[key]) - overflow - 1)] + "…"
+            payload["truncated"] = True
+        text = to_json(payload)
+    return text
+
+
+def compact_places(results: List[dict], top_k: int = 5) -> List[dict]:
+    """Top-k places with name, rating and price level, best rated first"""
+    places = []
+    for result in results or []:
+        place = {field: result.get(field) for field in PLACE_FIELDS if result.get(field) is not None}
+        if result.get("user_ratings_total") is not None:
+            place["reviews"] = result["user_ratings_total"]
+        if result.get("formatted_address"):
+            place["address"] = result["formatted_address"]
+        if place.get("name"):
+            places.append(place)
+    places.sort(key=lambda place: (place.get("rating") or 0, place.get("reviews") or 0), reverse=True)
+    return places[:top_k]
+
+
+def current_weather(weather_data: dict) -> dict:
+    main = weather_data.get("main", {})
+    weather = {
+        "temp_c": main.get("temp"),
+        "feels_like_c": main.get("feels_like"),
+        "humidity": main.get("humidity"),
+        "condition": (weather_data.get("weather") or [{}])[0].get("description"),
+        "wind_ms": weather_data.get("wind", {}).get("speed"),
+    }
+    return {key: value for key, value in weather.items() if value is not None}
+
+
+def daily_forecast(forecast_data: dict) -> List[dict]:
+    """Aggregate 3-hour forecast slots into one min/max/condition entry per day"""
+    days: Dict[str, dict] = {}
+    for item in forecast_data.get("list", []):
+        date = item["dt_txt"].split(" ")[0]
+        day = days.setdefault(date, {"temps": [], "conditions": Counter(), "rain_mm": 0.0})
+        day["temps"].append(item["main"]["temp"])
+        day["conditions"][item["weather"][0]["description"]] += 1
+        day["rain_mm"] += item.get("rain", {}).get("3h", 0.0)
+    return [
+        {
+            "date": date,
+            "min_c": round(min(day["temps"]), 1),
+            "max_c": round(max(day["temps"]), 1),
+            "condition": day["conditions"].most_common(1)[0][0],
+            **({"rain_mm": round(day["rain_mm"], 1)} if day["rain_mm"] else {}),
+        }
+        for date, day in days.items()
+    ]
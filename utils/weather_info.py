@@ -1,34 +1,93 @@
-import requests
+from typing import Optional
+from utils.cache import MemoryBackend, ResponseCache, make_backend
+from utils.http_client import get_http_client
 
 class WeatherForecastTool:
-    def __init__(self, api_key:str):
+    # Responses are shared by every instance in the process, keyed on the normalized city name
+    current_cache = ResponseCache(MemoryBackend(), ttl=600, stale_ttl=1800)
+    forecast_cache = ResponseCache(MemoryBackend(), ttl=3600, stale_ttl=1800)
+    _cache_settings = None
+
+    def __init__(self, api_key:str, base_url: Optional[str] = None):
         self.api_key = api_key
-        self.base_url = "https://api.openweathermap.org/data/2.5"
+        self.base_url = (base_url or "https://api.openweathermap.org/data/2.5").rstrip("/")
 
-    def get_current_weather(self, place:str):
-        """Get current weather of a place"""
+    @classmethod
+    def configure_cache(cls, cache_config: dict):
+        """Rebuild the shared caches from the cache.weather section of config.yaml"""
+        if cache_config == cls._cache_settings:
+            return
+        backend = make_backend(cache_config, namespace="weather")
+        stale_ttl = cache_config.get("stale_seconds", 1800)
+        cls.current_cache = ResponseCache(backend, ttl=cache_config.get("current_ttl_seconds", 600), stale_ttl=stale_ttl)
+        cls.forecast_cache = ResponseCache(backend, ttl=cache_config.get("forecast_ttl_seconds", 3600), stale_ttl=stale_ttl)
+        cls._cache_settings = dict(cache_config)
+
+    @classmethod
+    def cache_stats(cls) -> dict:
+        return {"current": cls.current_cache.stats(), "forecast": cls.forecast_cache.stats()}
+
+    @staticmethod
+    def _city_key(place:str) -> str:
+        return " ".join(place.strip().lower().split())
+
+    def _current_params(self, place:str) -> dict:
+        return {
+            "q": place,
+            "appid": self.api_key,
+            "units": "metric"
+        }
+
+    def _forecast_params(self, place:str) -> dict:
+        return {
+            "q": place,
+            "appid": self.api_key,
+            "cnt": 40,
+            "units": "metric"
+        }
+
+    def _fetch_current_weather(self, place:str):
         try:
             url = f"{self.base_url}/weather"
-            params = {
-                "q": place,
-                "appid": self.api_key,
-            }
-            response = requests.get(url, params=params)
+            response = get_http_client().get(url, params=self._current_params(place))
             return response.json() if response.status_code == 200 else {}
         except Exception as e:
             raise e
-    
-    def get_forecast_weather(self, place:str):
-        """Get weather forecast of a place"""
+
+    def _fetch_forecast_weather(self, place:str):
         try:
             url = f"{self.base_url}/forecast"
-            params = {
-                "q": place,
-                "appid": self.api_key,
-                "cnt": 10,
-                "units": "metric"
-            }
-            response = requests.get(url, params=params)
+            response = get_http_client().get(url, params=self._forecast_params(place))
             return response.json() if response.status_code == 200 else {}
         except Exception as e:
-            raise e
\ No newline at end of file
+            raise e
+
+    async def _afetch_current_weather(self, place:str):
+        url = f"{self.base_url}/weather"
+        response = await get_http_client().aget(url, params=self._current_params(place))
+        return response.json() if response.status_code == 200 else {}
+
+    async def _afetch_forecast_weather(self, place:str):
+        url = f"{self.base_url}/forecast"
+        response = await get_http_client().aget(url, params=self._forecast_params(place))
+        return response.json() if response.status_code == 200 else {}
+
+    def get_current_weather(self, place:str):
+        """Get current weather of a place"""
+        key = f"v2:current:{self._city_key(place)}"
+        return self.current_cache.get_or_fetch(key, lambda: self._fetch_current_weather(place))
+
+    def get_forecast_weather(self, place:str):
+        """Get weather forecast of a place"""
+        key = f"v2:forecast:{self._city_key(place)}"
+        return self.forecast_cache.get_or_fetch(key, lambda: self._fetch_forecast_weather(place))
+
+    async def aget_current_weather(self, place:str):
+        """Get current weather of a place without blocking the event loop"""
+        key = f"v2:current:{self._city_key(place)}"
+        return await self.current_cache.aget_or_fetch(key, lambda: self._afetch_current_weather(place))
+
+    async def aget_forecast_weather(self, place:str):
+        """Get weather forecast of a place without blocking the event loop"""
+        key = f"v2:forecast:{self._city_key(place)}"
+        return await self.forecast_cache.aget_or_fetch(key, lambda: self._afetch_forecast_weather(place))